@@ -4,17 +4,18 @@ Uses Gemini AI to adapt to different platforms and form types
 """
 
 import os
+import re
 import json
 import logging
 import time
 import requests
 from typing import Dict, List, Optional, Any
+from urllib.parse import urljoin
 from dataclasses import dataclass
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from bs4 import BeautifulSoup
@@ -22,9 +23,28 @@ from bs4 import BeautifulSoup
 from ai_form_analyzer import AIFormAnalyzer, FormAnalysisResult
 from ai_services.captcha_handler import CaptchaHandler, CaptchaResult
 from ai_services.smart_field_handler import SmartFieldHandler, FieldInfo, FieldHandlingResult
+from scraping.browser_pool import get_browser_pool
+from scraping.platform_fingerprint import PlatformProfile, platform_profile, resolve_platform, submission_strategy
 
 logger = logging.getLogger(__name__)
 
+# Field types of a known platform's form, matched against each field's name, id,
+# placeholder and type; company before name so "company-name" is not the sender's name
+KNOWN_FIELD_KEYWORDS = (
+    ('email', ('email', 'e-mail')),
+    ('phone', ('phone', 'tel', 'mobile')),
+    ('company', ('company', 'organization', 'organisation', 'business')),
+    ('subject', ('subject', 'topic')),
+    ('message', ('message', 'comment', 'inquiry', 'enquiry', 'details')),
+    ('name', ('name',))
+)
+
+# Exact name attribute selectors ([name="field"]), the only ones an HTTP post can address
+NAME_SELECTOR_PATTERN = re.compile(r"""\[name\s*=\s*["']?([^"'\]]+)["']?\s*\]""")
+
+# Answer statuses of form plugins (Contact Form 7, WPForms, ...) that mean the message was not sent
+AJAX_FAILURE_STATUSES = {'validation_failed', 'mail_failed', 'spam', 'aborted', 'acceptance_missing', 'error'}
+
 @dataclass
 class SubmissionResult:
     """Result of form submission attempt"""
@@ -89,13 +109,32 @@ class IntelligentFormSubmitter:
                     confidence_score=0.0
                 )
             
-            # Step 2: Use AI to analyze the form
-            logger.info(f"🔍 AI analyzing form structure for {contact_form_url}")
-            analysis_result = self.ai_analyzer.analyze_page_for_forms(
-                page_content, 
-                contact_form_url, 
-                website_data.get('companyName', '')
-            )
+            # Step 2: Platform fingerprinted while scraping (the page is only
+            # fingerprinted here for websites scraped before it was recorded)
+            platform = resolve_platform(website_url or contact_form_url, website_data.get('platform'), page_content)
+            profile = platform_profile(platform)
+            logger.info(f"🏗️ Platform: {platform}")
+            
+            # Step 3: Analyze the form; platforms we know how to handle skip the AI analysis
+            # when their form and its fields are in the page markup
+            analysis_result = None
+            if profile:
+                logger.info(f"🔍 Analyzing {platform} form structure without AI for {contact_form_url}")
+                analysis_result = self._analyze_known_platform_form(page_content, contact_form_url, profile)
+                if analysis_result is None:
+                    logger.info(f"🔍 No {platform} form fields in the page markup, falling back to AI analysis")
+            if analysis_result is None:
+                logger.info(f"🔍 AI analyzing form structure for {contact_form_url}")
+                analysis_result = self.ai_analyzer.analyze_page_for_forms(
+                    page_content, 
+                    contact_form_url, 
+                    website_data.get('companyName', '')
+                )
+                # Forms some builders render client-side are found by the selectors once the page runs
+                if profile and analysis_result.success:
+                    analysis_result.form_elements.extend(
+                        {'type': 'form', 'selector': selector} for selector in profile.form_selectors
+                    )
             
             if not analysis_result.success:
                 return SubmissionResult(
@@ -109,10 +148,6 @@ class IntelligentFormSubmitter:
                     confidence_score=0.0
                 )
             
-            # Step 3: Detect platform and choose strategy
-            platform = self._detect_platform(contact_form_url, page_content)
-            logger.info(f"🏗️ Detected platform: {platform}")
-            
             # Step 4: Handle CAPTCHAs if detected
             captcha_result = None
             if analysis_result.captcha_detected:
@@ -128,20 +163,24 @@ class IntelligentFormSubmitter:
                 # Note: CAPTCHA solving will be handled during form submission
                 logger.info(f"⚠️ CAPTCHA solving will be attempted during form submission")
             
-            # Step 5: Get AI recommendations for submission strategy
-            strategy = self.ai_analyzer.suggest_submission_strategy(
-                {
-                    'form_elements': analysis_result.form_elements,
-                    'field_mappings': analysis_result.field_mappings,
-                    'submission_methods': analysis_result.submission_methods,
-                    'captcha_detected': analysis_result.captcha_detected,
-                    'captcha_type': analysis_result.captcha_type
-                },
-                generated_message,
-                f"Platform: {platform}, URL: {contact_form_url}, CAPTCHA: {analysis_result.captcha_type or 'None'}"
-            )
-            
-            logger.info(f"📋 AI recommended strategy: {strategy.get('strategy', 'traditional')}")
+            # Step 5: Submission strategy of the platform, or AI recommendations for unknown ones
+            strategy = submission_strategy(platform)
+            if strategy:
+                logger.info(f"📋 {platform} strategy: {strategy['strategy']}")
+            else:
+                strategy = self.ai_analyzer.suggest_submission_strategy(
+                    {
+                        'form_elements': analysis_result.form_elements,
+                        'field_mappings': analysis_result.field_mappings,
+                        'submission_methods': analysis_result.submission_methods,
+                        'captcha_detected': analysis_result.captcha_detected,
+                        'captcha_type': analysis_result.captcha_type
+                    },
+                    generated_message,
+                    f"Platform: {platform}, URL: {contact_form_url}, CAPTCHA: {analysis_result.captcha_type or 'None'}"
+                )
+                strategy['platform'] = platform
+                logger.info(f"📋 AI recommended strategy: {strategy.get('strategy', 'traditional')}")
             
             # Step 6: Execute submission - ALWAYS try traditional first, then fallback to AI recommendations
             try:
@@ -219,36 +258,71 @@ class IntelligentFormSubmitter:
             logger.error(f"Failed to fetch page content from {url}: {e}")
             return None
     
-    def _detect_platform(self, url: str, content: str) -> str:
-        """Detect the platform/technology used for the website"""
-        content_lower = content.lower()
+    def _analyze_known_platform_form(self, content: str, url: str, profile: PlatformProfile) -> Optional[FormAnalysisResult]:
+        """
+        Form analysis from the platform's known form markup and CAPTCHA patterns, without AI
         
-        # Platform detection patterns
-        if 'wix' in content_lower or 'wix.com' in url:
-            return 'wix'
-        elif 'wordpress' in content_lower or 'wp-content' in content_lower:
-            return 'wordpress'
-        elif 'squarespace' in content_lower:
-            return 'squarespace'
-        elif 'shopify' in content_lower:
-            return 'shopify'
-        elif 'webflow' in content_lower:
-            return 'webflow'
-        elif 'formspree' in content_lower or 'formspree.io' in content_lower:
-            return 'formspree'
-        elif 'typeform' in content_lower:
-            return 'typeform'
-        elif 'google forms' in content_lower or 'docs.google.com' in content_lower:
-            return 'google_forms'
-        elif 'mailchimp' in content_lower:
-            return 'mailchimp'
-        elif 'hubspot' in content_lower:
-            return 'hubspot'
-        elif 'salesforce' in content_lower:
-            return 'salesforce'
-        else:
-            return 'custom'
-    
+        Returns None when no form of the platform with a message field is in the
+        markup (rendered client-side, or fields named in ways we do not know),
+        so the caller falls back to the AI analysis.
+        """
+        start_time = time.time()
+        soup = BeautifulSoup(content, 'html.parser')
+        form_element = None
+        field_mappings = {}
+        for selector in profile.form_selectors:
+            for form in soup.select(selector):
+                field_mappings = self._map_form_fields(form)
+                if 'message' in field_mappings:
+                    form_element = {
+                        'type': 'form',
+                        'selector': f'form[id="{form["id"]}"]' if form.get('id') else selector,
+                        'action': urljoin(url, form.get('action') or url),
+                        'method': (form.get('method') or 'POST').upper(),
+                        # Plugin state (nonces, form ids) the plugin expects back
+                        'hidden_fields': {
+                            field['name']: field.get('value', '')
+                            for field in form.find_all('input', type='hidden') if field.get('name')
+                        }
+                    }
+                    break
+            if form_element:
+                break
+        if form_element is None:
+            return None
+        
+        captcha = self.captcha_handler._detect_captcha_patterns(content, url)
+        return FormAnalysisResult(
+            success=True,
+            confidence_score=0.8,
+            form_elements=[form_element],
+            contact_sections=[],
+            submission_methods=[profile.strategy],
+            field_mappings=field_mappings,
+            alternative_contact_methods=[],
+            captcha_detected=captcha.get('captcha_detected', False),
+            captcha_type=captcha.get('captcha_type'),
+            captcha_selectors=captcha.get('captcha_selectors', []),
+            captcha_challenges=[],
+            analysis_time=time.time() - start_time
+        )
+
+    def _map_form_fields(self, form) -> Dict[str, str]:
+        """CSS selectors of a form's name/email/phone/subject/message/company fields, by field type"""
+        field_mappings = {}
+        for field in form.find_all(['input', 'textarea']):
+            name = field.get('name')
+            if not name or field.get('type', 'text').lower() in ('hidden', 'submit', 'button', 'checkbox', 'radio', 'file'):
+                continue
+            text = ' '.join(filter(None, [name, field.get('id'), field.get('placeholder'), field.get('type')])).lower()
+            field_type = next(
+                (known for known, keywords in KNOWN_FIELD_KEYWORDS if any(keyword in text for keyword in keywords)),
+                'message' if field.name == 'textarea' else None
+            )
+            if field_type and field_type not in field_mappings:
+                field_mappings[field_type] = f'{field.name}[name="{name}"]'
+        return field_mappings
+
     def _submit_via_traditional(self, url: str, analysis: FormAnalysisResult, message: str, strategy: Dict) -> SubmissionResult:
         """Submit form using traditional Selenium approach with AI guidance and improved form detection"""
         driver = None
@@ -485,7 +559,7 @@ class IntelligentFormSubmitter:
                 logger.info("🔍 Analyzing unknown fields...")
                 unknown_fields = self.smart_field_handler.analyze_unknown_fields(
                     driver.page_source, 
-                    f"Platform: {platform}, URL: {url}",
+                    f"Platform: {strategy.get('platform', 'custom')}, URL: {url}",
                     url
                 )
                 
@@ -763,7 +837,7 @@ class IntelligentFormSubmitter:
             )
         finally:
             if driver:
-                driver.quit()
+                self._quit_driver(driver)
             # Clean up profile directory
             self._cleanup_profile_directory()
     
@@ -784,11 +858,32 @@ class IntelligentFormSubmitter:
             if not form_action:
                 form_action = url
             
-            # Prepare form data
+            # Prepare form data: the form's hidden plugin state plus the fields we can address by name
             form_data = {}
-            for field_type, value in analysis.field_mappings.items():
-                if field_type in ['name', 'email', 'phone', 'subject', 'message', 'company']:
-                    form_data[value] = self._get_field_value(field_type, message)
+            for element in analysis.form_elements:
+                if element['type'] == 'form':
+                    form_data.update(element.get('hidden_fields', {}))
+                    break
+            fields_submitted = {}
+            for field_type, selector in analysis.field_mappings.items():
+                field_name = NAME_SELECTOR_PATTERN.search(selector or '')
+                if field_type in ['name', 'email', 'phone', 'subject', 'message', 'company'] and field_name:
+                    value = self._get_field_value(field_type, message)
+                    form_data[field_name.group(1)] = value
+                    fields_submitted[field_type] = value
+            
+            # A post without the message reaches nobody, whatever the server answers
+            if 'message' not in fields_submitted:
+                return SubmissionResult(
+                    success=False,
+                    method_used="ajax_post",
+                    response_content=None,
+                    error_message="No message field addressable by name for an AJAX post",
+                    submission_time=time.strftime('%Y-%m-%d %H:%M:%S'),
+                    platform_detected=None,
+                    fields_submitted={},
+                    confidence_score=0.0
+                )
             
             # Submit via AJAX
             headers = {
@@ -798,15 +893,16 @@ class IntelligentFormSubmitter:
             }
             
             response = requests.post(form_action, data=form_data, headers=headers, timeout=30, verify=False)
+            error_message = f"HTTP {response.status_code}" if response.status_code != 200 else self._ajax_rejection(response)
             
             return SubmissionResult(
-                success=response.status_code == 200,
+                success=error_message is None,
                 method_used="ajax_post",
                 response_content=response.text,
-                error_message=None if response.status_code == 200 else f"HTTP {response.status_code}",
+                error_message=error_message,
                 submission_time=time.strftime('%Y-%m-%d %H:%M:%S'),
                 platform_detected=None,
-                fields_submitted=form_data,
+                fields_submitted=fields_submitted,
                 confidence_score=analysis.confidence_score
             )
             
@@ -823,6 +919,21 @@ class IntelligentFormSubmitter:
                 confidence_score=0.0
             )
     
+    def _ajax_rejection(self, response: requests.Response) -> Optional[str]:
+        """Why a form plugin's JSON answer rejected the post, or None when it did not"""
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        status = str(data.get('status', '')).lower()
+        if data.get('success') is False or status in AJAX_FAILURE_STATUSES:
+            return f"Form rejected the post: {data.get('message') or status or 'success=false'}"
+        return None
+    
     def _submit_via_modal(self, url: str, analysis: FormAnalysisResult, message: str, strategy: Dict) -> SubmissionResult:
         """Submit form that appears in a modal/popup"""
         driver = None
@@ -879,7 +990,7 @@ class IntelligentFormSubmitter:
             )
         finally:
             if driver:
-                driver.quit()
+                self._quit_driver(driver)
             # Clean up profile directory
             self._cleanup_profile_directory()
     
@@ -991,63 +1102,19 @@ class IntelligentFormSubmitter:
             return message
     
     def _setup_chrome_driver(self):
-        """Setup Chrome driver with optimized options and unique profile directory"""
-        import tempfile
-        import os
-        import uuid
-        import time
-        
-        options = ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        # Create unique profile directory to avoid conflicts between workers
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = str(int(time.time() * 1000))
-        profile_dir = tempfile.mkdtemp(prefix=f'chrome_ai_{unique_id}_{timestamp}_')
-        options.add_argument(f'--user-data-dir={profile_dir}')
-        
-        # Store profile directory for cleanup
-        self._current_profile_dir = profile_dir
-        
-        # Additional Chrome options for stability
-        options.add_argument('--disable-extensions')
-        options.add_argument('--disable-plugins')
-        options.add_argument('--disable-images')
-        options.add_argument('--disable-web-security')
-        options.add_argument('--allow-running-insecure-content')
-        options.add_argument('--disable-background-networking')
-        options.add_argument('--disable-default-apps')
-        options.add_argument('--disable-sync')
-        options.add_argument('--disable-background-timer-throttling')
-        options.add_argument('--disable-renderer-backgrounding')
-        options.add_argument('--disable-backgrounding-occluded-windows')
-        options.add_argument('--disable-client-side-phishing-detection')
-        options.add_argument('--disable-crash-reporter')
-        options.add_argument('--disable-oopr-debug-crash-dump')
-        options.add_argument('--no-crash-upload')
-        options.add_argument('--disable-gpu-sandbox')
-        options.add_argument('--disable-software-rasterizer')
-        
-        try:
-            driver = webdriver.Chrome(options=options)
-            # Set timeouts
-            driver.set_page_load_timeout(30)
-            driver.implicitly_wait(10)
-            return driver
-        except Exception as e:
-            logger.error(f"Chrome driver setup failed: {e}")
-            # Clean up profile directory on failure
-            try:
-                import shutil
-                shutil.rmtree(profile_dir, ignore_errors=True)
-            except:
-                pass
-            raise e
+        """Check out a Chrome driver from the worker's browser pool"""
+        driver = get_browser_pool().checkout()
+        # Pooled drivers come back with implicit waits reset to 0
+        driver.implicitly_wait(10)
+        return driver
+    
+    def _quit_driver(self, driver):
+        """Return pooled Chrome drivers to the pool and quit anything else (Firefox)"""
+        pool = get_browser_pool()
+        if pool.owns(driver):
+            pool.release(driver)
+        else:
+            driver.quit()
     
     def _cleanup_profile_directory(self):
         """Clean up the current profile directory"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark headless Chrome page-ready time with and without the shared profile
+
+Loads every URL given on the command line (or listed one per line in
+--urls-file) in two fresh Chrome instances:
+
+    baseline  'normal' page loads, every request allowed, fixed 3 s wait
+              (what the Selenium fallbacks did before)
+    profile   the shared profile of scraping.browser_profile: eager page
+              loads, images/fonts/media/trackers blocked, settle wait
+
+and reports driver.get() time, page-ready time (get plus the wait) and
+the number of subresources fetched per page.
+
+Usage:
+    python benchmarks/browser_benchmark.py https://example.com [...] [--urls-file urls.txt] [--repeat 2]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List
+
+# Add the backend directory to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraping.browser_pool import PAGE_LOAD_TIMEOUT, default_chrome_options
+from scraping.browser_profile import apply_request_blocking, wait_for_page_ready
+
+# The fixed wait after driver.get() the Selenium fallbacks used before
+BASELINE_WAIT = 3
+
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, timings_ms: List[float]):
+    print(f"{label:<18} mean {statistics.mean(timings_ms):8.0f} ms   "
+          f"p50 {percentile(timings_ms, 50):8.0f} ms   "
+          f"p95 {percentile(timings_ms, 95):8.0f} ms   "
+          f"max {max(timings_ms):8.0f} ms")
+
+
+def launch(profile: bool):
+    from selenium import webdriver
+
+    profile_dir = tempfile.mkdtemp(prefix='chrome_benchmark_')
+    options = default_chrome_options(profile_dir)
+    if not profile:
+        options.page_load_strategy = 'normal'
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    if profile and not apply_request_blocking(driver, enabled=True):
+        print("Warning: request blocking could not be enabled")
+    return driver, profile_dir
+
+
+def measure(driver, url: str, profile: bool) -> Dict[str, float]:
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    start = time.perf_counter()
+    try:
+        driver.get(url)
+    except Exception as e:
+        print(f"  {url}: {type(e).__name__}")
+    loaded = time.perf_counter()
+    if profile:
+        wait_for_page_ready(driver)
+    else:
+        time.sleep(BASELINE_WAIT)
+    ready = time.perf_counter()
+    try:
+        resources = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+    except Exception:
+        resources = 0
+    return {'load_ms': (loaded - start) * 1000, 'ready_ms': (ready - start) * 1000, 'resources': resources}
+
+
+def run(urls: List[str], profile: bool, repeat: int) -> Dict[str, List[float]]:
+    driver, profile_dir = launch(profile)
+    results = {'load_ms': [], 'ready_ms': [], 'resources': []}
+    try:
+        for url in urls:
+            runs = [measure(driver, url, profile) for _ in range(max(1, repeat))]
+            best = min(runs, key=lambda r: r['ready_ms'])
+            for key in results:
+                results[key].append(best[key])
+    finally:
+        driver.quit()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Chrome page-ready time with and without the shared profile")
+    parser.add_argument('urls', nargs='*', help="pages to load")
+    parser.add_argument('--urls-file', help="file with one URL per line")
+    parser.add_argument('--repeat', type=int, default=2, help="loads per page, the fastest is kept (default: 2)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    urls = list(args.urls)
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not urls:
+        print("No URLs given")
+        return 1
+
+    print(f"=== BROWSER BENCHMARK: {len(urls)} pages ===")
+    for label, profile in (('baseline', False), ('profile', True)):
+        results = run(urls, profile, args.repeat)
+        print(f"--- {label} ---")
+        report('driver.get', results['load_ms'])
+        report('page ready', results['ready_ms'])
+        print(f"{'resources/page':<18} mean {statistics.mean(results['resources']):8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Local fixture web server for scraping benchmarks
+
+Serves a corpus of websites, each on its own loopback address
+(127.0.1.1, 127.0.1.2, ... on Linux the whole 127/8 block is local), so
+per-host politeness, connection limits and host caches behave as they do
+against real sites, without any network access.
+
+The corpus is either generated (homepage, about page and contact page per
+site, in a mix of layouts: contact link, contact page only reachable by
+crawling, embedded form widget, broken contact link, no contact page) or
+read from a directory of recorded sites (see benchmarks/record_corpus.py):
+
+    <corpus>/<site>/manifest.json   {"origin": "https://www.example.com",
+                                     "pages": {"/": "index.html", "/about-us": "about-us.html"}}
+    <corpus>/<site>/<page files>
+
+Links to a recorded site's original origin are rewritten to its fixture
+address. Network conditions are set per run: latency and jitter on every
+response, and seeded fractions of sites that answer 500, redirect their
+homepage or trickle their bodies slowly.
+
+Usage:
+    python benchmarks/fixture_server.py --sites 50 [--corpus DIR] [--latency-ms 80] [--port 8800]
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+DEFAULT_PORT = 8800
+
+# Site layouts of the generated corpus
+LAYOUT_LINK = 'link'              # homepage links to a contact page with a form
+LAYOUT_CRAWL = 'crawl'            # contact page exists but the homepage does not link it
+LAYOUT_WIDGET = 'widget'          # homepage embeds a form builder
+LAYOUT_BROKEN = 'broken'          # homepage contact link answers 404
+LAYOUT_NONE = 'none'              # no contact form anywhere
+
+INDUSTRIES = [
+    ('Plumbing', 'plumbing repair, drain cleaning and water heater installation'),
+    ('Dental', 'family dentistry, teeth cleaning, implants and cosmetic dental care'),
+    ('Law', 'personal injury law, estate planning and business litigation attorneys'),
+    ('Roofing', 'roof replacement, shingle repair and storm damage inspections'),
+    ('Insurance', 'auto insurance, home insurance and life insurance policies'),
+    ('Auto Dealer', 'new and used cars, auto financing and vehicle service'),
+    ('Accounting', 'tax preparation, bookkeeping and payroll services for small business'),
+    ('Restaurant', 'farm to table dining, catering and private events')
+]
+
+
+@dataclass
+class FixtureSite:
+    """One website of the corpus"""
+    name: str
+    pages: Dict[str, str]                   # path -> HTML
+    origin: Optional[str] = None            # recorded origin, rewritten to the fixture address
+    layout: str = LAYOUT_LINK
+    address: str = ''
+    failing: bool = False                   # answers 500 to every request
+    redirecting: bool = False               # homepage redirects to /home
+    slow: bool = False                      # bodies trickle in chunks
+    body_cache: Dict[str, bytes] = field(default_factory=dict)
+
+
+def site_address(index: int) -> str:
+    """Loopback address of the index-th site (254 sites per 127.0.x.0/24)"""
+    return f"127.0.{1 + index // 254}.{1 + index % 254}"
+
+
+def _filler(rng: random.Random, words: str, target_bytes: int) -> str:
+    """Product cards and an inline JSON blob, the bulk of a real page"""
+    cards = []
+    size = 0
+    index = 0
+    while size < target_bytes * 0.6:
+        card = (f'<div class="card col-md-4" data-id="{index}"><img src="/img/item{index}.jpg" alt="Item {index}">'
+                f'<h3>Service {index}</h3><p>We offer {words} with {rng.randint(5, 40)} years of experience '
+                f'serving clients across the region.</p><a class="btn" href="/services#item{index}">Learn more</a></div>')
+        cards.append(card)
+        size += len(card)
+        index += 1
+    state = json.dumps({'products': [{'id': i, 'name': f'Item {i}', 'price': rng.randint(10, 999)}
+                                     for i in range(max(1, int(target_bytes * 0.4) // 40))]})
+    return ('<section class="services"><div class="row">' + ''.join(cards) + '</div></section>'
+            f'<script>window.__INITIAL_STATE__ = {state};</script>')
+
+
+def _page(title: str, nav: str, body: str) -> str:
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{title}</title>'
+            f'<meta name="description" content="{title}"><link rel="stylesheet" href="/css/site.css">'
+            f'<script src="https://www.googletagmanager.com/gtag/js?id=G-TEST"></script></head>'
+            f'<body><header><nav class="navbar">{nav}</nav></header><main>{body}</main>'
+            f'<footer><p>&copy; 2024 {title.split("|")[0].strip()}. All rights reserved.</p>'
+            f'<a href="/privacy">Privacy Policy</a> <a href="/terms">Terms</a></footer></body></html>')
+
+
+def generate_site(index: int, layout: str, rng: random.Random, page_kb: int) -> FixtureSite:
+    industry, words = INDUSTRIES[index % len(INDUSTRIES)]
+    company = f"{rng.choice(['Summit', 'Riverside', 'Oakwood', 'Harbor', 'Pioneer', 'Lakeside'])} {industry} {index}"
+    contact_path = '/contact-us'
+
+    nav_links = ['<a href="/">Home</a>', '<a href="/about-us">About Us</a>', '<a href="/services">Services</a>']
+    if layout in (LAYOUT_LINK, LAYOUT_BROKEN):
+        nav_links.append(f'<a href="{contact_path}">Contact Us</a>')
+    nav = ' '.join(nav_links)
+
+    widget = ''
+    if layout == LAYOUT_WIDGET:
+        widget = ('<div class="hs-form-frame"></div><script src="//js.hsforms.net/forms/embed/v2.js"></script>'
+                  f'<script>hbspt.forms.create({{portalId: "{100000 + index}", '
+                  f'formId: "8c3e4f1a-2b5d-4c6e-9f7a-{index:012d}"}});</script>')
+
+    home_body = (f'<section class="hero"><h1>{company}</h1><p>Trusted {industry.lower()} company offering {words}.</p>'
+                 f'</section>{widget}' + _filler(rng, words, page_kb * 1024))
+    about_body = ''.join(
+        f'<p>{company} has provided {words} since {1980 + index % 40}. Our team of licensed professionals '
+        f'is committed to quality workmanship, honest pricing and customer service on every project.</p>'
+        for _ in range(6)
+    )
+    contact_body = ('<h1>Contact Us</h1><form action="/contact-submit" method="post">'
+                    '<input type="text" name="name" placeholder="Your Name">'
+                    '<input type="email" name="email" placeholder="Email">'
+                    '<input type="tel" name="phone" placeholder="Phone">'
+                    '<textarea name="message" placeholder="How can we help?"></textarea>'
+                    '<button type="submit">Send Message</button></form>')
+
+    pages = {
+        '/': _page(f"{company} | {industry} Services", nav, home_body),
+        '/about-us': _page(f"About {company}", nav, about_body),
+        '/services': _page(f"Services | {company}", nav, _filler(rng, words, page_kb * 512))
+    }
+    if layout in (LAYOUT_LINK, LAYOUT_CRAWL):
+        pages[contact_path] = _page(f"Contact | {company}", nav, contact_body)
+    return FixtureSite(name=f"site{index}", pages=pages, layout=layout)
+
+
+def generate_corpus(count: int, seed: int = 1, page_kb: int = 60, crawl_rate: float = 0.1,
+                    widget_rate: float = 0.05, broken_link_rate: float = 0.05,
+                    no_contact_rate: float = 0.05) -> List[FixtureSite]:
+    """count generated sites with the given layout mix"""
+    rng = random.Random(seed)
+    sites = []
+    for index in range(count):
+        roll = rng.random()
+        layout = LAYOUT_LINK
+        for rate, candidate in ((crawl_rate, LAYOUT_CRAWL), (widget_rate, LAYOUT_WIDGET),
+                                (broken_link_rate, LAYOUT_BROKEN), (no_contact_rate, LAYOUT_NONE)):
+            if roll < rate:
+                layout = candidate
+                break
+            roll -= rate
+        sites.append(generate_site(index, layout, rng, page_kb))
+    return sites
+
+
+def load_corpus(directory: str, count: Optional[int] = None) -> List[FixtureSite]:
+    """Recorded sites of a corpus directory (repeated to reach count when given)"""
+    sites = []
+    for name in sorted(os.listdir(directory)):
+        manifest_path = os.path.join(directory, name, 'manifest.json')
+        if not os.path.isfile(manifest_path):
+            continue
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        pages = {}
+        for path, filename in manifest['pages'].items():
+            with open(os.path.join(directory, name, filename), encoding='utf-8', errors='replace') as f:
+                pages[path] = f.read()
+        sites.append(FixtureSite(name=name, pages=pages, origin=manifest.get('origin'), layout='recorded'))
+    if not sites:
+        raise ValueError(f"No recorded sites (*/manifest.json) in {directory}")
+    if count and count > len(sites):
+        sites = [FixtureSite(name=f"{site.name}-{i // len(sites)}", pages=site.pages, origin=site.origin,
+                             layout=site.layout) for i, site in enumerate(sites * (count // len(sites) + 1))][:count]
+    return sites[:count] if count else sites
+
+
+class FixtureServer:
+    """aiohttp app answering for every site on its own loopback address"""
+
+    def __init__(self, sites: List[FixtureSite], port: int = DEFAULT_PORT, latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0.0, redirect_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_body_seconds: float = 2.0, seed: int = 1):
+        self.sites = sites
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_body_seconds = slow_body_seconds
+        self._rng = random.Random(seed)
+        self._by_host: Dict[str, FixtureSite] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        for index, site in enumerate(sites):
+            site.address = site_address(index)
+            site.failing = self._rng.random() < error_rate
+            site.redirecting = self._rng.random() < redirect_rate
+            site.slow = self._rng.random() < slow_rate
+            self._by_host[site.address] = site
+
+    def url(self, site: FixtureSite) -> str:
+        return f"http://{site.address}:{self.port}/"
+
+    def urls(self) -> List[str]:
+        return [self.url(site) for site in self.sites]
+
+    def _body(self, site: FixtureSite, path: str) -> Optional[bytes]:
+        if path not in site.body_cache:
+            html = site.pages.get(path)
+            if html is None:
+                return None
+            if site.origin:
+                fixture_origin = f"http://{site.address}:{self.port}"
+                bare = site.origin.split('://', 1)[-1].rstrip('/')
+                for variant in {bare, bare[4:] if bare.startswith('www.') else 'www.' + bare}:
+                    for scheme in ('https://', 'http://', '//'):
+                        html = html.replace(scheme + variant, fixture_origin)
+            site.body_cache[path] = html.encode('utf-8')
+        return site.body_cache[path]
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        site = self._by_host.get(request.host.rsplit(':', 1)[0])
+        if site is None:
+            return web.Response(status=421, text='Unknown fixture host')
+
+        delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        path = request.path
+        if path == '/robots.txt':
+            return web.Response(text='User-agent: *\nAllow: /\n', content_type='text/plain')
+        if site.failing:
+            return web.Response(status=500, text='Internal Server Error')
+        if site.redirecting and path == '/':
+            raise web.HTTPMovedPermanently('/home')
+        if site.redirecting and path == '/home':
+            path = '/'
+
+        body = self._body(site, path)
+        if body is None:
+            return web.Response(status=404, text='Not Found', content_type='text/html')
+        if not site.slow:
+            return web.Response(body=body, content_type='text/html', charset='utf-8')
+
+        # Trickle the body in ten chunks over slow_body_seconds
+        response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+        response.content_length = len(body)
+        await response.prepare(request)
+        chunk = max(1, len(body) // 10)
+        for start in range(0, len(body), chunk):
+            await response.write(body[start:start + chunk])
+            await asyncio.sleep(self.slow_body_seconds / 10)
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('GET', '/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        for address in self._by_host:
+            await web.TCPSite(self._runner, address, self.port, backlog=512).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for site in self.sites:
+            counts[site.layout] = counts.get(site.layout, 0) + 1
+        counts.update({
+            'failing': sum(site.failing for site in self.sites),
+            'redirecting': sum(site.redirecting for site in self.sites),
+            'slow': sum(site.slow for site in self.sites)
+        })
+        return counts
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Corpus and network condition options shared with the benchmark"""
+    parser.add_argument('--sites', type=int, default=50, help="number of sites (default: 50)")
+    parser.add_argument('--corpus', help="directory of recorded sites; generated pages when omitted")
+    parser.add_argument('--page-kb', type=int, default=60, help="size of generated homepages (default: 60)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port on every site address (default: {DEFAULT_PORT})")
+    parser.add_argument('--latency-ms', type=float, default=50, help="delay before every response (default: 50)")
+    parser.add_argument('--jitter-ms', type=float, default=20, help="random +/- on the delay (default: 20)")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="fraction of sites answering 500 (default: 0.05)")
+    parser.add_argument('--redirect-rate', type=float, default=0.1, help="fraction of sites redirecting / to /home (default: 0.1)")
+    parser.add_argument('--slow-rate', type=float, default=0.05, help="fraction of sites with slow bodies (default: 0.05)")
+    parser.add_argument('--slow-body-seconds', type=float, default=2.0, help="time to send a slow body (default: 2)")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the corpus and condition assignment (default: 1)")
+
+
+def server_from_args(args: argparse.Namespace) -> FixtureServer:
+    sites = load_corpus(args.corpus, args.sites) if args.corpus else generate_corpus(args.sites, args.seed, args.page_kb)
+    return FixtureServer(sites, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                         error_rate=args.error_rate, redirect_rate=args.redirect_rate, slow_rate=args.slow_rate,
+                         slow_body_seconds=args.slow_body_seconds, seed=args.seed)
+
+
+async def serve_forever(server: FixtureServer, ready=None):
+    await server.start()
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fixture website corpus on loopback addresses")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args)
+    print(f"Serving {len(server.sites)} sites on port {args.port}: {server.summary()}")
+    for url in server.urls()[:5]:
+        print(f"  {url}")
+    try:
+        asyncio.run(serve_forever(server))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
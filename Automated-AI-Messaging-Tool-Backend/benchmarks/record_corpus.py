@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Record live websites as a fixture corpus for the scraping benchmark
+
+Scrapes every URL given on the command line (or listed one per line in
+--urls-file) with scrape_website_data, keeping every fetched page in a
+private local snapshot store, then writes each site's homepage and the
+sub-pages the scraper fetched (about page, contact page, crawl
+candidates) in the layout benchmarks/fixture_server.py --corpus reads:
+
+    <output>/<host>/manifest.json
+    <output>/<host>/<page files>
+
+Pages that answered with an error are not written; the fixture server
+answers 404 for them.
+
+Usage:
+    python benchmarks/record_corpus.py https://example.com [...] [--urls-file urls.txt] --output corpus/
+"""
+import os
+import re
+import sys
+import json
+import logging
+import argparse
+import tempfile
+from urllib.parse import urlparse
+
+# Snapshots must be on, and private to this run, before the scraping modules are imported
+SNAPSHOT_DIR = tempfile.mkdtemp(prefix='record_corpus_')
+os.environ['SCRAPER_SNAPSHOTS'] = 'true'
+os.environ['SCRAPER_SNAPSHOT_BACKEND'] = 'local'
+os.environ['SCRAPER_SNAPSHOT_DIR'] = SNAPSHOT_DIR
+os.environ.setdefault('SCRAPER_RESULT_CACHE', 'false')
+os.environ.setdefault('SCRAPER_RESPONSE_CACHE', 'false')
+
+# Add the backend directory to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from celery_tasks.scraping_tasks import scrape_website_data
+from scraping.snapshot_store import get_snapshot_store
+
+
+def page_filename(path: str) -> str:
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', path.strip('/')) or 'index'
+    return f"{name}.html"
+
+
+def stored_records(kind: str):
+    directory = os.path.join(SNAPSHOT_DIR, kind)
+    if not os.path.isdir(directory):
+        return
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename)) as f:
+            yield json.load(f)
+
+
+def export_site(store, url: str, pages_by_host, output: str) -> bool:
+    """Write one scraped site to the corpus; False when its homepage was not fetched"""
+    site = store.get_site(url)
+    if site is None:
+        return False
+    page_url = urlparse(site['page_url'])
+    origin = f"{page_url.scheme}://{page_url.netloc}"
+    site_dir = os.path.join(output, page_url.netloc.replace(':', '_'))
+    os.makedirs(site_dir, exist_ok=True)
+
+    # The benchmark requests '/', whatever path the homepage was fetched from
+    pages = {'/': site['content']}
+    for record in pages_by_host.get(page_url.netloc, []):
+        path = urlparse(record['final_url']).path or '/'
+        if path != '/' and path not in pages:
+            page = store.get_page(record['url'])
+            if page and page['content'] is not None:
+                pages[path] = page['content']
+
+    manifest = {'origin': origin, 'pages': {}}
+    for path, content in pages.items():
+        filename = page_filename(path)
+        with open(os.path.join(site_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+        manifest['pages'][path] = filename
+    with open(os.path.join(site_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"  ✅ {url}: {len(pages)} pages")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live websites as a fixture corpus")
+    parser.add_argument('urls', nargs='*', help="websites to record")
+    parser.add_argument('--urls-file', help="file with one URL per line")
+    parser.add_argument('--output', required=True, help="corpus directory to write")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    urls = list(args.urls)
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not urls:
+        print("No URLs given")
+        return 1
+
+    store = get_snapshot_store()
+    if store is None:
+        print("Page snapshots are unavailable (is zstandard installed?)")
+        return 1
+
+    print(f"=== RECORDING {len(urls)} websites ===")
+    for url in urls:
+        website_data = scrape_website_data(url)
+        if website_data['scrapingStatus'] != 'COMPLETED':
+            print(f"  ❌ {url}: {website_data['error_message']}")
+    store.flush()
+
+    pages_by_host = {}
+    for record in stored_records('pages'):
+        pages_by_host.setdefault(urlparse(record['final_url']).netloc, []).append(record)
+
+    recorded = sum(export_site(store, url, pages_by_host, args.output) for url in urls)
+    print(f"\n🎯 Recorded {recorded}/{len(urls)} websites in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
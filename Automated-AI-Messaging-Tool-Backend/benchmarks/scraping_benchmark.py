@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end website scraping against the local fixture server
+
+Starts benchmarks/fixture_server.py in a subprocess (no network needed)
+and scrapes its sites through the production code paths:
+
+    single  scrape_website_data per site on a thread pool, as the sync
+            Celery path and the retry tasks do
+    batch   scrape_and_save_websites over the whole list, as one
+            scrape_website_batch_task does, with results kept in memory
+            instead of PostgreSQL
+
+Reports sites/sec, p50/p95/max latency per site, how many sites succeeded
+and had a contact form, CPU time per site (this process and its parse
+workers) and peak/added memory. Result and response caches, page
+snapshots and Selenium are off unless asked for, so every run does the
+same work and runs can be compared across commits.
+
+Usage:
+    python benchmarks/scraping_benchmark.py --sites 100 [--mode both] [--concurrency 20] 2>/dev/null
+    python benchmarks/scraping_benchmark.py --corpus recorded/ --latency-ms 150 --error-rate 0.1 --json out.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+# Add the backend directory to Python path
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(BENCHMARK_DIR, "..")))
+
+from fixture_server import add_server_arguments, generate_corpus, load_corpus, site_address
+
+# Seconds to wait for the fixture server to listen
+SERVER_START_TIMEOUT = 30
+
+# Memory sampling interval, in seconds
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def configure_environment(args: argparse.Namespace):
+    """Settings read at import time by the scraping modules; explicit env vars win"""
+    os.environ.setdefault('SCRAPER_CACHE_BACKEND', 'sqlite')
+    os.environ.setdefault('SCRAPER_CACHE_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='scraping_benchmark_'), 'cache.sqlite3'))
+    os.environ.setdefault('SCRAPER_RESULT_CACHE', 'false')
+    os.environ.setdefault('SCRAPER_RESPONSE_CACHE', 'false')
+    os.environ.setdefault('SCRAPER_SNAPSHOTS', 'false')
+    os.environ.setdefault('SCRAPER_SELENIUM', 'true' if args.selenium else 'false')
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(BENCHMARK_DIR, 'fixture_server.py'),
+               '--sites', str(args.sites), '--page-kb', str(args.page_kb), '--port', str(args.port),
+               '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+               '--error-rate', str(args.error_rate), '--redirect-rate', str(args.redirect_rate),
+               '--slow-rate', str(args.slow_rate), '--slow-body-seconds', str(args.slow_body_seconds),
+               '--seed', str(args.seed)]
+    if args.corpus:
+        command += ['--corpus', args.corpus]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    # Listening on the last address means every site is up
+    last_address = site_address(args.sites - 1)
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Fixture server exited: {server.stdout.read()}")
+        try:
+            socket.create_connection((last_address, args.port), timeout=1).close()
+            print(server.stdout.readline().strip())
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Fixture server did not listen on {last_address}:{args.port}")
+
+
+class ResourceMeter:
+    """CPU time of this process and its children, and sampled RSS"""
+
+    def __init__(self):
+        import psutil
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+        self.peak_rss = 0
+        self.start_rss = 0
+
+    def _processes(self):
+        processes = [self._process]
+        try:
+            processes.extend(self._process.children(recursive=True))
+        except Exception:
+            pass
+        return processes
+
+    def _totals(self):
+        cpu = 0.0
+        rss = 0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                cpu += times.user + times.system
+                rss += process.memory_info().rss
+            except Exception:
+                pass
+        return cpu, rss
+
+    def _sample(self):
+        while not self._stop.wait(MEMORY_SAMPLE_INTERVAL):
+            self.peak_rss = max(self.peak_rss, self._totals()[1])
+
+    def __enter__(self):
+        self.start_cpu, self.start_rss = self._totals()
+        self.peak_rss = self.start_rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        # Read CPU before stopping: pool workers may exit with the run
+        self.end_cpu, self.end_rss = self._totals()
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.end_rss)
+
+
+def run_single(urls: List[str], concurrency: int) -> List[Dict[str, Any]]:
+    """scrape_website_data per site on a thread pool"""
+    from celery_tasks.scraping_tasks import scrape_website_data
+
+    def timed(url):
+        start = time.perf_counter()
+        website_data = scrape_website_data(url)
+        return {'latency_ms': (time.perf_counter() - start) * 1000, 'data': website_data}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, urls))
+
+
+class MemoryResults:
+    """The DatabaseManager methods scrape_and_save_websites uses, keeping rows in memory"""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+
+    def get_website_by_url(self, url, fileUploadId=None):
+        # No stored record: no CSV contact form URL, no follow-up tasks sent
+        return None
+
+    def update_websites_batch(self, update, rows):
+        # Scraping results arrive from the write-behind writer, keyed by URL
+        keys = []
+        for row in rows:
+            fields = dict(zip((column for column, _ in update.columns), row))
+            self.rows[fields['websiteUrl']] = {
+                'scrapingStatus': fields['scrapingStatus'],
+                'has_contact_form': fields['hasContactForm']
+            }
+            keys.append(tuple(fields[column] for column in update.key))
+        return keys
+
+
+class NoProgress:
+    """Stands in for the bound Celery task"""
+
+    def update_state(self, state=None, meta=None):
+        pass
+
+
+def run_batch(urls: List[str]) -> List[Dict[str, Any]]:
+    """scrape_and_save_websites over every site, timing each AsyncScrapeEngine.scrape call"""
+    from celery_tasks.scraping_tasks import scrape_and_save_websites
+    from scraping.async_engine import AsyncScrapeEngine
+
+    timings: Dict[str, float] = {}
+    scrape = AsyncScrapeEngine.scrape
+
+    async def timed_scrape(engine, url, csv_contact_form_url=None):
+        start = time.perf_counter()
+        try:
+            return await scrape(engine, url, csv_contact_form_url)
+        finally:
+            timings[url] = (time.perf_counter() - start) * 1000
+
+    results = MemoryResults()
+    AsyncScrapeEngine.scrape = timed_scrape
+    try:
+        asyncio.run(scrape_and_save_websites('benchmark-upload', 'benchmark-user', urls, NoProgress(), results))
+    finally:
+        AsyncScrapeEngine.scrape = scrape
+
+    return [{'latency_ms': timings.get(url, 0.0), 'data': results.rows.get(url)} for url in urls]
+
+
+def summarize(mode: str, results: List[Dict[str, Any]], elapsed: float, meter: ResourceMeter) -> Dict[str, Any]:
+    latencies = [r['latency_ms'] for r in results]
+    rows = [r['data'] for r in results if r['data']]
+    sites = len(results)
+    return {
+        'mode': mode,
+        'sites': sites,
+        'elapsed_s': round(elapsed, 3),
+        'sites_per_s': round(sites / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'max_ms': round(max(latencies), 1),
+        'completed': sum(1 for row in rows if row.get('scrapingStatus') == 'COMPLETED'),
+        'contact_forms': sum(1 for row in rows if row.get('has_contact_form')),
+        'cpu_ms_per_site': round((meter.end_cpu - meter.start_cpu) * 1000 / sites, 2),
+        'peak_rss_mb': round(meter.peak_rss / 2 ** 20, 1),
+        'rss_kb_per_site': round(max(0, meter.peak_rss - meter.start_rss) / 1024 / sites, 1)
+    }
+
+
+def report(summary: Dict[str, Any]):
+    print(f"--- {summary['mode']} ---")
+    print(f"throughput   {summary['sites_per_s']:8.2f} sites/s   ({summary['sites']} sites in {summary['elapsed_s']:.1f} s)")
+    print(f"latency      p50 {summary['p50_ms']:8.0f} ms   p95 {summary['p95_ms']:8.0f} ms   max {summary['max_ms']:8.0f} ms")
+    print(f"results      {summary['completed']} completed, {summary['contact_forms']} with a contact form")
+    print(f"resources    {summary['cpu_ms_per_site']:.1f} CPU ms/site   peak RSS {summary['peak_rss_mb']:.1f} MB   "
+          f"+{summary['rss_kb_per_site']:.1f} KB/site")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark website scraping against a local fixture server")
+    add_server_arguments(parser)
+    parser.add_argument('--mode', choices=['single', 'batch', 'both'], default='both', help="code path to run (default: both)")
+    parser.add_argument('--concurrency', type=int, default=20, help="threads of the single mode (default: 20)")
+    parser.add_argument('--selenium', action='store_true', help="keep the Selenium passes on (needs Chrome)")
+    parser.add_argument('--json', help="also write the summaries to this file")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    logging.disable(logging.WARNING)
+
+    # Same corpus and address assignment as the server subprocess
+    sites = load_corpus(args.corpus, args.sites) if args.corpus else generate_corpus(args.sites, args.seed, args.page_kb)
+    args.sites = len(sites)
+    urls = [f"http://{site_address(index)}:{args.port}/" for index in range(len(sites))]
+
+    server = start_server(args)
+    summaries = []
+    try:
+        print(f"=== SCRAPING BENCHMARK: {len(urls)} sites, {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms latency ===")
+        modes = ['single', 'batch'] if args.mode == 'both' else [args.mode]
+        for mode in modes:
+            with ResourceMeter() as meter:
+                start = time.perf_counter()
+                results = run_single(urls, args.concurrency) if mode == 'single' else run_batch(urls)
+                elapsed = time.perf_counter() - start
+            summary = summarize(mode, results, elapsed, meter)
+            summaries.append(summary)
+            report(summary)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': {k: v for k, v in vars(args).items() if k != 'json'}, 'results': summaries}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
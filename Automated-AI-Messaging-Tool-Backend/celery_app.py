@@ -3,6 +3,7 @@ Celery configuration for AI Messaging Backend
 """
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_shutdown
 import os
 from dotenv import load_dotenv
 
@@ -60,6 +61,12 @@ celery_app.conf.update(
 # Optional: Configure task result backend for better monitoring
 celery_app.conf.result_backend = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+@worker_process_shutdown.connect
+def shutdown_parse_pool(**kwargs):
+    """Reap the parse processes before a prefork child exits (see scraping.parse_pool)"""
+    from scraping.parse_pool import shutdown_parse_executor
+    shutdown_parse_executor()
+
 # Import tasks to ensure they are registered
 import celery_tasks.scraping_tasks
 import celery_tasks.file_tasks
@@ -525,10 +525,11 @@ def extract_websites_from_file_task(self, file_path: str, file_type: str, fileUp
             website_data_list.append(website_data)
         
         if website_data_list:
-            success = db.create_websites_batch(website_data_list)
-            if not success:
+            counts = db.create_websites_batch(website_data_list)
+            if counts is None:
                 logger.error("Failed to save websites to database")
                 raise Exception("Database save failed")
+            logger.info(f"Saved websites: {counts['created']} new, {counts['skipped']} already stored")
         
         # Update file upload with website count and status
         if fileUploadId:
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from database.database_manager import DatabaseManager
+from database.write_behind import SUBMISSION_UPDATE, WebsiteWriteBehind
 import os
 import random
 import json
@@ -868,76 +869,76 @@ def contact_form_submission_task(self, websites_with_messages: List[Dict], user_
         successful_submissions = 0
         failed_submissions = 0
         
-        for i, website in enumerate(websites_with_messages):
-            try:
-                # Skip if no contact form URL
-                if not website.get('contactFormUrl'):
-                    logger.info(f"Skipping {website.get('websiteUrl', 'Unknown')} - no contact form URL")
-                    continue
+        # Results are written through a write-behind writer, drained when the loop ends or fails
+        with WebsiteWriteBehind(DatabaseManager(), SUBMISSION_UPDATE) as writer:
+            for i, website in enumerate(websites_with_messages):
+                try:
+                    # Skip if no contact form URL
+                    if not website.get('contactFormUrl'):
+                        logger.info(f"Skipping {website.get('websiteUrl', 'Unknown')} - no contact form URL")
+                        continue
                 
-                logger.info(f"Processing {website.get('websiteUrl', 'Unknown')} - contact form: {website.get('contactFormUrl')}")
+                    logger.info(f"Processing {website.get('websiteUrl', 'Unknown')} - contact form: {website.get('contactFormUrl')}")
                 
-                # 1. Detect form structure
-                form_data = submitter.detect_contact_form_fields(website['contactFormUrl'])
+                    # 1. Detect form structure
+                    form_data = submitter.detect_contact_form_fields(website['contactFormUrl'])
                 
-                if not form_data:
-                    logger.warning(f"Could not detect form structure for {website['websiteUrl']}")
-                    failed_submissions += 1
-                    continue
+                    if not form_data:
+                        logger.warning(f"Could not detect form structure for {website['websiteUrl']}")
+                        failed_submissions += 1
+                        continue
                 
-                # 2. Submit form
-                submission_result = submitter.submit_contact_form(
-                    form_data=form_data,
-                    generated_message=website['generatedMessage']
-                )
+                    # 2. Submit form
+                    submission_result = submitter.submit_contact_form(
+                        form_data=form_data,
+                        generated_message=website['generatedMessage']
+                    )
                 
-                # 3. Update database
-                db_manager = DatabaseManager()
-                success = db_manager.update_website_submission(
-                    website_id=website.get('id'),
-                    submission_status="SUBMITTED" if submission_result['success'] else "FAILED",
-                    submission_time=submission_result['submission_time'],
-                    response_content=submission_result.get('response_page', ''),
-                    error_message=submission_result.get('error', ''),
-                    submitted_form_fields=json.dumps(submission_result.get('fields_submitted', {}))
-                )
+                    # 3. Queue the database update (written in batches)
+                    writer.add({
+                        'id': website.get('id'),
+                        'submissionStatus': "SUBMITTED" if submission_result['success'] else "FAILED",
+                        'submissionResponse': submission_result.get('response_page', ''),
+                        'submissionError': submission_result.get('error', ''),
+                        'submittedFormFields': json.dumps(submission_result.get('fields_submitted', {}))
+                    })
                 
-                submission_results.append({
-                    'website_id': website.get('id'),
-                    'url': website.get('websiteUrl'),
-                    'contact_form_url': website.get('contactFormUrl'),
-                    'success': submission_result['success'],
-                    'submission_time': submission_result['submission_time'],
-                    'error': submission_result.get('error')
-                })
+                    submission_results.append({
+                        'website_id': website.get('id'),
+                        'url': website.get('websiteUrl'),
+                        'contact_form_url': website.get('contactFormUrl'),
+                        'success': submission_result['success'],
+                        'submission_time': submission_result['submission_time'],
+                        'error': submission_result.get('error')
+                    })
                 
-                if submission_result['success']:
-                    successful_submissions += 1
-                    logger.info(f"Successfully submitted form for {website.get('websiteUrl')}")
-                else:
-                    failed_submissions += 1
-                    logger.warning(f"Failed to submit form for {website.get('websiteUrl')}: {submission_result.get('error')}")
+                    if submission_result['success']:
+                        successful_submissions += 1
+                        logger.info(f"Successfully submitted form for {website.get('websiteUrl')}")
+                    else:
+                        failed_submissions += 1
+                        logger.warning(f"Failed to submit form for {website.get('websiteUrl')}: {submission_result.get('error')}")
                 
-                # 4. Update progress
-                progress = int((i + 1) / total_websites * 100)
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i + 1,
-                        'total': total_websites,
-                        'progress': progress,
-                        'successful_submissions': successful_submissions,
-                        'failed_submissions': failed_submissions
-                    }
-                )
+                    # 4. Update progress
+                    progress = int((i + 1) / total_websites * 100)
+                    self.update_state(
+                        state='PROGRESS',
+                        meta={
+                            'current': i + 1,
+                            'total': total_websites,
+                            'progress': progress,
+                            'successful_submissions': successful_submissions,
+                            'failed_submissions': failed_submissions
+                        }
+                    )
                 
-                # Rate limiting
-                time.sleep(random.uniform(2, 5))
+                    # Rate limiting
+                    time.sleep(random.uniform(2, 5))
                 
-            except Exception as e:
-                failed_submissions += 1
-                logger.error(f"Error submitting form for {website.get('websiteUrl', 'Unknown')}: {e}")
-                continue
+                except Exception as e:
+                    failed_submissions += 1
+                    logger.error(f"Error submitting form for {website.get('websiteUrl', 'Unknown')}: {e}")
+                    continue
         
         logger.info(f"Form submission completed. Successful: {successful_submissions}, Failed: {failed_submissions}")
         
@@ -1016,54 +1017,54 @@ def submit_contact_forms_task(self, websites_with_messages: List[Dict], message_
         except Exception as e:
             logger.error(f"❌ Ultra-fast submission failed, falling back to sequential: {e}")
             # Fallback to original sequential processing
-            for i, website in enumerate(websites_with_messages):
-                # Skip if no contact form URL
-                if not website.get('contactFormUrl'):
-                    logger.info(f"Skipping {website.get('websiteUrl', 'Unknown')} - no contact form URL")
-                    failed_submissions += 1
-                    continue
+            # Results are written through a write-behind writer, drained before the upload status is set
+            with WebsiteWriteBehind(db_manager, SUBMISSION_UPDATE) as writer:
+                for i, website in enumerate(websites_with_messages):
+                    # Skip if no contact form URL
+                    if not website.get('contactFormUrl'):
+                        logger.info(f"Skipping {website.get('websiteUrl', 'Unknown')} - no contact form URL")
+                        failed_submissions += 1
+                        continue
                 
-                # Process single website (no retries for speed)
-                try:
-                    logger.info(f"Processing {website.get('websiteUrl', 'Unknown')} - contact form: {website.get('contactFormUrl')}")
+                    # Process single website (no retries for speed)
+                    try:
+                        logger.info(f"Processing {website.get('websiteUrl', 'Unknown')} - contact form: {website.get('contactFormUrl')}")
                     
-                    # Try specialized form handling first
-                    if website.get('contactFormUrl'):
-                        submission_result = submitter.handle_specialized_form_types(
-                            form_url=website['contactFormUrl'],
-                            website_data=website,
-                            generated_message=website['generatedMessage']
-                        )
-                    else:
-                        # Fallback to AI-powered intelligent form submission
-                        submission_result = submitter.submit_contact_form_intelligent(
-                            website_data=website,
-                            generated_message=website['generatedMessage']
-                        )
+                        # Try specialized form handling first
+                        if website.get('contactFormUrl'):
+                            submission_result = submitter.handle_specialized_form_types(
+                                form_url=website['contactFormUrl'],
+                                website_data=website,
+                                generated_message=website['generatedMessage']
+                            )
+                        else:
+                            # Fallback to AI-powered intelligent form submission
+                            submission_result = submitter.submit_contact_form_intelligent(
+                                website_data=website,
+                                generated_message=website['generatedMessage']
+                            )
                     
-                    # Update database
-                    if submission_result.get('success'):
-                        db_manager.update_website_submission(
-                            website_id=website.get('id'),
-                            submission_status="SUBMITTED",
-                            submission_time=submission_result.get('submission_time', datetime.now().isoformat()),
-                            response_content=submission_result.get('response_content', ''),
-                            submitted_form_fields=json.dumps(submission_result.get('fields_submitted', {}))
-                        )
-                        successful_submissions += 1
-                    else:
-                        db_manager.update_website_submission(
-                            website_id=website.get('id'),
-                            submission_status="FAILED",
-                            submission_time=submission_result.get('submission_time', datetime.now().isoformat()),
-                            error_message=submission_result.get('error', 'Unknown error'),
-                            submitted_form_fields=json.dumps(submission_result.get('fields_submitted', {}))
-                        )
-                        failed_submissions += 1
+                        # Update database
+                        if submission_result.get('success'):
+                            writer.add({
+                                'id': website.get('id'),
+                                'submissionStatus': "SUBMITTED",
+                                'submissionResponse': submission_result.get('response_content', ''),
+                                'submittedFormFields': json.dumps(submission_result.get('fields_submitted', {}))
+                            })
+                            successful_submissions += 1
+                        else:
+                            writer.add({
+                                'id': website.get('id'),
+                                'submissionStatus': "FAILED",
+                                'submissionError': submission_result.get('error', 'Unknown error'),
+                                'submittedFormFields': json.dumps(submission_result.get('fields_submitted', {}))
+                            })
+                            failed_submissions += 1
                         
-                except Exception as e:
-                    logger.error(f"❌ Error processing {website.get('websiteUrl')}: {e}")
-                    failed_submissions += 1
+                    except Exception as e:
+                        logger.error(f"❌ Error processing {website.get('websiteUrl')}: {e}")
+                        failed_submissions += 1
         
         # 6. Update file upload status if we have a file upload ID
         if file_upload_id:
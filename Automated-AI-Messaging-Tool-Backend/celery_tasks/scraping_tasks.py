@@ -7,16 +7,19 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from celery import current_task
+from celery import chord, current_task
 from celery_app import celery_app
 import time
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from database.database_manager import DatabaseManager
+from database.write_behind import MESSAGE_UPDATE, SCRAPING_UPDATE, WebsiteWriteBehind
 import asyncio
-import aiohttp
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import json
+import functools
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
@@ -24,6 +27,24 @@ import re
 import random
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from scraping.page_index import PageIndex
+from scraping.keyword_matcher import scan_page_keywords
+from scraping.politeness import get_politeness_scheduler
+from scraping.browser_pool import get_browser_pool
+from scraping.browser_profile import wait_for_page_ready
+from scraping.snapshot_store import flush_snapshots, get_snapshot_store
+from scraping.fetch_failures import (
+    FAILURE_CANCELLED, FAILURE_DNS, FAILURE_NOT_HTML, browser_retry_url, classify_error, classify_status, failure_type, primary_failure
+)
+from scraping.host_cache import dead_host_result, get_host_cache
+from scraping.result_cache import get_result_cache
+from scraping.response_cache import get_response_cache
+from scraping.body_reader import NonHtmlContentError, read_html_body
+from scraping.subpage_fetcher import start_subpage_fetch
+from scraping.link_scoring import about_link_match, contact_link_score
+from scraping.crawl_frontier import find_contact_page
+from scraping.form_widgets import detect_form_widget
+from scraping.platform_fingerprint import detect_platform, fingerprint_headers, remember_platform
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +66,56 @@ logger = logging.getLogger(__name__)
 MAX_AI_MESSAGES_PER_FILE = int(os.getenv('MAX_AI_MESSAGES_PER_FILE', '2'))
 TESTING_MODE_ENABLED = os.getenv('TESTING_MODE_ENABLED', 'true').lower() == 'true'
 
+# URL variant racing (www / non-www / http / https)
+# - SCRAPER_RACE_VARIANTS: fetch variants concurrently instead of one after another (default: true)
+# - SCRAPER_VARIANT_STAGGER: seconds without an answer before the next variant is started (default: 2)
+SCRAPER_RACE_VARIANTS = os.getenv('SCRAPER_RACE_VARIANTS', 'true').lower() == 'true'
+SCRAPER_VARIANT_STAGGER = float(os.getenv('SCRAPER_VARIANT_STAGGER', '2'))
+
+# Headless Chrome passes
+# - SCRAPER_SELENIUM: use Selenium for popup form detection and bot-walled pages (default: true)
+SCRAPER_SELENIUM = os.getenv('SCRAPER_SELENIUM', 'true').lower() == 'true'
+
+# Upload fan-out
+# - SCRAPER_BATCH_SIZE: websites per scraping subtask; larger uploads are split across workers (default: 200)
+SCRAPER_BATCH_SIZE = int(os.getenv('SCRAPER_BATCH_SIZE', '200'))
+
 logger.info(f"Testing mode enabled: {TESTING_MODE_ENABLED}")
 logger.info(f"Maximum AI messages per file: {MAX_AI_MESSAGES_PER_FILE}")
 
+# Browser-like request headers shared by the requests session and the async fetch engine
+BROWSER_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:91.0) Gecko/20100101 Firefox/91.0'
+]
+
+def get_browser_headers() -> Dict[str, str]:
+    """Realistic browser headers with a randomly rotated User-Agent"""
+    return {
+        'User-Agent': random.choice(BROWSER_USER_AGENTS),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Cache-Control': 'max-age=0',
+        'DNT': '1'
+    }
+
 class RobustWebScraper:
     """Comprehensive web scraper with robust error handling"""
     
     def __init__(self):
         self.session = self._create_robust_session()
+        self.scheduler = get_politeness_scheduler()
+        self.response_cache = get_response_cache()
         self.max_retries = 3
         self.backoff_factor = 2
     
@@ -74,66 +137,91 @@ class RobustWebScraper:
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         
-        # Rotate user agents to avoid detection
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:91.0) Gecko/20100101 Firefox/91.0'
-        ]
-        
-        # Set realistic headers to avoid detection
-        session.headers.update({
-            'User-Agent': random.choice(user_agents),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1'
-        })
+        # Rotate user agents and set realistic headers to avoid detection
+        session.headers.update(get_browser_headers())
         
         return session
     
-    def scrape_with_error_handling(self, url: str) -> Dict[str, Any]:
-        """Scrape website with comprehensive error handling"""
+    def fetch_page(self, url: str, timeout: int, headers: Optional[Dict[str, str]] = None) -> Tuple[Any, Optional[str]]:
+        """
+        GET a page through the politeness scheduler (per-host rate limit and global in-flight cap)
+        
+        The body is streamed and capped at SCRAPER_MAX_BODY_BYTES; non-HTML
+        responses raise NonHtmlContentError without being downloaded.
+        
+        Returns:
+            (response, content): content is None for 304 and error responses
+        """
+        with self.scheduler.slot(url, self.session):
+            response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+            try:
+                if response.status_code == 304 or response.status_code >= 400:
+                    return response, None
+                return response, read_html_body(response)
+            finally:
+                response.close()
+    
+    def _conditional_get(self, url: str, timeout: int) -> Tuple[Any, Optional[str]]:
+        """
+        fetch_page revalidating a stored copy of the page with If-None-Match / If-Modified-Since
+        
+        Returns:
+            (response, content): content is the page text, the stored one on
+            a 304, or None when the response is an error
+        """
+        cached = self.response_cache.lookup(url)
+        self.response_cache.record_request(cached)
+        response, content = self.fetch_page(url, timeout=timeout, headers=self.response_cache.conditional_headers(cached))
+        if response.status_code == 304 and cached:
+            return response, self.response_cache.not_modified(url, cached, response.headers)
+        if content is not None:
+            self.response_cache.store(url, content, response.headers)
+        return response, content
+    
+    def scrape_with_error_handling(self, url: str, cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Scrape website with comprehensive error handling
+        
+        When cancel_event is set (another URL variant already succeeded) the
+        retry loop stops at its next attempt or backoff.
+        """
         
         error_attempts = 0
         last_error = None
+        last_status = None
         
         while error_attempts < self.max_retries:
+            if cancel_event is not None and cancel_event.is_set():
+                return {'success': False, 'error': 'Cancelled', 'url': url, 'failure_type': FAILURE_CANCELLED}
+            
             try:
-                # Add random delay to avoid overwhelming servers
-                time.sleep(random.uniform(1, 3))
-                
                 # Attempt to scrape
-                response = self.session.get(url, timeout=30)
+                response, content = self._conditional_get(url, timeout=30)
                 response.raise_for_status()
                 
                 return {
                     'success': True,
-                    'content': response.text,
+                    'content': content,
                     'status_code': response.status_code,
+                    'headers': fingerprint_headers(response.headers),
                     'url': url
                 }
                 
+            except NonHtmlContentError as e:
+                logger.warning(f"{url} is not an HTML page ({e.content_type})")
+                return {'success': False, 'error': str(e), 'url': url, 'failure_type': FAILURE_NOT_HTML}
+                
             except requests.exceptions.ConnectionError as e:
                 last_error = f"Connection Error: {str(e)}"
                 logger.warning(f"Connection error for {url}: {e}")
                 
-                # Handle specific connection errors
-                if "Connection refused" in str(e):
+                # Handle specific connection errors (DNS first: its message also says "Max retries exceeded")
+                if classify_error(str(e)) == FAILURE_DNS:
+                    return self._handle_dns_error(url, error_attempts)
+                elif "Connection refused" in str(e):
                     return self._handle_connection_refused(url, error_attempts)
                 elif "Max retries exceeded" in str(e):
                     return self._handle_max_retries_exceeded(url, error_attempts)
-                elif "Name or service not known" in str(e):
-                    return self._handle_dns_error(url, error_attempts)
                 
             except requests.exceptions.Timeout as e:
                 last_error = f"Timeout Error: {str(e)}"
@@ -145,6 +233,7 @@ class RobustWebScraper:
                 
             except requests.exceptions.HTTPError as e:
                 last_error = f"HTTP Error: {str(e)}"
+                last_status = e.response.status_code if e.response is not None else None
                 logger.warning(f"HTTP error for {url}: {e}")
                 
             except Exception as e:
@@ -157,18 +246,28 @@ class RobustWebScraper:
             if error_attempts < self.max_retries:
                 wait_time = self.backoff_factor ** error_attempts
                 logger.info(f"Retrying {url} in {wait_time} seconds...")
-                time.sleep(wait_time)
+                if cancel_event is not None:
+                    cancel_event.wait(wait_time)
+                else:
+                    time.sleep(wait_time)
         
         return {
             'success': False,
             'error': last_error,
             'url': url,
-            'attempts': error_attempts
+            'attempts': error_attempts,
+            'status_code': last_status,
+            'failure_type': classify_status(last_status) if last_status else classify_error(last_error)
         }
     
     def _handle_connection_refused(self, url: str, attempt: int) -> Dict[str, Any]:
         """Handle connection refused errors"""
         
+        # Hosts already known to be dead are not probed again
+        dead = get_host_cache().dead_host(url)
+        if dead:
+            return dead_host_result(url, dead)
+        
         strategies = [
             # Strategy 1: Try HTTP instead of HTTPS
             lambda: self._try_http_fallback(url),
@@ -201,13 +300,17 @@ class RobustWebScraper:
     def _handle_max_retries_exceeded(self, url: str, attempt: int) -> Dict[str, Any]:
         """Handle max retries exceeded errors"""
         
+        dead = get_host_cache().dead_host(url)
+        if dead:
+            return dead_host_result(url, dead)
+        
         # Try with longer timeout
         try:
-            response = self.session.get(url, timeout=60)
+            response, content = self.fetch_page(url, timeout=60)
             response.raise_for_status()
             return {
                 'success': True,
-                'content': response.text,
+                'content': content,
                 'status_code': response.status_code,
                 'url': url
             }
@@ -221,25 +324,22 @@ class RobustWebScraper:
     def _handle_dns_error(self, url: str, attempt: int) -> Dict[str, Any]:
         """Handle DNS resolution errors"""
         
-        # Try to resolve domain manually
+        # Try to resolve domain manually (through the shared DNS cache)
         try:
-            import socket
-            from urllib.parse import urlparse
-            
             parsed_url = urlparse(url)
-            domain = parsed_url.netloc
+            domain = parsed_url.hostname
             
             # Try to resolve IP
-            ip = socket.gethostbyname(domain)
+            ip = get_host_cache().resolve(domain)[0]
             
             # Try with IP instead of domain
-            new_url = url.replace(domain, ip)
-            response = self.session.get(new_url, timeout=30)
+            new_url = url.replace(domain, ip, 1)
+            response, content = self.fetch_page(new_url, timeout=30)
             response.raise_for_status()
             
             return {
                 'success': True,
-                'content': response.text,
+                'content': content,
                 'status_code': response.status_code,
                 'url': new_url
             }
@@ -257,11 +357,11 @@ class RobustWebScraper:
         if url.startswith('https://'):
             http_url = url.replace('https://', 'http://')
             try:
-                response = self.session.get(http_url, timeout=30)
+                response, content = self.fetch_page(http_url, timeout=30)
                 response.raise_for_status()
                 return {
                     'success': True,
-                    'content': response.text,
+                    'content': content,
                     'status_code': response.status_code,
                     'url': http_url
                 }
@@ -289,12 +389,12 @@ class RobustWebScraper:
                 else:
                     test_url = f"http://{domain}:{port}{path}"
                 
-                response = self.session.get(test_url, timeout=15)
+                response, content = self.fetch_page(test_url, timeout=15)
                 response.raise_for_status()
                 
                 return {
                     'success': True,
-                    'content': response.text,
+                    'content': content,
                     'status_code': response.status_code,
                     'url': test_url
                 }
@@ -319,12 +419,12 @@ class RobustWebScraper:
         for ua in user_agents:
             try:
                 self.session.headers.update({'User-Agent': ua})
-                response = self.session.get(url, timeout=30)
+                response, content = self.fetch_page(url, timeout=30)
                 response.raise_for_status()
                 
                 return {
                     'success': True,
-                    'content': response.text,
+                    'content': content,
                     'status_code': response.status_code,
                     'url': url
                 }
@@ -470,34 +570,177 @@ def select_best_contact_form(all_contact_options: List[Dict]) -> Dict:
     
     return best_contact
 
-def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
+# Title/h1 cleanup patterns used to derive a company name, compiled once
+US_STATE_CODES = r'(?:NM|CA|TX|NY|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|AZ|CO|TN|IN|MO|MD|MN|WI|AL|SC|LA|KY|OR|OK|CT|IA|MS|AR|KS|UT|NV|WV|NE|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)'
+FIND_AGENT_PREFIX_RE = re.compile(r'^Find a [^|]+Agent in [^|]+\s*[-|]\s*', re.IGNORECASE)
+CATEGORY_PREFIX_RE = re.compile(r'^(Used Cars|New Cars|Auto Sales|Car Dealership|Auto Dealership)\s*[-|]\s*', re.IGNORECASE)
+LOCATION_SEGMENT_RE = re.compile(r'\s*[-|]\s*[A-Za-z\s,]+' + US_STATE_CODES + r'\s*[-|]?', re.IGNORECASE)
+LOCATION_PREFIX_RE = re.compile(r'^[A-Za-z\s,]+' + US_STATE_CODES + r'\s*[-|]\s*', re.IGNORECASE)
+COMMON_SUFFIX_RE = re.compile(r'\s*[-|]\s*(Home|Welcome|Official Site|Official Website|Dealership|Auto|Cars).*$', re.IGNORECASE)
+WELCOME_PREFIX_RE = re.compile(r'^Welcome to\s+', re.IGNORECASE)
+OFFICIAL_SITE_SUFFIX_RE = re.compile(r'\s*[-|]\s*Official Site.*$', re.IGNORECASE)
+TRAILING_SEPARATOR_RE = re.compile(r'\s*[-|]\s*$')
+LEADING_SEPARATOR_RE = re.compile(r'^\s*[-|]\s*')
+LOCATION_ONLY_RE = re.compile(r'^[A-Za-z\s,]+' + US_STATE_CODES + r'$')
+
+
+def extract_about_content(about_html: str) -> Optional[str]:
+    """Main text of an about page: its first substantial paragraphs, or a descriptive div"""
+    aboutUsContent = None
+    
+    about_soup = BeautifulSoup(about_html, 'html.parser')
+    
+    # Try to get main content with multiple selectors
+    main_content = None
+    content_selectors = [
+        'main',
+        'article', 
+        'div.content',
+        'div.main-content',
+        'div#content',
+        'div#main',
+        'div.about',
+        'div.about-us'
+    ]
+    
+    for selector in content_selectors:
+        main_content = about_soup.select_one(selector)
+        if main_content:
+            logger.info(f"Found main content with selector: {selector}")
+            break
+    
+    if main_content:
+        paragraphs = main_content.find_all('p')
+        logger.info(f"Found {len(paragraphs)} paragraphs in main content")
+    else:
+        paragraphs = about_soup.find_all('p')
+        logger.info(f"Found {len(paragraphs)} paragraphs in full page")
+    
+    # Extract text from paragraphs
+    content_parts = []
+    for p in paragraphs:
+        text = p.get_text(strip=True)
+        if text and len(text) > 20:  # Only include substantial paragraphs
+            content_parts.append(text)
+    
+    logger.info(f"Extracted {len(content_parts)} substantial content parts")
+    
+    if content_parts:
+        aboutUsContent = '\n\n'.join(content_parts[:5])  # Limit to first 5 paragraphs
+        logger.info(f"Successfully extracted about page content ({len(aboutUsContent)} characters)")
+    else:
+        # Fallback: Try to extract content from other elements
+        logger.info("No substantial paragraphs found, trying fallback extraction")
+    
+        # Try to get content from div elements with text
+        content_divs = about_soup.find_all('div')
+        for div in content_divs:
+            text = div.get_text(strip=True)
+            if text and len(text) > 50 and len(text) < 2000:  # Reasonable length
+                # Check if it contains about-related content
+                about_keywords = ['about', 'company', 'story', 'mission', 'vision', 'history']
+                if any(keyword in text.lower() for keyword in about_keywords):
+                    content_parts.append(text)
+                    logger.info(f"Found about content in div: {text[:100]}...")
+                    break
+    
+        if content_parts:
+            aboutUsContent = '\n\n'.join(content_parts[:3])  # Limit to first 3 parts
+            logger.info(f"Successfully extracted about page content via fallback ({len(aboutUsContent)} characters)")
+        else:
+            logger.warning("No substantial content found in about page")
+    
+    return aboutUsContent
+
+
+def parse_company_page(html: str, base_url: str,
+                       on_links: Optional[Callable[[Optional[str], Optional[str]], None]] = None) -> Dict[str, Any]:
     """
-    Extract company information from website HTML
+    CPU-only part of extract_company_info: parse the homepage, no requests
+    
+    The parsed tree is walked once by PageIndex; every lookup below reads
+    from that index instead of searching the tree again. on_links is called
+    with the about page URL and the best static contact link as soon as the
+    links are scanned, so the caller can fetch them while the rest of the
+    page is parsed. The result only holds plain values, so it can be
+    returned from a parse worker process.
+    
+    Returns:
+        title, companyName, industry and businessType, plus 'contact_options'
+        (every contact option with its score), 'has_popup_form', 'about_url'
+        and 'contact_link' for finish_company_info
     """
     soup = BeautifulSoup(html, 'html.parser')
+    page = PageIndex(soup)
+    
+    # Contact Form Detection - Enhanced for Multiple Forms
+    contact_links = []
+    all_contact_options = []  # Store all contact options with scores
+    
+    # Look for contact links
+    for a in page.links:
+        score = contact_link_score(a['href'].lower(), page.text_of(a), base_url)
+        if score is None:
+            continue
+        
+        contact_links.append(urljoin(base_url, a['href']))
+        all_contact_options.append({
+            'type': 'static_link',
+            'url': urljoin(base_url, a['href']),
+            'text': page.text_of(a),
+            'score': score,
+            'priority': 1  # Static links get highest priority
+        })
+    
+    # About Us Content
+    about_url = None
+    
+    # Look for about links
+    about_links = []
+    logger.info(f"Searching for about links on {base_url}")
+    
+    for a in page.links:
+        match = about_link_match(a['href'].lower(), page.text_of(a))
+        if match:
+            about_url = urljoin(base_url, a['href'])
+            about_links.append(about_url)
+            logger.info(f"Found about link by {match} pattern: {about_url}")
+    
+    logger.info(f"Total about links found: {len(about_links)}")
+    
+
+    # Hand out the sub-pages now so they are fetched while the rest of the page is parsed
+    about_link = about_links[0] if about_links else None  # Take the first about link
+    # The static contact link that will win unless a form on this page outranks it
+    contact_link = None
+    static_contacts = sorted(all_contact_options, key=lambda x: -x['score'])
+    if static_contacts and static_contacts[0]['url'] != base_url:
+        contact_link = static_contacts[0]['url']
+    if on_links is not None:
+        on_links(about_link, contact_link)
     
     # Title
     title = None
-    if soup.title and soup.title.string:
-        title = soup.title.string.strip()
+    if page.title_tag and page.title_tag.string:
+        title = page.title_tag.string.strip()
     
     # Company Name (try multiple sources)
     companyName = None
     
     # Try og:site_name first
-    meta_site_name = soup.find('meta', property='og:site_name')
+    meta_site_name = page.meta_by_property.get('og:site_name')
     if meta_site_name and meta_site_name.get('content'):
         companyName = meta_site_name['content'].strip()
     
     # Try og:title
     if not companyName:
-        meta_title = soup.find('meta', property='og:title')
+        meta_title = page.meta_by_property.get('og:title')
         if meta_title and meta_title.get('content'):
             companyName = meta_title['content'].strip()
     
     # Try application-name
     if not companyName:
-        meta_app_name = soup.find('meta', attrs={'name': 'application-name'})
+        meta_app_name = page.meta_by_name.get('application-name')
         if meta_app_name and meta_app_name.get('content'):
             companyName = meta_app_name['content'].strip()
     
@@ -507,43 +750,43 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
         cleaned_title = title
         
         # Remove "Find a X Agent in Y, Z" patterns first
-        cleaned_title = re.sub(r'^Find a [^|]+Agent in [^|]+\s*[-|]\s*', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = FIND_AGENT_PREFIX_RE.sub('', cleaned_title)
         
         # Remove common business category prefixes
-        cleaned_title = re.sub(r'^(Used Cars|New Cars|Auto Sales|Car Dealership|Auto Dealership)\s*[-|]\s*', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = CATEGORY_PREFIX_RE.sub('', cleaned_title)
         
         # Remove common location patterns
-        cleaned_title = re.sub(r'\s*[-|]\s*[A-Za-z\s,]+(?:NM|CA|TX|NY|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|AZ|CO|TN|IN|MO|MD|MN|WI|AL|SC|LA|KY|OR|OK|CT|IA|MS|AR|KS|UT|NV|WV|NE|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)\s*[-|]?', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = LOCATION_SEGMENT_RE.sub('', cleaned_title)
         
         # Remove city, state patterns at the beginning
-        cleaned_title = re.sub(r'^[A-Za-z\s,]+(?:NM|CA|TX|NY|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|AZ|CO|TN|IN|MO|MD|MN|WI|AL|SC|LA|KY|OR|OK|CT|IA|MS|AR|KS|UT|NV|WV|NE|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)\s*[-|]\s*', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = LOCATION_PREFIX_RE.sub('', cleaned_title)
         
         # Remove common suffixes
-        cleaned_title = re.sub(r'\s*[-|]\s*(Home|Welcome|Official Site|Official Website|Dealership|Auto|Cars).*$', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = COMMON_SUFFIX_RE.sub('', cleaned_title)
         
         # Remove "Welcome to" prefixes
-        cleaned_title = re.sub(r'^Welcome to\s+', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = WELCOME_PREFIX_RE.sub('', cleaned_title)
         
         # Remove "Official Site" and similar
-        cleaned_title = re.sub(r'\s*[-|]\s*Official Site.*$', '', cleaned_title, flags=re.IGNORECASE)
+        cleaned_title = OFFICIAL_SITE_SUFFIX_RE.sub('', cleaned_title)
         
         # Remove extra separators and clean up
-        cleaned_title = re.sub(r'\s*[-|]\s*$', '', cleaned_title)
-        cleaned_title = re.sub(r'^\s*[-|]\s*', '', cleaned_title)
+        cleaned_title = TRAILING_SEPARATOR_RE.sub('', cleaned_title)
+        cleaned_title = LEADING_SEPARATOR_RE.sub('', cleaned_title)
         cleaned_title = cleaned_title.strip()
         
         # Only use if it looks like a company name (not too long, not just location)
-        if cleaned_title and len(cleaned_title) < 100 and not re.match(r'^[A-Za-z\s,]+(?:NM|CA|TX|NY|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|AZ|CO|TN|IN|MO|MD|MN|WI|AL|SC|LA|KY|OR|OK|CT|IA|MS|AR|KS|UT|NV|NM|WV|NE|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)$', cleaned_title):
+        if cleaned_title and len(cleaned_title) < 100 and not LOCATION_ONLY_RE.match(cleaned_title):
             companyName = cleaned_title
     
     # Try h1 tag
     if not companyName:
-        h1_tag = soup.find('h1')
+        h1_tag = page.first_h1
         if h1_tag and h1_tag.get_text(strip=True):
             h1_text = h1_tag.get_text(strip=True)
             # Clean h1 text similar to title
-            cleaned_h1 = re.sub(r'\s*[-|]\s*[A-Za-z\s,]+(?:NM|CA|TX|NY|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|AZ|CO|TN|IN|MO|MD|MN|WI|AL|SC|LA|KY|OR|OK|CT|IA|MS|AR|KS|UT|NV|WV|NE|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)\s*[-|]?', '', h1_text, flags=re.IGNORECASE)
-            cleaned_h1 = re.sub(r'^(Used Cars|New Cars|Auto Sales|Car Dealership|Auto Dealership)\s*[-|]\s*', '', cleaned_h1, flags=re.IGNORECASE)
+            cleaned_h1 = LOCATION_SEGMENT_RE.sub('', h1_text)
+            cleaned_h1 = CATEGORY_PREFIX_RE.sub('', cleaned_h1)
             cleaned_h1 = cleaned_h1.strip()
             
             if cleaned_h1 and len(cleaned_h1) < 100:
@@ -551,37 +794,18 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
     
     # Industry (try meta tags and content analysis)
     industry = None
+    keyword_hits = None
     
     # Try meta industry tag
-    meta_industry = soup.find('meta', attrs={'name': 'industry'})
+    meta_industry = page.meta_by_name.get('industry')
     if meta_industry and meta_industry.get('content'):
         industry = meta_industry['content'].strip()
     
     # Try to extract from content if not found
     if not industry:
-        # Look for common industry keywords in the page
-        page_text = soup.get_text().lower()
-        industry_keywords = {
-            'insurance': ['insurance', 'insurer', 'coverage', 'policy', 'premium', 'claim', 'farmers insurance', 'state farm', 'allstate', 'geico', 'progressive', 'agent', 'broker', 'underwriter'],
-            'automotive': ['car dealership', 'auto dealership', 'used cars', 'new cars', 'auto sales', 'car sales', 'automotive dealer', 'vehicle dealer', 'car lot', 'auto lot'],
-            'technology': ['tech', 'software', 'hardware', 'digital', 'ai', 'artificial intelligence', 'app', 'platform', 'saas', 'cloud', 'cyber', 'data'],
-            'retail': ['shop', 'store', 'buy', 'sell', 'retail', 'commerce', 'online store', 'ecommerce', 'e-commerce', 'merchandise'],
-            'finance': ['bank', 'financial', 'investment', 'credit', 'loan', 'mortgage', 'wealth', 'banking', 'financial services'],
-            'healthcare': ['health', 'medical', 'hospital', 'clinic', 'pharmacy', 'doctor', 'physician', 'dental', 'healthcare', 'medical services'],
-            'education': ['school', 'university', 'college', 'education', 'learning', 'academy', 'institute', 'educational'],
-            'manufacturing': ['manufacturing', 'factory', 'production', 'industrial', 'manufacturer', 'manufacturing company'],
-            'real estate': ['real estate', 'property', 'housing', 'construction', 'realtor', 'broker', 'realty', 'homes for sale'],
-            'consulting': ['consulting', 'advisory', 'services', 'solutions', 'consultant', 'consulting firm'],
-            'restaurant': ['restaurant', 'food', 'dining', 'cafe', 'bistro', 'grill', 'kitchen', 'restaurant', 'food service'],
-            'legal': ['law', 'legal', 'attorney', 'lawyer', 'law firm', 'legal services', 'legal counsel']
-        }
-        
-        # Check all industries and find the best match
-        industry_scores = {}
-        for ind, keywords in industry_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in page_text)
-            if score > 0:
-                industry_scores[ind] = score
+        # Look for common industry keywords in the page (single scan, reused for business type)
+        keyword_hits = scan_page_keywords(page.page_text)
+        industry_scores = keyword_hits.industry_scores
         
         # Get the industry with the highest score
         if industry_scores:
@@ -602,92 +826,24 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
     businessType = None
     
     # Try meta business type tag
-    meta_btype = soup.find('meta', attrs={'name': 'businessType'})
+    meta_btype = page.meta_by_name.get('businessType')
     if meta_btype and meta_btype.get('content'):
         businessType = meta_btype['content'].strip()
     
     # Try to extract from content
     if not businessType:
-        page_text = soup.get_text().lower()
-        if any(word in page_text for word in ['car dealership', 'auto dealership', 'dealership', 'used cars', 'new cars', 'auto sales', 'car sales']):
-            businessType = 'Auto Dealership'
-        elif any(word in page_text for word in ['startup', 'start-up']):
-            businessType = 'Startup'
-        elif any(word in page_text for word in ['enterprise', 'corporation', 'corp']):
-            businessType = 'Enterprise'
-        elif any(word in page_text for word in ['small business', 'sme']):
-            businessType = 'Small Business'
-        elif any(word in page_text for word in ['non-profit', 'nonprofit']):
-            businessType = 'Non-Profit'
-        else:
-            businessType = 'Business'  # Default
-    
-    # Contact Form Detection - Enhanced for Multiple Forms
-    contactFormUrl = None
-    contact_links = []
-    all_contact_options = []  # Store all contact options with scores
-    
-    # Look for contact links (existing logic)
-    for a in soup.find_all('a', href=True):
-        href = a['href'].lower()
-        link_text = a.get_text().lower()
-        
-        # Skip third-party widgets and external services
-        if any(external in href for external in ['usablenet', 'a40.', 'feedback', 'survey', 'zendesk', 'intercom']):
-            continue
-            
-        # Skip about pages that might be misidentified as contact forms
-        # UNLESS we're specifically looking for contact forms on about pages
-        if any(word in href for word in ['about', 'about-us', 'aboutus', 'company', 'who-we-are', 'our-story']):
-            # Only skip if we're not on an about page that was provided as contact form URL
-            if not any(word in base_url for word in ['about', 'about-us', 'aboutus', 'company', 'who-we-are', 'our-story']):
-                continue
-            
-        if any(word in href for word in ['contact', 'reach', 'get-in-touch']):
-            contact_links.append(urljoin(base_url, a['href']))
-            # Score this contact link
-            score = 0
-            if 'contact' in href: score += 10
-            if 'contact' in link_text: score += 5
-            if 'form' in href: score += 3
-            if 'message' in href: score += 2
-            
-            all_contact_options.append({
-                'type': 'static_link',
-                'url': urljoin(base_url, a['href']),
-                'text': link_text,
-                'score': score,
-                'priority': 1  # Static links get highest priority
-            })
-        elif any(word in link_text for word in ['contact', 'reach us', 'get in touch']):
-            # Skip about pages that might be misidentified as contact forms
-            # UNLESS we're specifically looking for contact forms on about pages
-            if any(word in link_text for word in ['about', 'about us', 'company', 'who we are', 'our story']):
-                # Only skip if we're not on an about page that was provided as contact form URL
-                if not any(word in base_url for word in ['about', 'about-us', 'aboutus', 'company', 'who-we-are', 'our-story']):
-                    continue
-                
-            contact_links.append(urljoin(base_url, a['href']))
-            # Score this contact link
-            score = 0
-            if 'contact' in link_text: score += 8
-            if 'reach' in link_text: score += 4
-            if 'get in touch' in link_text: score += 6
-            
-            all_contact_options.append({
-                'type': 'static_link',
-                'url': urljoin(base_url, a['href']),
-                'text': link_text,
-                'score': score,
-                'priority': 1
-            })
+        if keyword_hits is None:
+            keyword_hits = scan_page_keywords(page.page_text)
+        businessType = keyword_hits.business_type or 'Business'  # Default
     
     # Enhanced: Look for popup/modal contact forms
     popup_contact_forms = []
     
     # 1. Look for buttons with contact-related text
-    for button in soup.find_all(['button', 'input', 'div', 'span'], class_=True):
-        button_text = button.get_text().lower()
+    for button in page.class_elements:
+        if button.name == 'a':
+            continue
+        button_text = page.text_of(button)
         button_classes = ' '.join(button.get('class', [])).lower()
         
         contact_keywords = ['contact', 'reach', 'get in touch', 'get-in-touch', 'message us', 'send message']
@@ -725,10 +881,12 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
         'modal-contact', 'popup-contact', 'contact-modal', 'contact-popup'
     ]
     
-    for element in soup.find_all(['div', 'button', 'span', 'a'], class_=True):
+    for element in page.class_elements:
+        if element.name == 'input':
+            continue
         element_classes = ' '.join(element.get('class', [])).lower()
         if any(pattern in element_classes for pattern in contact_class_patterns):
-            element_text = element.get_text().lower()
+            element_text = page.text_of(element)
             if any(keyword in element_text for keyword in ['contact', 'reach', 'message', 'get in touch']):
                 popup_contact_forms.append({
                     'type': 'element',
@@ -757,9 +915,9 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
                 })
     
     # 3. Look for data attributes that might trigger contact forms
-    for element in soup.find_all(attrs={'data-toggle': True}):
+    for element in page.data_toggle_elements:
         if 'modal' in element.get('data-toggle', '').lower():
-            element_text = element.get_text().lower()
+            element_text = page.text_of(element)
             if any(keyword in element_text for keyword in ['contact', 'reach', 'message']):
                 popup_contact_forms.append({
                     'type': 'modal',
@@ -786,10 +944,10 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
                 })
     
     # 4. Look for onclick handlers with contact-related functions
-    for element in soup.find_all(attrs={'onclick': True}):
+    for element in page.onclick_elements:
         onclick_value = element.get('onclick', '').lower()
         if any(keyword in onclick_value for keyword in ['contact', 'modal', 'popup', 'form']):
-            element_text = element.get_text().lower()
+            element_text = page.text_of(element)
             if any(keyword in element_text for keyword in ['contact', 'reach', 'message']):
                 popup_contact_forms.append({
                     'type': 'onclick',
@@ -819,10 +977,11 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
     
     # 5. Look for hidden contact forms in the page with improved detection
     hidden_forms = []
-    for form in soup.find_all('form'):
+    for form in page.forms:
         # Use the improved contact form detection
         if is_contact_form(form):
             form_text = form.get_text().lower()
+            is_cf7 = detect_wordpress_cf7_form(form)
             form_action = form.get('action', '').lower()
             form_id = form.get('id', '').lower()
             form_class = ' '.join(form.get('class', [])).lower()
@@ -844,7 +1003,7 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
             if form_action: score += 5  # Bonus for having an action URL
             
             # Bonus for WordPress CF7 forms
-            if detect_wordpress_cf7_form(form):
+            if is_cf7:
                 score += 15
             
             # Check for actual input fields (name, email, message)
@@ -857,9 +1016,9 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
                 if 'message' in input_name or inp.name == 'textarea': score += 5
             
             # Only add if there's a valid form action URL or it's a CF7 form
-            if (form_action and form_action.strip()) or detect_wordpress_cf7_form(form):
+            if (form_action and form_action.strip()) or is_cf7:
                 # For CF7 forms, use the base URL if action is a fragment
-                if detect_wordpress_cf7_form(form) and form_action.startswith('#'):
+                if is_cf7 and form_action.startswith('#'):
                     form_url = base_url + form_action
                 else:
                     form_url = form_action if form_action else base_url
@@ -869,15 +1028,45 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
                     'url': form_url,
                     'text': form_text[:50] + '...' if len(form_text) > 50 else form_text,
                     'score': score,
-                    'priority': 0 if detect_wordpress_cf7_form(form) else 1,  # CF7 forms get highest priority
+                    'priority': 0 if is_cf7 else 1,  # CF7 forms get highest priority
                     'element_info': {
                         'action': form_action,
                         'id': form_id,
                         'class': form_class,
-                        'is_cf7': detect_wordpress_cf7_form(form)
+                        'is_cf7': is_cf7
                     }
                 })
     
+    return {
+        'title': title,
+        'companyName': companyName,
+        'industry': industry,
+        'businessType': businessType,
+        'contact_options': all_contact_options,
+        'has_popup_form': bool(popup_contact_forms) or bool(hidden_forms),
+        'about_url': about_link,
+        'contact_link': contact_link
+    }
+
+
+def finish_company_info(parsed: Dict[str, Any], base_url: str, aboutUsContent: Optional[str] = None,
+                        broken_link: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Pick the contact form from a parse_company_page result
+    
+    Args:
+        parsed: parse_company_page result
+        base_url: URL of the parsed page
+        aboutUsContent: text extracted from the about page, if it was fetched
+        broken_link: contact link the server answered with 404/410
+    """
+    contactFormUrl = None
+    all_contact_options = parsed['contact_options']
+    
+    # A contact link the server answers with 404/410 is not a contact form
+    if broken_link:
+        all_contact_options = [option for option in all_contact_options if option.get('url') != broken_link]
+    
     # Intelligent Contact Form Selection
     if all_contact_options:
         # Sort by priority first, then by score
@@ -896,124 +1085,59 @@ def extract_company_info(html: str, base_url: str) -> Dict[str, Any]:
             logger.info(f"  {i+1}. {option['type']}: {option['text'][:50]} (score: {option['score']}, priority: {option['priority']})")
     
     # Check if contact form exists (including popups)
-    has_contact_form = bool(contactFormUrl) or bool(popup_contact_forms) or bool(hidden_forms)
+    has_contact_form = bool(contactFormUrl) or parsed['has_popup_form']
     
-    # About Us Content
-    aboutUsContent = None
-    about_url = None
+    return {
+        'title': parsed['title'],
+        'companyName': parsed['companyName'],
+        'industry': parsed['industry'],
+        'businessType': parsed['businessType'],
+        'contactFormUrl': contactFormUrl,
+        'has_contact_form': has_contact_form,
+        'aboutUsContent': aboutUsContent
+    }
+
+
+def extract_company_info(html: str, base_url: str, fetch_about_page: bool = True) -> Dict[str, Any]:
+    """
+    Extract company information from website HTML
     
-    # Look for about links
-    about_links = []
-    logger.info(f"Searching for about links on {base_url}")
+    The about page and the best contact link are fetched in the background
+    as soon as parse_company_page finds their links, while the rest of the
+    page is parsed. Pass fetch_about_page=False to skip these sub-page
+    requests.
+    """
+    fetches = {}
     
-    for a in soup.find_all('a', href=True):
-        href = a['href'].lower()
-        link_text = a.get_text().lower()
-        
-        # Skip external links and third-party services
-        if any(external in href for external in ['usablenet', 'a40.', 'facebook', 'twitter', 'instagram', 'youtube', 'pinterest']):
-            continue
-            
-        if any(word in href for word in ['about', 'about-us', 'aboutus', 'company', 'who-we-are', 'our-story']):
-            about_url = urljoin(base_url, a['href'])
-            about_links.append(about_url)
-            logger.info(f"Found about link by URL pattern: {about_url}")
-        elif any(word in link_text for word in ['about', 'about us', 'company', 'who we are', 'our story']):
-            about_url = urljoin(base_url, a['href'])
-            about_links.append(about_url)
-            logger.info(f"Found about link by text pattern: {about_url}")
+    def start_fetches(about_link: Optional[str], contact_link: Optional[str]):
+        if about_link:
+            fetches['about'] = start_subpage_fetch(about_link)
+        if contact_link:
+            fetches['contact'] = start_subpage_fetch(contact_link)
     
-    logger.info(f"Total about links found: {len(about_links)}")
+    parsed = parse_company_page(html, base_url, start_fetches if fetch_about_page else None)
     
-    if about_links:
-        about_url = about_links[0]  # Take the first about link
-        logger.info(f"Fetching about page content from: {about_url}")
-        
-        # Try to fetch about page content
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            about_resp = requests.get(about_url, timeout=10, headers=headers)
-            logger.info(f"About page response status: {about_resp.status_code}")
-            
-            if about_resp.status_code == 200:
-                about_soup = BeautifulSoup(about_resp.text, 'html.parser')
-                
-                # Try to get main content with multiple selectors
-                main_content = None
-                content_selectors = [
-                    'main',
-                    'article', 
-                    'div.content',
-                    'div.main-content',
-                    'div#content',
-                    'div#main',
-                    'div.about',
-                    'div.about-us'
-                ]
-                
-                for selector in content_selectors:
-                    main_content = about_soup.select_one(selector)
-                    if main_content:
-                        logger.info(f"Found main content with selector: {selector}")
-                        break
-                
-                if main_content:
-                    paragraphs = main_content.find_all('p')
-                    logger.info(f"Found {len(paragraphs)} paragraphs in main content")
-                else:
-                    paragraphs = about_soup.find_all('p')
-                    logger.info(f"Found {len(paragraphs)} paragraphs in full page")
-                
-                # Extract text from paragraphs
-                content_parts = []
-                for p in paragraphs:
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 20:  # Only include substantial paragraphs
-                        content_parts.append(text)
-                
-                logger.info(f"Extracted {len(content_parts)} substantial content parts")
-                
-                if content_parts:
-                    aboutUsContent = '\n\n'.join(content_parts[:5])  # Limit to first 5 paragraphs
-                    logger.info(f"Successfully extracted about page content ({len(aboutUsContent)} characters)")
-                else:
-                    # Fallback: Try to extract content from other elements
-                    logger.info("No substantial paragraphs found, trying fallback extraction")
-                    
-                    # Try to get content from div elements with text
-                    content_divs = about_soup.find_all('div')
-                    for div in content_divs:
-                        text = div.get_text(strip=True)
-                        if text and len(text) > 50 and len(text) < 2000:  # Reasonable length
-                            # Check if it contains about-related content
-                            about_keywords = ['about', 'company', 'story', 'mission', 'vision', 'history']
-                            if any(keyword in text.lower() for keyword in about_keywords):
-                                content_parts.append(text)
-                                logger.info(f"Found about content in div: {text[:100]}...")
-                                break
-                    
-                    if content_parts:
-                        aboutUsContent = '\n\n'.join(content_parts[:3])  # Limit to first 3 parts
-                        logger.info(f"Successfully extracted about page content via fallback ({len(aboutUsContent)} characters)")
-                    else:
-                        logger.warning("No substantial content found in about page")
-                    
-        except Exception as e:
-            logger.warning(f"Failed to fetch about page {about_url}: {str(e)}")
-    else:
+    broken_link = None
+    contact_fetch = fetches.get('contact')
+    if contact_fetch is not None and contact_fetch.broken_link():
+        logger.info(f"Contact link {contact_fetch.url} is broken (HTTP {contact_fetch.result()['status_code']}), skipping it")
+        broken_link = contact_fetch.url
+    
+    aboutUsContent = None
+    about_fetch = fetches.get('about')
+    if about_fetch is not None:
+        about_html = about_fetch.content()
+        if about_html is not None:
+            try:
+                aboutUsContent = extract_about_content(about_html)
+            except Exception as e:
+                logger.warning(f"Failed to parse about page {about_fetch.url}: {str(e)}")
+        else:
+            logger.warning(f"Failed to fetch about page {about_fetch.url}: {about_fetch.result()['error']}")
+    elif not parsed['about_url']:
         logger.info("No about links found on the page")
     
-    return {
-        'title': title,
-        'companyName': companyName,
-        'industry': industry,
-        'businessType': businessType,
-        'contactFormUrl': contactFormUrl,
-        'has_contact_form': has_contact_form,
-        'aboutUsContent': aboutUsContent
-    }
+    return finish_company_info(parsed, base_url, aboutUsContent, broken_link)
 
 def validate_and_fix_url(url: str) -> str:
     """Validate URL and try to fix common issues"""
@@ -1054,83 +1178,133 @@ def get_alternative_urls(url: str) -> List[str]:
     
     return alternatives
 
+def fetch_url_variants(urls: List[str], stagger: Optional[float] = SCRAPER_VARIANT_STAGGER) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Fetch the variants of a URL happy-eyeballs style
+    
+    The first variant starts right away; the next one starts as soon as a
+    running variant fails or `stagger` seconds pass without an answer. The
+    first successful response wins and the remaining variants are cancelled.
+    With stagger=None the variants are tried strictly one after another.
+    
+    Returns:
+        (successful result or None, failed results in variant order)
+    """
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix='url-variant')
+    pending = {}
+    failures = []
+    next_index = 0
+    
+    def start_next():
+        nonlocal next_index
+        variant_url = urls[next_index]
+        # One scraper per variant: the fallback strategies mutate session headers
+        future = executor.submit(RobustWebScraper().scrape_with_error_handling, variant_url, cancel_event)
+        pending[future] = next_index
+        next_index += 1
+    
+    try:
+        start_next()
+        while pending:
+            more_variants = next_index < len(urls)
+            done, _ = wait(pending, timeout=stagger if more_variants else None, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                logger.info(f"No answer from {urls[next_index - 1]} after {stagger}s, also trying {urls[next_index]}")
+                start_next()
+                continue
+            
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'success': False, 'error': f"Unexpected Error: {str(e)}", 'url': urls[index]}
+                
+                if result['success']:
+                    if pending:
+                        logger.info(f"{urls[index]} answered first, cancelling {len(pending)} other variant(s)")
+                    return result, failures
+                
+                result['variant_index'] = index
+                failures.append(result)
+            
+            if next_index < len(urls):
+                start_next()
+    finally:
+        cancel_event.set()
+        # Losing variants stop at their next checkpoint; nobody waits for them
+        executor.shutdown(wait=False)
+    
+    failures.sort(key=lambda failure: failure['variant_index'])
+    return None, failures
+
 def robust_scrape_website(url: str) -> Dict[str, Any]:
     """Comprehensive scraping with multiple fallback strategies"""
     
     # Step 1: Validate and fix URL
     fixed_url = validate_and_fix_url(url)
+    alternative_urls = get_alternative_urls(fixed_url)
     
-    # Step 2: Try with requests first
-    scraper = RobustWebScraper()
-    result = scraper.scrape_with_error_handling(fixed_url)
+    # Hosts that recently failed DNS or refused every connection fail right away
+    dead = get_host_cache().dead_host(fixed_url)
+    if dead:
+        logger.info(f"Skipping {url}: host is known to be unreachable ({dead['failure_type']})")
+        return dead_host_result(url, dead)
     
-    if result['success']:
+    # Step 2: Try the URL and its www / non-www / http / https variants with requests
+    stagger = SCRAPER_VARIANT_STAGGER if SCRAPER_RACE_VARIANTS else None
+    result, failures = fetch_url_variants([fixed_url] + alternative_urls, stagger)
+    if result:
         return result
     
-    # Step 3: Try alternative URLs
-    alternative_urls = get_alternative_urls(fixed_url)
-    for alt_url in alternative_urls:
-        result = scraper.scrape_with_error_handling(alt_url)
-        if result['success']:
-            return result
+    return scrape_with_selenium_fallbacks(url, fixed_url, alternative_urls, failures)
+
+def scrape_with_selenium_fallbacks(url: str, fixed_url: str, alternative_urls: List[str],
+                                   failures: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Last-resort Selenium pass once every HTTP variant of a URL has failed
     
-    # Step 4: Try Selenium fallback
-    result = scrape_with_selenium_fallback(fixed_url)
-    if result['success']:
-        return result
+    Chrome is only started when a variant failed in a way a real browser can
+    get past (bot wall / JavaScript challenge), and only for that variant.
+    DNS, connection, TLS, timeout and plain HTTP failures end here.
+    """
+    failure = primary_failure(failures)
     
-    # Step 5: Try Selenium with alternative URLs
-    for alt_url in alternative_urls:
-        result = scrape_with_selenium_fallback(alt_url)
+    # Step 3: Try Selenium on the variant that needs a browser
+    browser_url = browser_retry_url(failures) if SCRAPER_SELENIUM else None
+    if browser_url:
+        logger.info(f"HTTP variants of {url} look blocked, retrying {browser_url} with Selenium")
+        result = scrape_with_selenium_fallback(browser_url)
         if result['success']:
             return result
+    else:
+        logger.info(f"Skipping Selenium for {url}: HTTP variants failed with {failure} errors")
+        # Remember hosts that do not resolve or refuse connections so later uploads skip them
+        errors = [f.get('error') for f in failures if failure_type(f) == failure]
+        get_host_cache().mark_dead(fixed_url, failure, errors[0] if errors else '')
     
-    # Step 6: Final failure
+    # Step 4: Final failure
     return {
         'success': False,
-        'error': 'All scraping strategies failed',
+        'error': f'All scraping strategies failed ({failure})',
         'url': url,
-        'attempted_urls': [fixed_url] + alternative_urls
+        'attempted_urls': [fixed_url] + alternative_urls,
+        'failure_type': failure
     }
 
 def scrape_with_selenium_fallback(url: str) -> Dict[str, Any]:
-    """Use Selenium as fallback when requests fail"""
+    """Use Selenium as fallback when requests fail (driver comes from the worker's browser pool)"""
     
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        import tempfile
-        import uuid
-        import time
-        
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        
-        # Create unique profile directory to avoid conflicts between workers
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = str(int(time.time() * 1000))
-        profile_dir = tempfile.mkdtemp(prefix=f'chrome_scraping_{unique_id}_{timestamp}_')
-        options.add_argument(f'--user-data-dir={profile_dir}')
-        
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
-        
-        driver.get(url)
-        
-        # Wait for page to load
-        time.sleep(3)
-        
-        content = driver.page_source
-        driver.quit()
-        
-        # Clean up profile directory
-        try:
-            import shutil
-            shutil.rmtree(profile_dir, ignore_errors=True)
-        except:
-            pass
+        with get_browser_pool().browser() as driver:
+            driver.get(url)
+            
+            # Wait for scripts to finish building the page
+            wait_for_page_ready(driver)
+            
+            content = driver.page_source
         
         return {
             'success': True,
@@ -1140,148 +1314,173 @@ def scrape_with_selenium_fallback(url: str) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        # Clean up profile directory on error
-        try:
-            import shutil
-            shutil.rmtree(profile_dir, ignore_errors=True)
-        except:
-            pass
-        
         return {
             'success': False,
             'error': f"Selenium fallback failed: {str(e)}",
             'url': url
         }
 
-def scrape_website_data(url: str, csv_contact_form_url: str = None) -> Dict[str, Any]:
+def failed_website_data(url: str, error_message: str) -> Dict[str, Any]:
+    """Result dict for a website that could not be scraped"""
+    return {
+        'url': url,
+        'title': '',
+        'companyName': '',
+        'industry': '',
+        'businessType': '',
+        'contactFormUrl': '',
+        'has_contact_form': False,
+        'aboutUsContent': '',
+        'platform': None,
+        'scrapingStatus': 'FAILED',
+        'error_message': error_message
+    }
+
+def build_website_data(url: str, result: Dict[str, Any], csv_contact_form_url: str = None,
+                       info: Optional[Dict[str, Any]] = None, upload_id: Optional[str] = None) -> Dict[str, Any]:
     """
-    Scrape a single website and extract data using robust error handling
+    Turn a fetch result from robust_scrape_website into the website data dict
     
     Args:
-        url: Website URL to scrape
+        url: Website URL as provided in the upload
+        result: Fetch result dict ('success', 'content' or 'error', ...)
         csv_contact_form_url: Contact form URL provided in CSV (if any)
+        info: extract_company_info result when the page was already parsed
+        upload_id: fileUploadId the website belongs to (keys its homepage snapshot)
     """
-    try:
-        # Use robust scraping with comprehensive error handling
-        result = robust_scrape_website(url)
-        
-        if not result['success']:
-            logger.warning(f"Failed to scrape {url}: {result['error']}")
-            return {
-                'url': url,
-                'title': '',
-                'companyName': '',
-                'industry': '',
-                'businessType': '',
-                'contactFormUrl': '',
-                'has_contact_form': False,
-                'aboutUsContent': '',
-                'scrapingStatus': 'FAILED',
-                'error_message': result['error']
-            }
-        
-        # Extract company information from successful scrape
+    if not result['success']:
+        logger.warning(f"Failed to scrape {url}: {result['error']}")
+        return failed_website_data(url, result['error'])
+    
+    # Keep the homepage for offline re-extraction (see scraping.reextract)
+    snapshot_store = get_snapshot_store()
+    if snapshot_store:
+        snapshot_store.save_site(url, result.get('url') or url, result['content'],
+                                 result.get('method', 'requests'), csv_contact_form_url, upload_id)
+    
+    # Extract company information from successful scrape
+    if info is None:
         info = extract_company_info(result['content'], url)
-        
-        logger.info(f"Successfully scraped {url} using {result.get('method', 'requests')}")
-        
-        # If CSV provided a contact form URL, use it instead of searching
-        if csv_contact_form_url:
-            logger.info(f"Using CSV-provided contact form URL: {csv_contact_form_url}")
-            info['has_contact_form'] = True
-            info['contactFormUrl'] = csv_contact_form_url
-            info['contact_form_source'] = 'csv'
-        # Enhanced: Try Selenium-based popup detection if no contact form found
-        elif not info['has_contact_form']:
-            logger.info(f"No contact form found via static analysis for {url}, trying Selenium detection...")
-            selenium_result = detect_popup_contact_forms_with_selenium(url)
-            
-            if selenium_result['has_contact_form']:
-                # Only use Selenium result if it's not a third-party widget and has a valid URL
-                best_form = selenium_result.get('best_contact_form', {})
-                if best_form and best_form.get('url') and best_form['url'] != url:
-                    # Check if it's not a third-party widget
-                    if not any(external in best_form['url'].lower() for external in ['usablenet', 'a40.', 'feedback', 'survey']):
-                        info['has_contact_form'] = True
-                        info['contactFormUrl'] = best_form['url']
-                        logger.info(f"Found valid popup contact form via Selenium for {url}")
-                    else:
-                        logger.info(f"Found third-party widget, not using as contact form for {url}")
+    
+    # Fingerprint the platform once; detection and submission read it from here on
+    platform = detect_platform(result['content'], result.get('headers'))
+    remember_platform(url, platform)
+    
+    logger.info(f"Successfully scraped {url} using {result.get('method', 'requests')} (platform: {platform})")
+    
+    # Nothing on the homepage: look for an embedded form builder, then crawl a few
+    # of the site's own pages over plain HTTP, before launching a browser
+    widget = None
+    crawled = None
+    if not csv_contact_form_url and not info['has_contact_form']:
+        page_url = result.get('url') or url
+        widget = detect_form_widget(result['content'], page_url, platform)
+        if widget is None:
+            crawled = find_contact_page(page_url, result['content'], platform=platform)
+    
+    # If CSV provided a contact form URL, use it instead of searching
+    if csv_contact_form_url:
+        logger.info(f"Using CSV-provided contact form URL: {csv_contact_form_url}")
+        info['has_contact_form'] = True
+        info['contactFormUrl'] = csv_contact_form_url
+        info['contact_form_source'] = 'csv'
+    elif widget:
+        logger.info(f"Found {widget.name} contact form on {url} (endpoint: {widget.endpoint or 'not derivable'})")
+        info['has_contact_form'] = True
+        info['contactFormUrl'] = widget.form_url
+    elif crawled:
+        logger.info(f"Contact page found by crawling {url}: {crawled['url']} ({crawled['reason']})")
+        info['has_contact_form'] = True
+        info['contactFormUrl'] = crawled['url']
+    # Enhanced: Try Selenium-based popup detection if no contact form found
+    elif not info['has_contact_form'] and SCRAPER_SELENIUM:
+        logger.info(f"No contact form found via static analysis for {url}, trying Selenium detection...")
+        selenium_result = detect_popup_contact_forms_with_selenium(url)
+        
+        if selenium_result['has_contact_form']:
+            # Only use Selenium result if it's not a third-party widget and has a valid URL
+            best_form = selenium_result.get('best_contact_form', {})
+            if best_form and best_form.get('url') and best_form['url'] != url:
+                # Check if it's not a third-party widget
+                if not any(external in best_form['url'].lower() for external in ['usablenet', 'a40.', 'feedback', 'survey']):
+                    info['has_contact_form'] = True
+                    info['contactFormUrl'] = best_form['url']
+                    logger.info(f"Found valid popup contact form via Selenium for {url}")
                 else:
-                    logger.info(f"No valid contact form URL found via Selenium for {url}")
-                
-                # Log additional contact forms found
-                if selenium_result['all_contact_forms']:
-                    logger.info(f"Found {len(selenium_result['all_contact_forms'])} total contact forms")
-                    for i, form in enumerate(selenium_result['all_contact_forms'][:3]):  # Log top 3
-                        logger.info(f"  {i+1}. {form['type']}: score {form['score']}, priority {form['priority']}")
+                    logger.info(f"Found third-party widget, not using as contact form for {url}")
             else:
-                logger.info(f"No valid contact forms found via Selenium for {url}")
+                logger.info(f"No valid contact form URL found via Selenium for {url}")
+            
+            # Log additional contact forms found
+            if selenium_result['all_contact_forms']:
+                logger.info(f"Found {len(selenium_result['all_contact_forms'])} total contact forms")
+                for i, form in enumerate(selenium_result['all_contact_forms'][:3]):  # Log top 3
+                    logger.info(f"  {i+1}. {form['type']}: score {form['score']}, priority {form['priority']}")
         else:
-            # If static analysis found contact forms, log the selection
-            logger.info(f"Contact form found via static analysis for {url}: {info['contactFormUrl']}")
+            logger.info(f"No valid contact forms found via Selenium for {url}")
+    else:
+        # If static analysis found contact forms, log the selection
+        logger.info(f"Contact form found via static analysis for {url}: {info['contactFormUrl']}")
+    
+    return {
+        'url': url,
+        'title': info['title'],
+        'companyName': info['companyName'],
+        'industry': info['industry'],
+        'businessType': info['businessType'],
+        'contactFormUrl': info['contactFormUrl'],
+        'has_contact_form': info['has_contact_form'],
+        'aboutUsContent': info['aboutUsContent'],
+        'platform': platform,
+        'scrapingStatus': 'COMPLETED',
+        'error_message': ''
+    }
+
+def scrape_website_data(url: str, csv_contact_form_url: str = None, upload_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Scrape a single website and extract data using robust error handling
+    
+    A fresh result for the same domain from an earlier upload is reused
+    without fetching the site.
+    
+    Args:
+        url: Website URL to scrape
+        csv_contact_form_url: Contact form URL provided in CSV (if any)
+        upload_id: fileUploadId the website belongs to (if any)
+    """
+    try:
+        result_cache = get_result_cache()
+        cached = result_cache.get(url, csv_contact_form_url)
+        if cached:
+            return cached
         
-        return {
-            'url': url,
-            'title': info['title'],
-            'companyName': info['companyName'],
-            'industry': info['industry'],
-            'businessType': info['businessType'],
-            'contactFormUrl': info['contactFormUrl'],
-            'has_contact_form': info['has_contact_form'],
-            'aboutUsContent': info['aboutUsContent'],
-            'scrapingStatus': 'COMPLETED',
-            'error_message': ''
-        }
+        # Use robust scraping with comprehensive error handling
+        result = robust_scrape_website(url)
+        website_data = build_website_data(url, result, csv_contact_form_url, upload_id=upload_id)
+        result_cache.store(url, website_data, csv_contact_form_url)
+        return website_data
         
     except Exception as e:
         logger.error(f"Unexpected error scraping website {url}: {str(e)}")
-        return {
-            'url': url,
-            'title': '',
-            'companyName': '',
-            'industry': '',
-            'businessType': '',
-            'contactFormUrl': '',
-            'has_contact_form': False,
-            'aboutUsContent': '',
-            'scrapingStatus': 'FAILED',
-            'error_message': str(e)
-        }
+        return failed_website_data(url, str(e))
 
 def detect_popup_contact_forms_with_selenium(url: str) -> Dict[str, Any]:
     """
     Use Selenium to detect popup contact forms that require JavaScript
     Enhanced to handle multiple contact forms with intelligent selection
     """
+    driver = None
     try:
-        from selenium import webdriver
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.chrome.options import Options
         import time
-        import tempfile
-        import os
-        
-        # Create a unique temporary directory for user data
-        temp_dir = tempfile.mkdtemp(prefix="chrome_user_data_")
-        
-        # Configure Chrome options for headless browsing
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        chrome_options.add_argument(f"--user-data-dir={temp_dir}")
-        
-        driver = webdriver.Chrome(options=chrome_options)
+        
+        driver = get_browser_pool().checkout()
         driver.get(url)
         
-        # Wait for page to load
-        time.sleep(3)
+        # Wait for scripts to finish building the page
+        wait_for_page_ready(driver)
         
         all_popup_forms = []
         contact_form_scores = []
@@ -1418,15 +1617,6 @@ def detect_popup_contact_forms_with_selenium(url: str) -> Dict[str, Any]:
                 logger.warning(f"Error checking static forms: {e}")
                 continue
         
-        driver.quit()
-        
-        # Clean up temporary directory
-        try:
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        except Exception as e:
-            logger.warning(f"Error cleaning up temp directory {temp_dir}: {e}")
-        
         # Select the best contact form
         best_contact_form = None
         if contact_form_scores:
@@ -1453,17 +1643,325 @@ def detect_popup_contact_forms_with_selenium(url: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error in Selenium popup detection: {e}")
         return {'popup_forms_detected': False, 'popup_forms': [], 'has_contact_form': False}
+    finally:
+        if driver is not None:
+            get_browser_pool().release(driver)
 
-@celery_app.task(bind=True)
-def scrape_websites_task(self, fileUploadId: str, userId: str, websites: List[str], job_id: str = None):
-    """
-    Celery task to scrape websites and save real data to database
+def _get_csv_contact_form_url(contact_form_urls: Dict[str, str], website) -> Optional[str]:
+    """
+    Contact form URL provided with the upload for this website (if any)
+    
+    Args:
+        contact_form_urls: websiteUrl -> contactFormUrl of the upload
+            (DatabaseManager.get_contact_form_urls_by_file_upload_id)
+        website: Website URL, or a website dict carrying its own contactFormUrl
+    """
+    if isinstance(website, dict) and 'contactFormUrl' in website:
+        return website['contactFormUrl']
+    elif isinstance(website, str):
+        return contact_form_urls.get(website)
+    return None
+
+def _start_follow_up_tasks(db_manager, fileUploadId: str, userId: str, website, website_data: Dict[str, Any]):
+    """Trigger AI message generation, and form submission when a contact form was found, for one saved website"""
+    # 🚀 IMMEDIATELY TRIGGER AI MESSAGE GENERATION for this website
+    try:
+        logger.info(f"Starting AI message generation for {website}")
+        
+        # Get the specific website record for AI generation
+        website_record = db_manager.get_website_by_url(website_data['url'])
+        
+        if website_record:
+            # Start AI message generation task for this individual website
+            # Use apply_async to avoid circular imports and get task ID
+            message_task = celery_app.send_task(
+                'celery_tasks.scraping_tasks.generate_messages_task',
+                args=[[website_record], "general", fileUploadId, userId],
+                kwargs={}
+            )
+            logger.info(f"AI message generation task started for {website}: {message_task.id}")
+            
+            # 🚀 IMMEDIATELY TRIGGER CONTACT FORM SUBMISSION if contact form exists
+            if website_data.get('has_contact_form') and website_data.get('contactFormUrl'):
+                try:
+                    logger.info(f"Starting contact form submission for {website}")
+                    
+                    # Start contact form submission task for this individual website
+                    submission_task = celery_app.send_task(
+                        'celery_tasks.form_submission_tasks.submit_contact_forms_task',
+                        args=[[website_record], "general", fileUploadId, userId],
+                        kwargs={}
+                    )
+                    logger.info(f"Contact form submission task started for {website}: {submission_task.id}")
+                    
+                except Exception as e:
+                    logger.error(f"Error starting contact form submission for {website}: {e}")
+            else:
+                logger.info(f"No contact form found for {website}, skipping submission")
+        else:
+            logger.warning(f"Website record not found for {website}")
+    except Exception as e:
+        logger.error(f"Error starting AI message generation for {website}: {e}")
+
+def _save_scraped_website(writer: WebsiteWriteBehind, db_manager, fileUploadId: str, userId: str, website,
+                          website_data: Dict[str, Any], trigger_follow_ups: bool = True,
+                          on_saved: Callable[[bool], Any] = None):
+    """
+    Queue the scraping results of one website on the write-behind writer;
+    once they are written, kick off its follow-up tasks and call on_saved(success)
+    """
+    def saved(success: bool):
+        if success and not trigger_follow_ups:
+            logger.info(f"Updated website without follow-up tasks: {website}")
+        elif success:
+            logger.info(f"Successfully scraped and updated: {website}")
+            # The follow-up tasks read the record back, so they start only once it is written
+            _start_follow_up_tasks(db_manager, fileUploadId, userId, website, website_data)
+        else:
+            logger.error(f"Failed to update website data for {website}")
+        if on_saved is not None:
+            on_saved(success)
+    
+    writer.add({
+        'fileUploadId': fileUploadId,
+        'websiteUrl': website_data['url'],
+        'companyName': website_data['companyName'],
+        'industry': website_data['industry'],
+        'businessType': website_data['businessType'],
+        'contactFormUrl': website_data['contactFormUrl'],
+        'hasContactForm': website_data['has_contact_form'],
+        'aboutUsContent': website_data['aboutUsContent'],
+        'scrapingStatus': website_data['scrapingStatus'],
+        'errorMessage': website_data['error_message'],
+        'platform': website_data.get('platform')
+    }, saved)
+
+async def scrape_and_save_websites(fileUploadId: str, userId: str, websites: List[str],
+                                   task_instance, db_manager) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Scrape websites concurrently with AsyncScrapeEngine and save each result as it completes
+    
+    A DNS pre-flight pass over the whole upload first marks websites whose
+    host does not resolve (or is known dead) as FAILED without scraping them.
+    Results are written in batches through a write-behind writer, which is
+    drained before this returns (also when scraping fails).
+    
+    Returns:
+        (scraped_data, processedWebsites, failedWebsites)
+    """
+    from scraping.async_engine import AsyncScrapeEngine
+    
+    scraped_data = []
+    totalWebsites = len(websites)
+    processedWebsites = 0
+    failedWebsites = 0
+    completed = 0
+    
+    def saved(website_data, success):
+        # Runs on the writer's flush thread (or in close()), one flush at a time
+        nonlocal processedWebsites, failedWebsites
+        if success:
+            scraped_data.append(website_data)
+            processedWebsites += 1
+        else:
+            failedWebsites += 1
+    
+    def record(website, website_data, trigger_follow_ups=True):
+        nonlocal completed, failedWebsites
+        completed += 1
+        try:
+            _save_scraped_website(writer, db_manager, fileUploadId, userId, website, website_data, trigger_follow_ups,
+                                  on_saved=lambda success: saved(website_data, success))
+        except Exception as e:
+            failedWebsites += 1
+            logger.error(f"Error scraping website {website}: {str(e)}")
+        
+        # Update progress
+        progress = int(completed / totalWebsites * 100)
+        task_instance.update_state(
+            state='PROGRESS',
+            meta={
+                'current': completed,
+                'total': totalWebsites,
+                'progress': progress,
+                'processedWebsites': processedWebsites,
+                'failedWebsites': failedWebsites
+            }
+        )
+    
+    with WebsiteWriteBehind(db_manager, SCRAPING_UPDATE) as writer:
+        # The upload's CSV contact form URLs in one query, off the event loop and during the DNS pass
+        contact_form_urls = asyncio.get_running_loop().run_in_executor(
+            None, db_manager.get_contact_form_urls_by_file_upload_id, fileUploadId
+        )
+        async with AsyncScrapeEngine(upload_id=fileUploadId) as engine:
+            # Pre-flight DNS pass: unresolvable hosts never reach the scraper
+            unreachable = await engine.preflight([str(website) for website in websites])
+            for index, fetch_result in unreachable.items():
+                record(websites[index], build_website_data(websites[index], fetch_result), trigger_follow_ups=False)
+        
+            contact_form_urls = await contact_form_urls
+            jobs = [
+                (website, _get_csv_contact_form_url(contact_form_urls, website))
+                for index, website in enumerate(websites) if index not in unreachable
+            ]
+            async for website, website_data in engine.scrape_many(jobs):
+                record(website, website_data)
+    
+    return scraped_data, processedWebsites, failedWebsites
+
+def split_into_batches(websites: List[str], batch_size: int = SCRAPER_BATCH_SIZE) -> List[List[str]]:
+    """Consecutive batches of at most batch_size websites"""
+    batch_size = max(1, batch_size)
+    return [websites[i:i + batch_size] for i in range(0, len(websites), batch_size)]
+
+def _scrape_batch(task_instance, fileUploadId: str, userId: str, websites: List[str]) -> Dict[str, Any]:
+    """Scrape and save one batch of an upload; returns its counts for finish_scraping"""
+    db_manager = DatabaseManager()
+    
+    # Scrape websites concurrently on a dedicated event loop
+    loop = asyncio.new_event_loop()
+    try:
+        scraped_data, processedWebsites, failedWebsites = loop.run_until_complete(
+            scrape_and_save_websites(fileUploadId, userId, websites, task_instance, db_manager)
+        )
+    finally:
+        loop.close()
+        # Page snapshots of the batch are written before the task reports done
+        flush_snapshots()
+    
+    db_manager.record_file_upload_chunk(fileUploadId, processedWebsites, failedWebsites)
+    return {
+        'scraped_count': len(scraped_data),
+        'processedWebsites': processedWebsites,
+        'failedWebsites': failedWebsites,
+        'websites': [data['url'] for data in scraped_data]
+    }
+
+def finish_scraping(fileUploadId: str, userId: str, batch_results: List[Dict[str, Any]],
+                    totalWebsites: int, job_id: str = None) -> Dict[str, Any]:
+    """
+    Add up the batch counts of an upload, close its scraping job, set the final
+    file upload status and trigger AI message generation
+    """
+    db_manager = DatabaseManager()
+    flush_snapshots()
+    
+    scraped_websites = [url for batch in batch_results for url in batch.get('websites', [])]
+    processedWebsites = sum(batch.get('processedWebsites', 0) for batch in batch_results)
+    failedWebsites = sum(batch.get('failedWebsites', 0) for batch in batch_results)
+    
+    # Update job status to COMPLETED
+    if job_id:
+        db_manager.update_scraping_job(
+            job_id=job_id,
+            status="COMPLETED",
+            totalWebsites=totalWebsites,
+            processedWebsites=processedWebsites,
+            failedWebsites=failedWebsites
+        )
+    
+    logger.info(f"Scraping task completed. Processed {processedWebsites}/{totalWebsites} websites, Failed: {failedWebsites}")
+    
+    # ✅ AUTOMATICALLY TRIGGER AI MESSAGE GENERATION after successful scraping
+    if processedWebsites > 0:
+        try:
+            logger.info(f"🚀 Automatically triggering AI message generation for {processedWebsites} successfully scraped websites")
+            
+            # Get the successfully scraped websites for AI generation
+            successful_websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
+            successful_websites = [w for w in successful_websites if w.get('scrapingStatus') == 'COMPLETED']
+            
+            if successful_websites:
+                # Trigger AI message generation automatically
+                ai_task = celery_app.send_task(
+                    'celery_tasks.scraping_tasks.generate_messages_task',
+                    args=[successful_websites, "general", fileUploadId, userId],
+                    kwargs={}
+                )
+                
+                logger.info(f"✅ AI message generation automatically triggered with task ID: {ai_task.id}")
+                
+                # Update file upload status to show AI generation is in progress
+                db_manager.update_file_upload(fileUploadId, {
+                    'status': 'AI_GENERATION_IN_PROGRESS',
+                    'processedWebsites': processedWebsites,
+                    'failedWebsites': failedWebsites
+                })
+            else:
+                logger.warning("No successfully scraped websites found for AI generation")
+                # Update status to show scraping completed but no websites for AI
+                db_manager.update_file_upload(fileUploadId, {
+                    'status': 'SCRAPING_COMPLETED_NO_WEBSITES',
+                    'processedWebsites': processedWebsites,
+                    'failedWebsites': failedWebsites
+                })
+                
+        except Exception as ai_error:
+            logger.error(f"❌ Failed to automatically trigger AI message generation: {ai_error}")
+            # Don't fail the scraping task if AI generation fails
+            # Just log the error and continue
+            db_manager.update_file_upload(fileUploadId, {
+                'status': 'SCRAPING_COMPLETED_AI_FAILED',
+                'processedWebsites': processedWebsites,
+                'failedWebsites': failedWebsites
+            })
+    else:
+        # No websites were successfully scraped
+        logger.warning("No websites were successfully scraped, cannot trigger AI generation")
+        db_manager.update_file_upload(fileUploadId, {
+            'status': 'SCRAPING_FAILED_ALL_WEBSITES',
+            'processedWebsites': 0,
+            'failedWebsites': totalWebsites
+        })
+    
+    return {
+        'status': 'success',
+        'scraped_count': len(scraped_websites),
+        'totalWebsites': totalWebsites,
+        'processedWebsites': processedWebsites,
+        'failedWebsites': failedWebsites,
+        'websites': scraped_websites
+    }
+
+def _mark_scraping_failed(fileUploadId: str, job_id: str = None):
+    # Update job status to FAILED
+    if job_id:
+        try:
+            db_manager = DatabaseManager()
+            db_manager.update_scraping_job_status(job_id, "FAILED")
+        except Exception as db_error:
+            logger.error(f"Failed to update job status: {db_error}")
+    
+    # Update file upload status to FAILED
+    try:
+        db_manager = DatabaseManager()
+        db_manager.update_file_upload(fileUploadId, {
+            'status': 'SCRAPING_FAILED',
+            'processingCompletedAt': datetime.now().isoformat()
+        })
+    except Exception as update_error:
+        logger.error(f"Failed to update file upload status: {update_error}")
+
+@celery_app.task(bind=True)
+def scrape_websites_task(self, fileUploadId: str, userId: str, websites: List[str], job_id: str = None):
+    """
+    Celery task to scrape websites and save real data to database
+    
+    An upload larger than SCRAPER_BATCH_SIZE is split into batches that
+    scrape_website_batch_task runs on any worker of the scraping queue, as
+    the header of a chord whose callback (finish_scraping_task) sets the
+    final status. Each batch stays well inside the task time limit, and
+    the upload scales with the number of workers. Smaller uploads are
+    scraped in this task.
     """
     try:
         logger.info(f"Starting scraping task for {len(websites)} websites")
         
         # Initialize database manager
         db_manager = DatabaseManager()
+        totalWebsites = len(websites)
+        batches = split_into_batches(websites)
         
         # Create file upload record if it doesn't exist
         # Calculate estimated file size based on number of websites (roughly 100 bytes per website)
@@ -1480,214 +1978,45 @@ def scrape_websites_task(self, fileUploadId: str, userId: str, websites: List[st
             totalWebsites=len(websites),
             processedWebsites=0,
             failedWebsites=0,
-            totalChunks=1,
+            totalChunks=len(batches),
             completedChunks=0
         )
+        # Batches add their counts as they finish
+        db_manager.update_file_upload(fileUploadId, {
+            'totalChunks': len(batches),
+            'completedChunks': 0,
+            'processedWebsites': 0,
+            'failedWebsites': 0
+        })
         
         # Update job status to RUNNING
         if job_id:
             db_manager.update_scraping_job_status(job_id, "RUNNING")
         
-        # Scrape websites
-        scraped_data = []
-        totalWebsites = len(websites)
-        processedWebsites = 0
-        failedWebsites = 0
-        
-        for i, website in enumerate(websites):
-            try:
-                logger.info(f"Scraping website {i+1}/{totalWebsites}: {website}")
-                
-                # Get contact form URL from database if available
-                csv_contact_form_url = None
-                if isinstance(website, dict) and 'contactFormUrl' in website:
-                    csv_contact_form_url = website['contactFormUrl']
-                elif isinstance(website, str):
-                    # Try to get contact form URL from database
-                    website_record = db_manager.get_website_by_url(website, fileUploadId)
-                    if website_record and website_record.get('contactFormUrl'):
-                        csv_contact_form_url = website_record['contactFormUrl']
-                
-                # Scrape the website
-                website_data = scrape_website_data(website, csv_contact_form_url)
-                
-                # Update existing website record with scraping data
-                success = db_manager.update_website_with_scraping_data(
-                    fileUploadId=fileUploadId,
-                    url=website_data['url'],
-                    title=website_data['title'],
-                    companyName=website_data['companyName'],
-                    industry=website_data['industry'],
-                    businessType=website_data['businessType'],
-                    contactFormUrl=website_data['contactFormUrl'],
-                    has_contact_form=website_data['has_contact_form'],
-                    aboutUsContent=website_data['aboutUsContent'],
-                    scrapingStatus=website_data['scrapingStatus'],
-                    error_message=website_data['error_message']
-                )
-                
-                if success:
-                    scraped_data.append(website_data)
-                    processedWebsites += 1
-                    logger.info(f"Successfully scraped and updated: {website}")
-                    
-                    # 🚀 IMMEDIATELY TRIGGER AI MESSAGE GENERATION for this website
-                    try:
-                        logger.info(f"Starting AI message generation for {website}")
-                        
-                        # Get the specific website record for AI generation
-                        website_record = db_manager.get_website_by_url(website_data['url'])
-                        
-                        if website_record:
-                            # Start AI message generation task for this individual website
-                            # Use apply_async to avoid circular imports and get task ID
-                            message_task = celery_app.send_task(
-                                'celery_tasks.scraping_tasks.generate_messages_task',
-                                args=[[website_record], "general", fileUploadId, userId],
-                                kwargs={}
-                            )
-                            logger.info(f"AI message generation task started for {website}: {message_task.id}")
-                            
-                            # 🚀 IMMEDIATELY TRIGGER CONTACT FORM SUBMISSION if contact form exists
-                            if website_data.get('has_contact_form') and website_data.get('contactFormUrl'):
-                                try:
-                                    logger.info(f"Starting contact form submission for {website}")
-                                    
-                                    # Start contact form submission task for this individual website
-                                    submission_task = celery_app.send_task(
-                                        'celery_tasks.form_submission_tasks.submit_contact_forms_task',
-                                        args=[[website_record], "general", fileUploadId, userId],
-                                        kwargs={}
-                                    )
-                                    logger.info(f"Contact form submission task started for {website}: {submission_task.id}")
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error starting contact form submission for {website}: {e}")
-                            else:
-                                logger.info(f"No contact form found for {website}, skipping submission")
-                        else:
-                            logger.warning(f"Website record not found for {website}")
-                    except Exception as e:
-                        logger.error(f"Error starting AI message generation for {website}: {e}")
-                    
-                else:
-                    failedWebsites += 1
-                    logger.error(f"Failed to update website data for {website}")
-                
-                # Update progress
-                progress = int((i + 1) / totalWebsites * 100)
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i + 1,
-                        'total': totalWebsites,
-                        'progress': progress,
-                        'processedWebsites': processedWebsites,
-                        'failedWebsites': failedWebsites
-                    }
-                )
-                
-                # Small delay to avoid overwhelming servers
-                time.sleep(1)
-                
-            except Exception as e:
-                failedWebsites += 1
-                logger.error(f"Error scraping website {website}: {str(e)}")
-                continue
-        
-        # Update job status to COMPLETED
-        if job_id:
-            db_manager.update_scraping_job(
-                job_id=job_id,
-                status="COMPLETED",
-                total_websites=totalWebsites,
-                processed_websites=processedWebsites,
-                failed_websites=failedWebsites
-            )
+        if len(batches) <= 1:
+            batch_result = _scrape_batch(self, fileUploadId, userId, websites)
+            return finish_scraping(fileUploadId, userId, [batch_result], totalWebsites, job_id)
         
-        logger.info(f"Scraping task completed. Processed {processedWebsites}/{totalWebsites} websites, Failed: {failedWebsites}")
+        header = [
+            scrape_website_batch_task.s(fileUploadId, userId, batch, index, len(batches))
+            for index, batch in enumerate(batches)
+        ]
+        callback = finish_scraping_task.s(fileUploadId, userId, totalWebsites, job_id)
+        chord_result = chord(header)(callback)
         
-        # ✅ AUTOMATICALLY TRIGGER AI MESSAGE GENERATION after successful scraping
-        if processedWebsites > 0:
-            try:
-                logger.info(f"🚀 Automatically triggering AI message generation for {processedWebsites} successfully scraped websites")
-                
-                # Get the successfully scraped websites for AI generation
-                successful_websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
-                successful_websites = [w for w in successful_websites if w.get('scrapingStatus') == 'COMPLETED']
-                
-                if successful_websites:
-                    # Trigger AI message generation automatically
-                    ai_task = celery_app.send_task(
-                        'celery_tasks.scraping_tasks.generate_messages_task',
-                        args=[successful_websites, "general", fileUploadId, userId],
-                        kwargs={}
-                    )
-                    
-                    logger.info(f"✅ AI message generation automatically triggered with task ID: {ai_task.id}")
-                    
-                    # Update file upload status to show AI generation is in progress
-                    db_manager.update_file_upload(fileUploadId, {
-                        'status': 'AI_GENERATION_IN_PROGRESS',
-                        'processedWebsites': processedWebsites,
-                        'failedWebsites': failedWebsites
-                    })
-                else:
-                    logger.warning("No successfully scraped websites found for AI generation")
-                    # Update status to show scraping completed but no websites for AI
-                    db_manager.update_file_upload(fileUploadId, {
-                        'status': 'SCRAPING_COMPLETED_NO_WEBSITES',
-                        'processedWebsites': processedWebsites,
-                        'failedWebsites': failedWebsites
-                    })
-                    
-            except Exception as ai_error:
-                logger.error(f"❌ Failed to automatically trigger AI message generation: {ai_error}")
-                # Don't fail the scraping task if AI generation fails
-                # Just log the error and continue
-                db_manager.update_file_upload(fileUploadId, {
-                    'status': 'SCRAPING_COMPLETED_AI_FAILED',
-                    'processedWebsites': processedWebsites,
-                    'failedWebsites': failedWebsites
-                })
-        else:
-            # No websites were successfully scraped
-            logger.warning("No websites were successfully scraped, cannot trigger AI generation")
-            db_manager.update_file_upload(fileUploadId, {
-                'status': 'SCRAPING_FAILED_ALL_WEBSITES',
-                'processedWebsites': 0,
-                'failedWebsites': totalWebsites
-            })
+        logger.info(f"Dispatched {totalWebsites} websites of upload {fileUploadId} as {len(batches)} batches "
+                    f"of up to {SCRAPER_BATCH_SIZE} (callback task {chord_result.id})")
         
         return {
-            'status': 'success',
-            'scraped_count': len(scraped_data),
+            'status': 'dispatched',
             'totalWebsites': totalWebsites,
-            'processedWebsites': processedWebsites,
-            'failedWebsites': failedWebsites,
-            'websites': [data['url'] for data in scraped_data]
+            'batches': len(batches),
+            'callback_task_id': chord_result.id
         }
         
     except Exception as e:
         logger.error(f"Error in scraping task: {str(e)}")
-        
-        # Update job status to FAILED
-        if job_id:
-            try:
-                db_manager = DatabaseManager()
-                db_manager.update_scraping_job_status(job_id, "FAILED")
-            except Exception as db_error:
-                logger.error(f"Failed to update job status: {db_error}")
-        
-        # Update file upload status to FAILED
-        try:
-            db_manager = DatabaseManager()
-            db_manager.update_file_upload(fileUploadId, {
-                'status': 'SCRAPING_FAILED',
-                'processingCompletedAt': datetime.now().isoformat()
-            })
-        except Exception as update_error:
-            logger.error(f"Failed to update file upload status: {update_error}")
+        _mark_scraping_failed(fileUploadId, job_id)
         
         # Return error result instead of raising exception to prevent serialization issues
         return {
@@ -1699,6 +2028,50 @@ def scrape_websites_task(self, fileUploadId: str, userId: str, websites: List[st
             'websites': []
         }
 
+@celery_app.task(bind=True)
+def scrape_website_batch_task(self, fileUploadId: str, userId: str, websites: List[str],
+                              batch_index: int = 0, batch_count: int = 1):
+    """
+    Scrape one batch of an upload (a chord header task of scrape_websites_task)
+    
+    Never raises: a failed batch reports all of its websites as failed, so
+    the chord callback still runs and the upload gets a final status.
+    """
+    logger.info(f"Starting batch {batch_index + 1}/{batch_count} of upload {fileUploadId} ({len(websites)} websites)")
+    try:
+        return _scrape_batch(self, fileUploadId, userId, websites)
+    except Exception as e:
+        logger.error(f"Batch {batch_index + 1}/{batch_count} of upload {fileUploadId} failed: {str(e)}")
+        try:
+            DatabaseManager().record_file_upload_chunk(fileUploadId, 0, len(websites))
+        except Exception as db_error:
+            logger.error(f"Failed to record failed batch: {db_error}")
+        return {
+            'scraped_count': 0,
+            'processedWebsites': 0,
+            'failedWebsites': len(websites),
+            'websites': [],
+            'error': str(e)
+        }
+
+@celery_app.task(bind=True)
+def finish_scraping_task(self, batch_results: List[Dict[str, Any]], fileUploadId: str, userId: str,
+                         totalWebsites: int, job_id: str = None):
+    """Chord callback of scrape_websites_task: aggregate the batches and set the final status"""
+    try:
+        return finish_scraping(fileUploadId, userId, batch_results, totalWebsites, job_id)
+    except Exception as e:
+        logger.error(f"Error finishing scraping of upload {fileUploadId}: {str(e)}")
+        _mark_scraping_failed(fileUploadId, job_id)
+        return {
+            'status': 'error',
+            'error': str(e),
+            'totalWebsites': totalWebsites,
+            'processedWebsites': 0,
+            'failedWebsites': 0,
+            'websites': []
+        }
+
 @celery_app.task(bind=True)
 def scrape_websites_async_task(self, fileUploadId: str, userId: str, websites: List[str], job_id: str = None):
     """
@@ -1740,110 +2113,10 @@ async def scrape_websites_async(fileUploadId: str, userId: str, websites: List[s
     """
     Async function to scrape websites
     """
-    scraped_data = []
     totalWebsites = len(websites)
-    processedWebsites = 0
-    failedWebsites = 0
-    
-    async with aiohttp.ClientSession() as session:
-        for i, website in enumerate(websites):
-            try:
-                # Get contact form URL from database if available
-                csv_contact_form_url = None
-                if isinstance(website, dict) and 'contactFormUrl' in website:
-                    csv_contact_form_url = website['contactFormUrl']
-                elif isinstance(website, str):
-                    # Try to get contact form URL from database
-                    website_record = db_manager.get_website_by_url(website, fileUploadId)
-                    if website_record and website_record.get('contactFormUrl'):
-                        csv_contact_form_url = website_record['contactFormUrl']
-                
-                # Use the same scraping logic but with aiohttp
-                website_data = scrape_website_data(website, csv_contact_form_url)
-                
-                # Update existing website record with scraping data
-                success = db_manager.update_website_with_scraping_data(
-                    fileUploadId=fileUploadId,
-                    url=website_data['url'],
-                    title=website_data['title'],
-                    companyName=website_data['companyName'],
-                    industry=website_data['industry'],
-                    businessType=website_data['businessType'],
-                    contactFormUrl=website_data['contactFormUrl'],
-                    has_contact_form=website_data['has_contact_form'],
-                    aboutUsContent=website_data['aboutUsContent'],
-                    scrapingStatus=website_data['scrapingStatus'],
-                    error_message=website_data['error_message']
-                )
-                
-                if success:
-                    scraped_data.append(website_data)
-                    processedWebsites += 1
-                    logger.info(f"Successfully scraped and updated: {website}")
-                    
-                    # 🚀 IMMEDIATELY TRIGGER AI MESSAGE GENERATION for this website
-                    try:
-                        logger.info(f"Starting AI message generation for {website}")
-                        
-                        # Get the specific website record for AI generation
-                        website_record = db_manager.get_website_by_url(website_data['url'])
-                        
-                        if website_record:
-                            # Start AI message generation task for this individual website
-                            # Use apply_async to avoid circular imports and get task ID
-                            message_task = celery_app.send_task(
-                                'celery_tasks.scraping_tasks.generate_messages_task',
-                                args=[[website_record], "general", fileUploadId, userId],
-                                kwargs={}
-                            )
-                            logger.info(f"AI message generation task started for {website}: {message_task.id}")
-                            
-                            # 🚀 IMMEDIATELY TRIGGER CONTACT FORM SUBMISSION if contact form exists
-                            if website_data.get('has_contact_form') and website_data.get('contactFormUrl'):
-                                try:
-                                    logger.info(f"Starting contact form submission for {website}")
-                                    
-                                    # Start contact form submission task for this individual website
-                                    submission_task = celery_app.send_task(
-                                        'celery_tasks.form_submission_tasks.submit_contact_forms_task',
-                                        args=[[website_record], "general", fileUploadId, userId],
-                                        kwargs={}
-                                    )
-                                    logger.info(f"Contact form submission task started for {website}: {submission_task.id}")
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error starting contact form submission for {website}: {e}")
-                            else:
-                                logger.info(f"No contact form found for {website}, skipping submission")
-                        else:
-                            logger.warning(f"Website record not found for {website}")
-                    except Exception as e:
-                        logger.error(f"Error starting AI message generation for {website}: {e}")
-                    
-                else:
-                    failedWebsites += 1
-                    logger.error(f"Failed to update website data for: {website}")
-                
-                # Update progress
-                progress = int((i + 1) / totalWebsites * 100)
-                task_instance.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i + 1,
-                        'total': totalWebsites,
-                        'progress': progress,
-                        'processedWebsites': processedWebsites,
-                        'failedWebsites': failedWebsites
-                    }
-                )
-                
-                # Small delay
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                failedWebsites += 1
-                logger.error(f"Error scraping website {website}: {str(e)}")
-                continue
+    scraped_data, processedWebsites, failedWebsites = await scrape_and_save_websites(
+        fileUploadId, userId, websites, task_instance, db_manager
+    )
     
     # Update job status to COMPLETED
     if job_id:
@@ -1892,49 +2165,58 @@ def generate_messages_task(self, website_data: List[Dict], message_type: str = "
         logger.info(f"🔍 DEBUG: Max messages to generate: {max_messages_to_generate}")
         logger.info(f"🔍 DEBUG: Testing mode enabled: {TESTING_MODE_ENABLED}")
         
-        for i, website in enumerate(website_data):
-            try:
-                logger.info(f"🔍 DEBUG: Processing website {i+1}/{len(website_data)}: {website.get('websiteUrl')}")
-                logger.info(f"🔍 DEBUG: Website scraping status: {repr(website.get('scrapingStatus'))}")
-                logger.info(f"🔍 DEBUG: Current processed count: {processedWebsites}, limit: {max_messages_to_generate}")
+        # Messages are written through a write-behind writer, drained before
+        # the upload status below is set from what was stored
+        unsaved_ids = set()
+        
+        def message_saved(website, success):
+            if not success:
+                unsaved_ids.add(website.get('id'))
+                logger.error(f"Failed to save message for: {website.get('websiteUrl')}")
+        
+        with WebsiteWriteBehind(db_manager, MESSAGE_UPDATE) as writer:
+            for i, website in enumerate(website_data):
+                try:
+                    logger.info(f"🔍 DEBUG: Processing website {i+1}/{len(website_data)}: {website.get('websiteUrl')}")
+                    logger.info(f"🔍 DEBUG: Website scraping status: {repr(website.get('scrapingStatus'))}")
+                    logger.info(f"🔍 DEBUG: Current processed count: {processedWebsites}, limit: {max_messages_to_generate}")
                 
-                # Check if we've reached the testing limit
-                if processedWebsites >= max_messages_to_generate:
-                    logger.info(f"Testing limit reached ({max_messages_to_generate} messages). Skipping remaining websites.")
-                    break
+                    # Check if we've reached the testing limit
+                    if processedWebsites >= max_messages_to_generate:
+                        logger.info(f"Testing limit reached ({max_messages_to_generate} messages). Skipping remaining websites.")
+                        break
                 
-                # Only generate messages for successfully scraped websites
-                if website.get('scrapingStatus') != 'COMPLETED':
-                    logger.info(f"Skipping website {website.get('websiteUrl')} - scraping status: {website.get('scrapingStatus')}")
-                    continue
+                    # Only generate messages for successfully scraped websites
+                    if website.get('scrapingStatus') != 'COMPLETED':
+                        logger.info(f"Skipping website {website.get('websiteUrl')} - scraping status: {website.get('scrapingStatus')}")
+                        continue
                 
-                # Generate message based on website data
-                logger.info(f"🔍 DEBUG: About to call generate_ai_message for website: {website.get('websiteUrl', 'Unknown URL')}")
-                logger.info(f"🔍 DEBUG: Website data being passed: {website}")
-                logger.info(f"🔍 DEBUG: Message type: {message_type}")
+                    # Generate message based on website data
+                    logger.info(f"🔍 DEBUG: About to call generate_ai_message for website: {website.get('websiteUrl', 'Unknown URL')}")
+                    logger.info(f"🔍 DEBUG: Website data being passed: {website}")
+                    logger.info(f"🔍 DEBUG: Message type: {message_type}")
                 
-                message, confidence = generate_ai_message(website, message_type)
+                    message, confidence = generate_ai_message(website, message_type)
                 
-                logger.info(f"🔍 DEBUG: generate_ai_message returned - message: {type(message)}, confidence: {confidence}")
-                if message:
-                    logger.info(f"🔍 DEBUG: Message content preview: {message[:100]}...")
-                else:
-                    logger.info(f"🔍 DEBUG: Message is None or empty")
+                    logger.info(f"🔍 DEBUG: generate_ai_message returned - message: {type(message)}, confidence: {confidence}")
+                    if message:
+                        logger.info(f"🔍 DEBUG: Message content preview: {message[:100]}...")
+                    else:
+                        logger.info(f"🔍 DEBUG: Message is None or empty")
                 
-                # Check if message generation was successful
-                if not message or message.strip() == "":
-                    logger.warning(f"Empty message generated for {website.get('websiteUrl')}, skipping database update")
-                    failedWebsites += 1
-                    continue
+                    # Check if message generation was successful
+                    if not message or message.strip() == "":
+                        logger.warning(f"Empty message generated for {website.get('websiteUrl')}, skipping database update")
+                        failedWebsites += 1
+                        continue
                 
-                # Save generated message to database
-                success = db_manager.update_website_message(
-                    website_id=website.get('id'),
-                    generatedMessage=message,
-                    messageStatus="GENERATED"
-                )
+                    # Queue generated message for the database (written in batches)
+                    writer.add({
+                        'id': website.get('id'),
+                        'generatedMessage': message,
+                        'messageStatus': "GENERATED"
+                    }, functools.partial(message_saved, website))
                 
-                if success:
                     generated_messages.append({
                         'website_id': website.get('id'),
                         'url': website.get('websiteUrl'),
@@ -1942,32 +2224,34 @@ def generate_messages_task(self, website_data: List[Dict], message_type: str = "
                     })
                     processedWebsites += 1
                     logger.info(f"Generated message for: {website.get('websiteUrl')} ({processedWebsites}/{max_messages_to_generate})")
-                else:
-                    failedWebsites += 1
-                    logger.error(f"Failed to save message for: {website.get('websiteUrl')}")
                 
-                # Update progress
-                progress = int((i + 1) / totalWebsites * 100)
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i + 1,
-                        'total': totalWebsites,
-                        'progress': progress,
-                        'processedWebsites': processedWebsites,
-                        'failedWebsites': failedWebsites,
-                        'messages_generated': processedWebsites,
-                        'max_messages': max_messages_to_generate
-                    }
-                )
+                    # Update progress
+                    progress = int((i + 1) / totalWebsites * 100)
+                    self.update_state(
+                        state='PROGRESS',
+                        meta={
+                            'current': i + 1,
+                            'total': totalWebsites,
+                            'progress': progress,
+                            'processedWebsites': processedWebsites,
+                            'failedWebsites': failedWebsites,
+                            'messages_generated': processedWebsites,
+                            'max_messages': max_messages_to_generate
+                        }
+                    )
                 
-                # Small delay
-                time.sleep(0.5)
+                    # Small delay
+                    time.sleep(0.5)
                 
-            except Exception as e:
-                failedWebsites += 1
-                logger.error(f"Error generating message for website {website.get('url')}: {str(e)}")
-                continue
+                except Exception as e:
+                    failedWebsites += 1
+                    logger.error(f"Error generating message for website {website.get('url')}: {str(e)}")
+                    continue
+        
+        if unsaved_ids:
+            generated_messages = [m for m in generated_messages if m['website_id'] not in unsaved_ids]
+            processedWebsites -= len(unsaved_ids)
+            failedWebsites += len(unsaved_ids)
         
         # Final status update
         if processedWebsites > 0:
@@ -13,6 +13,9 @@ from typing import Dict, List, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from celery import shared_task
 from database.database_manager import DatabaseManager
+from database.write_behind import SUBMISSION_UPDATE, WebsiteWriteBehind
+from scraping.concurrency import OUTCOME_ERROR, OUTCOME_TIMEOUT, get_limiter
+from scraping.platform_fingerprint import DEFAULT_HTTP_ORDER, platform_profile
 import random
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,10 @@ class UltraFastFormSubmitter:
         self.max_workers = max_workers
         self.session = None
         self.db_manager = DatabaseManager()
+        # Submission results are written in batches while submit_forms_parallel runs
+        self.writer = None
+        # Submissions in flight adapt between a floor and max_workers (see scraping.concurrency)
+        self.limiter = get_limiter('submission', max_workers)
     
     async def submit_forms_parallel(self, websites: List[Dict], file_upload_id: str) -> Dict[str, Any]:
         """
@@ -59,21 +66,27 @@ class UltraFastFormSubmitter:
             'results': []
         }
         
-        for i in range(0, len(websites_with_forms), batch_size):
-            batch = websites_with_forms[i:i + batch_size]
-            logger.info(f"🔥 Processing batch {i//batch_size + 1}: {len(batch)} websites")
+        # Drained (also on error) before the final status is set
+        self.writer = WebsiteWriteBehind(self.db_manager, SUBMISSION_UPDATE)
+        try:
+            with self.writer:
+                for i in range(0, len(websites_with_forms), batch_size):
+                    batch = websites_with_forms[i:i + batch_size]
+                    logger.info(f"🔥 Processing batch {i//batch_size + 1}: {len(batch)} websites")
             
-            # Process batch in parallel
-            batch_results = await self._process_batch_parallel(batch)
+                    # Process batch in parallel
+                    batch_results = await self._process_batch_parallel(batch)
             
-            # Update results
-            results['successful_submissions'] += batch_results['successful']
-            results['failed_submissions'] += batch_results['failed']
-            results['results'].extend(batch_results['results'])
+                    # Update results
+                    results['successful_submissions'] += batch_results['successful']
+                    results['failed_submissions'] += batch_results['failed']
+                    results['results'].extend(batch_results['results'])
             
-            # Update progress
-            progress = min(100, int((i + len(batch)) / len(websites_with_forms) * 100))
-            logger.info(f"📈 Progress: {progress}% - {results['successful_submissions']} successful, {results['failed_submissions']} failed")
+                    # Update progress
+                    progress = min(100, int((i + len(batch)) / len(websites_with_forms) * 100))
+                    logger.info(f"📈 Progress: {progress}% - {results['successful_submissions']} successful, {results['failed_submissions']} failed")
+        finally:
+            self.writer = None
         
         # Update final status
         if results['successful_submissions'] > 0:
@@ -104,7 +117,7 @@ class UltraFastFormSubmitter:
             # Create tasks for all websites in the batch
             tasks = []
             for website in websites:
-                task = self._submit_single_form_async(session, website)
+                task = self._submit_limited(session, website)
                 tasks.append(task)
             
             # Execute all tasks in parallel
@@ -138,6 +151,16 @@ class UltraFastFormSubmitter:
                 'results': processed_results
             }
     
+    async def _submit_limited(self, session: aiohttp.ClientSession, website: Dict) -> Dict[str, Any]:
+        """Submit a single form once the adaptive submission limit has room"""
+        async with self.limiter.slot():
+            return await self._submit_single_form_async(session, website)
+    
+    def _record_failure(self, started: float, error: Exception):
+        """Feed a request that got no answer to the adaptive limit"""
+        outcome = OUTCOME_TIMEOUT if isinstance(error, asyncio.TimeoutError) else OUTCOME_ERROR
+        self.limiter.record(time.monotonic() - started, outcome)
+    
     async def _submit_single_form_async(self, session: aiohttp.ClientSession, website: Dict) -> Dict[str, Any]:
         """
         Submit a single form asynchronously - ULTRA FAST version
@@ -159,23 +182,8 @@ class UltraFastFormSubmitter:
             # ULTRA-FAST form submission using HTTP requests (no Selenium overhead)
             submission_result = await self._submit_form_http_fast(session, contact_form_url, generated_message, website)
             
-            # Update database asynchronously
-            if submission_result.get('success'):
-                self.db_manager.update_website_submission(
-                    website_id=website.get('id'),
-                    submission_status="SUBMITTED",
-                    submission_time=submission_result.get('submission_time'),
-                    response_content=submission_result.get('response_page', ''),
-                    submitted_form_fields=json.dumps(submission_result.get('fields_submitted', {}))
-                )
-            else:
-                self.db_manager.update_website_submission(
-                    website_id=website.get('id'),
-                    submission_status="FAILED",
-                    submission_time=submission_result.get('submission_time'),
-                    error_message=submission_result.get('error', 'Unknown error'),
-                    submitted_form_fields=json.dumps(submission_result.get('fields_submitted', {}))
-                )
+            # Queue the outcome for the database (the write-behind writer batches the UPDATEs)
+            self._store_submission(website, submission_result)
             
             return {
                 'website_id': website.get('id'),
@@ -195,6 +203,28 @@ class UltraFastFormSubmitter:
                 'error': str(e)
             }
     
+    def _store_submission(self, website: Dict, submission_result: Dict[str, Any]):
+        """Save a submission outcome through the writer, or directly outside submit_forms_parallel"""
+        success = submission_result.get('success')
+        fields = json.dumps(submission_result.get('fields_submitted', {}))
+        if self.writer is None:
+            self.db_manager.update_website_submission(
+                website_id=website.get('id'),
+                submission_status="SUBMITTED" if success else "FAILED",
+                submission_time=submission_result.get('submission_time'),
+                response_content=submission_result.get('response_page', '') if success else None,
+                error_message=None if success else submission_result.get('error', 'Unknown error'),
+                submitted_form_fields=fields
+            )
+            return
+        self.writer.add({
+            'id': website.get('id'),
+            'submissionStatus': "SUBMITTED" if success else "FAILED",
+            'submissionResponse': submission_result.get('response_page', '') if success else None,
+            'submissionError': None if success else submission_result.get('error', 'Unknown error'),
+            'submittedFormFields': fields
+        })
+    
     async def _submit_form_http_fast(self, session: aiohttp.ClientSession, form_url: str, message: str, website: Dict) -> Dict[str, Any]:
         """
         Ultra-fast HTTP form submission (no Selenium)
@@ -222,14 +252,17 @@ class UltraFastFormSubmitter:
                 'subject': ['subject', 'topic', 'inquiry_type', 'reason']
             }
             
-            # Try multiple form submission strategies
-            strategies = [
-                self._try_post_form,
-                self._try_get_form,
-                self._try_ajax_form
-            ]
+            # Try multiple form submission strategies, in the order that suits the
+            # platform fingerprinted while scraping (e.g. AJAX first on WordPress)
+            strategies = {
+                'post': self._try_post_form,
+                'get': self._try_get_form,
+                'ajax': self._try_ajax_form
+            }
+            profile = platform_profile(website.get('platform'))
+            order = profile.http_order if profile else DEFAULT_HTTP_ORDER
             
-            for strategy in strategies:
+            for strategy in (strategies[name] for name in order):
                 try:
                     result = await strategy(session, form_url, form_data, possible_fields)
                     if result.get('success'):
@@ -259,8 +292,10 @@ class UltraFastFormSubmitter:
             endpoints = [form_url, f"{form_url}/contact", f"{form_url}/contact-us", f"{form_url}/form"]
             
             for endpoint in endpoints:
+                started = time.monotonic()
                 try:
                     async with session.post(endpoint, data=form_data, allow_redirects=True) as response:
+                        self.limiter.record_status(time.monotonic() - started, response.status)
                         if response.status in [200, 201, 302]:
                             return {
                                 'success': True,
@@ -269,7 +304,8 @@ class UltraFastFormSubmitter:
                                 'fields_submitted': form_data,
                                 'method': 'POST'
                             }
-                except Exception:
+                except Exception as e:
+                    self._record_failure(started, e)
                     continue
             
             return {'success': False, 'error': 'POST submission failed'}
@@ -278,11 +314,13 @@ class UltraFastFormSubmitter:
     
     async def _try_get_form(self, session: aiohttp.ClientSession, form_url: str, form_data: Dict, possible_fields: Dict) -> Dict[str, Any]:
         """Try GET form submission"""
+        started = time.monotonic()
         try:
             # Convert form data to query parameters
             params = {k: v for k, v in form_data.items()}
             
             async with session.get(form_url, params=params, allow_redirects=True) as response:
+                self.limiter.record_status(time.monotonic() - started, response.status)
                 if response.status in [200, 201, 302]:
                     return {
                         'success': True,
@@ -294,10 +332,12 @@ class UltraFastFormSubmitter:
             
             return {'success': False, 'error': 'GET submission failed'}
         except Exception as e:
+            self._record_failure(started, e)
             return {'success': False, 'error': f'GET error: {e}'}
     
     async def _try_ajax_form(self, session: aiohttp.ClientSession, form_url: str, form_data: Dict, possible_fields: Dict) -> Dict[str, Any]:
         """Try AJAX form submission"""
+        started = time.monotonic()
         try:
             headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
@@ -306,6 +346,7 @@ class UltraFastFormSubmitter:
             }
             
             async with session.post(form_url, data=form_data, headers=headers, allow_redirects=True) as response:
+                self.limiter.record_status(time.monotonic() - started, response.status)
                 if response.status in [200, 201, 302]:
                     return {
                         'success': True,
@@ -317,6 +358,7 @@ class UltraFastFormSubmitter:
             
             return {'success': False, 'error': 'AJAX submission failed'}
         except Exception as e:
+            self._record_failure(started, e)
             return {'success': False, 'error': f'AJAX error: {e}'}
 
 @shared_task(bind=True, name="ultra_fast_form_submission.submit_forms_ultra_fast")
@@ -10,13 +10,13 @@ from typing import Dict, List, Optional, Any
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+from scraping.browser_pool import get_browser_pool
+
 logger = logging.getLogger(__name__)
 
 class ContactFormDetector:
@@ -24,7 +24,6 @@ class ContactFormDetector:
     
     def __init__(self):
         self.session = self._create_session()
-        self.chrome_options = self._setup_chrome_options()
         
     def _create_session(self):
         """Create HTTP session with headers"""
@@ -39,17 +38,6 @@ class ContactFormDetector:
         })
         return session
     
-    def _setup_chrome_options(self):
-        """Setup Chrome options for Selenium"""
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-        return options
-    
     def detect_contact_forms(self, url: str) -> Dict[str, Any]:
         """
         Detect contact forms on a website using multiple methods
@@ -334,8 +322,8 @@ class ContactFormDetector:
     def _detect_dynamic_forms(self, url: str) -> Dict[str, Any]:
         """Detect contact forms using Selenium for dynamic content"""
         try:
-            driver = webdriver.Chrome(options=self.chrome_options)
-            driver.set_page_load_timeout(30)
+            pool = get_browser_pool()
+            driver = pool.checkout()
             
             try:
                 driver.get(url)
@@ -369,7 +357,7 @@ class ContactFormDetector:
                 return result
                 
             finally:
-                driver.quit()
+                pool.release(driver)
                 
         except Exception as e:
             logger.error(f"Error in dynamic form detection: {e}")
@@ -0,0 +1,562 @@
+"""
+Async database access for the FastAPI endpoints
+
+The API's handlers are coroutines, but DatabaseManager is synchronous:
+every query it ran from a handler stopped the event loop, and with it
+every other request, until Postgres answered. AsyncRepository serves the
+queries the API needs (websites by upload, file uploads, predefined
+messages, contact inquiries) from its own asyncpg pool instead, returning
+the same dicts as the DatabaseManager methods of the same name.
+
+asyncpg is an optional dependency: without it the same statements run on
+the psycopg2 connection pool from a bounded thread pool, so the event
+loop still never waits on the database.
+"""
+import os
+import re
+import json
+import uuid
+import base64
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from database.connection_pool import DEFAULT_DATABASE_URL, get_connection_pool
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+# API database configuration
+# - API_DB_POOL_MIN_SIZE: asyncpg connections opened with the pool (default: 2)
+# - API_DB_POOL_MAX_SIZE: asyncpg connections the API process may hold open (default: 20)
+# - API_DB_COMMAND_TIMEOUT: seconds a single statement may run (default: 30)
+# - API_DB_THREADS: threads running statements when asyncpg is not installed (default: 8)
+API_DB_POOL_MIN_SIZE = int(os.getenv('API_DB_POOL_MIN_SIZE', '2'))
+API_DB_POOL_MAX_SIZE = int(os.getenv('API_DB_POOL_MAX_SIZE', '20'))
+API_DB_COMMAND_TIMEOUT = float(os.getenv('API_DB_COMMAND_TIMEOUT', '30'))
+API_DB_THREADS = int(os.getenv('API_DB_THREADS', '8'))
+
+_PLACEHOLDER = re.compile(r'\$(\d+)')
+
+WEBSITE_COLUMNS = '''id, "userId", "fileUploadId", "websiteUrl", "companyName", "industry",
+                     "businessType", "contactFormUrl", "hasContactForm", "aboutUsContent",
+                     "scrapingStatus", "messageStatus", "generatedMessage"'''
+
+# Columns of get_websites_by_file_upload_id and list_websites_page rows
+WEBSITE_LISTING_COLUMNS = WEBSITE_COLUMNS + ''', "submissionStatus",
+                     "submissionResponse", "submissionError", "submittedFormFields", "createdAt", "updatedAt",
+                     "platform"'''
+
+# Sort fields of list_websites_page and the expression each sorts by; NULL
+# text sorts as '' so that keyset comparisons never meet a NULL
+# (websites_upload_created_idx serves the default createdAt order)
+WEBSITE_SORT_KEYS = {
+    'createdAt': '"createdAt"',
+    'updatedAt': '"updatedAt"',
+    'websiteUrl': '"websiteUrl"',
+    'companyName': 'COALESCE("companyName", \'\')',
+    'industry': 'COALESCE("industry", \'\')',
+    'businessType': 'COALESCE("businessType", \'\')',
+    'scrapingStatus': 'COALESCE("scrapingStatus", \'\')',
+    'messageStatus': 'COALESCE("messageStatus", \'\')',
+    'submissionStatus': 'COALESCE("submissionStatus", \'\')'
+}
+WEBSITE_TIMESTAMP_SORTS = ('createdAt', 'updatedAt')
+WEBSITE_SEARCH_COLUMNS = ('"websiteUrl"', '"companyName"', '"industry"', '"businessType"')
+
+
+def _isoformat(row: Dict[str, Any], *columns: str) -> Dict[str, Any]:
+    for column in columns:
+        if row.get(column) is not None:
+            row[column] = row[column].isoformat()
+    return row
+
+
+def _website_listing_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    row['submissionStatus'] = row['submissionStatus'] or "PENDING"
+    return _isoformat(row, 'createdAt', 'updatedAt')
+
+
+def _encode_cursor(sortBy: str, sortOrder: str, value: Any, website_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sortBy, sortOrder, value, website_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, sortBy: str, sortOrder: str) -> tuple:
+    """(sort value, id) of the row a cursor points after; ValueError when it is malformed or for another order"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, cursor_order, value, website_id = json.loads(payload)
+        if sortBy in WEBSITE_TIMESTAMP_SORTS:
+            value = datetime.fromisoformat(value)
+    except Exception:
+        raise ValueError("malformed cursor")
+    if (cursor_sort, cursor_order) != (sortBy, sortOrder):
+        raise ValueError("cursor was issued for a different sort order")
+    return value, website_id
+
+
+async def _init_connection(conn):
+    # Decode json like psycopg2 does, so both paths return the same values
+    for pgtype in ('json', 'jsonb'):
+        await conn.set_type_codec(pgtype, encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+
+
+class AsyncRepository:
+    """Coroutine versions of the DatabaseManager queries used by the API"""
+
+    def __init__(self, dsn: str, min_size: int = API_DB_POOL_MIN_SIZE, max_size: int = API_DB_POOL_MAX_SIZE,
+                 command_timeout: float = API_DB_COMMAND_TIMEOUT, threads: int = API_DB_THREADS):
+        self.dsn = dsn
+        self.max_size = max(1, max_size)
+        self.min_size = max(0, min(min_size, self.max_size))
+        self.command_timeout = command_timeout
+        self.threads = max(1, threads)
+
+        self._pool = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return 'asyncpg' if asyncpg is not None else 'psycopg2-threads'
+
+    async def _get_pool(self):
+        if self._pool is None:
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        command_timeout=self.command_timeout,
+                        init=_init_connection
+                    )
+                    logger.info(f"Opened API asyncpg pool ({self.min_size}-{self.max_size} connections)")
+        return self._pool
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    logger.warning(f"asyncpg is not installed; running API queries on {self.threads} threads "
+                                   f"over the psycopg2 pool (pip install asyncpg)")
+                    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='api-db')
+        return self._executor
+
+    def _run_sync(self, query: str, args: tuple, fetch: Optional[str]):
+        """Run one statement through psycopg2: $n placeholders become %(pn)s"""
+        query = _PLACEHOLDER.sub(lambda match: f'%(p{match.group(1)})s', query.replace('%', '%%'))
+        params = {f'p{number}': value for number, value in enumerate(args, 1)}
+        conn = get_connection_pool().connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                if fetch == 'all':
+                    result = cursor.fetchall()
+                elif fetch == 'one':
+                    result = cursor.fetchone()
+                else:
+                    result = cursor.rowcount
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    async def _call(self, query: str, args: tuple, fetch: Optional[str]):
+        if asyncpg is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self._run_sync, query, args, fetch)
+
+        pool = await self._get_pool()
+        if fetch == 'all':
+            return await pool.fetch(query, *args)
+        if fetch == 'one':
+            return await pool.fetchrow(query, *args)
+        status = await pool.execute(query, *args)
+        # Status is e.g. "UPDATE 3" or "INSERT 0 1"; the last word is the row count
+        last = status.rsplit(' ', 1)[-1]
+        return int(last) if last.isdigit() else 0
+
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        """Run a query written with $1, $2, ... placeholders and return its rows as dicts"""
+        return [dict(row) for row in await self._call(query, args, 'all')]
+
+    async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        row = await self._call(query, args, 'one')
+        return dict(row) if row is not None else None
+
+    async def execute(self, query: str, *args) -> int:
+        """Run a statement and return the number of rows it affected"""
+        return await self._call(query, args, None)
+
+    # Websites
+
+    async def get_websites_by_file_upload_id(self, fileUploadId: str) -> List[Dict[str, Any]]:
+        """Get all websites for a specific file upload"""
+        try:
+            rows = await self.fetch(f"""
+                SELECT {WEBSITE_LISTING_COLUMNS}
+                FROM websites
+                WHERE "fileUploadId" = $1
+                ORDER BY "createdAt" DESC
+            """, fileUploadId)
+            return [_website_listing_row(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting websites by file upload ID: {e}")
+            return []
+
+    async def list_websites_page(self, fileUploadId: str, limit: int = 10, search: str = "",
+                                 sortBy: str = "createdAt", sortOrder: str = "desc", page: int = 1,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get one page of an upload's websites, filtered and sorted in SQL
+
+        search matches URL, company name, industry or business type
+        (case-insensitive substring). Unknown sort fields sort by createdAt.
+        Pages are addressed by number (OFFSET) or, cheaper on large
+        uploads, by the nextCursor of the previous page (keyset).
+
+        Returns:
+            Dict with websites, totalCount, withMessages, withoutMessages
+            and nextCursor (None on the last page)
+        """
+        if sortBy not in WEBSITE_SORT_KEYS:
+            sortBy = 'createdAt'
+        sortOrder = 'asc' if (sortOrder or '').lower() == 'asc' else 'desc'
+        sort_key = WEBSITE_SORT_KEYS[sortBy]
+        limit = max(1, limit)
+
+        conditions = ['"fileUploadId" = $1']
+        params: List[Any] = [fileUploadId]
+        if search:
+            params.append('%' + re.sub(r'([\\%_])', r'\\\1', search) + '%')
+            conditions.append('(' + ' OR '.join(f'{column} ILIKE ${len(params)}' for column in WEBSITE_SEARCH_COLUMNS) + ')')
+        where_clause = ' AND '.join(conditions)
+
+        counts = await self.fetchrow(f"""
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE "generatedMessage" IS NOT NULL AND "generatedMessage" != '') AS with_messages
+            FROM websites
+            WHERE {where_clause}
+        """, *params)
+
+        page_conditions = list(conditions)
+        page_params = list(params)
+        if cursor:
+            value, website_id = _decode_cursor(cursor, sortBy, sortOrder)
+            page_params.extend([value, website_id])
+            comparison = '<' if sortOrder == 'desc' else '>'
+            page_conditions.append(f'({sort_key}, id) {comparison} (${len(page_params) - 1}, ${len(page_params)})')
+            offset = 0
+        else:
+            offset = (max(1, page) - 1) * limit
+        page_params.extend([limit + 1, offset])
+
+        rows = await self.fetch(f"""
+            SELECT {WEBSITE_LISTING_COLUMNS}, {sort_key} AS sort_value
+            FROM websites
+            WHERE {' AND '.join(page_conditions)}
+            ORDER BY {sort_key} {sortOrder.upper()}, id {sortOrder.upper()}
+            LIMIT ${len(page_params) - 1} OFFSET ${len(page_params)}
+        """, *page_params)
+
+        # One row past the page tells whether another page follows
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(sortBy, sortOrder, rows[-1]['sort_value'], rows[-1]['id'])
+        for row in rows:
+            del row['sort_value']
+            _website_listing_row(row)
+
+        return {
+            'websites': rows,
+            'totalCount': counts['total'],
+            'withMessages': counts['with_messages'],
+            'withoutMessages': counts['total'] - counts['with_messages'],
+            'nextCursor': next_cursor
+        }
+
+    async def get_website_by_id(self, website_id: str) -> Optional[Dict[str, Any]]:
+        """Get website record by ID"""
+        try:
+            return await self.fetchrow("""
+                SELECT id, "userId", "fileUploadId", "websiteUrl", "companyName",
+                       "businessType", "industry", "aboutUsContent", "scrapingStatus",
+                       "messageStatus", "generatedMessage", "contactFormUrl", "hasContactForm",
+                       "createdAt", "updatedAt"
+                FROM websites
+                WHERE id = $1
+            """, website_id)
+        except Exception as e:
+            logger.error(f"Error getting website by ID: {e}")
+            return None
+
+    async def _get_websites_where(self, condition: str, fileUploadId: Optional[str],
+                                  userId: Optional[str]) -> List[Dict[str, Any]]:
+        where_conditions = [condition]
+        params = []
+        if fileUploadId:
+            params.append(fileUploadId)
+            where_conditions.append(f'"fileUploadId" = ${len(params)}')
+        if userId:
+            params.append(userId)
+            where_conditions.append(f'"userId" = ${len(params)}')
+
+        rows = await self.fetch(f"""
+            SELECT {WEBSITE_COLUMNS}, "createdAt", "updatedAt"
+            FROM websites
+            WHERE {" AND ".join(where_conditions)}
+            ORDER BY "createdAt" DESC
+        """, *params)
+        return [_isoformat(row, 'createdAt', 'updatedAt') for row in rows]
+
+    async def get_websites_with_messages(self, fileUploadId: str = None, userId: str = None) -> List[Dict[str, Any]]:
+        """Get websites that have generated messages"""
+        try:
+            return await self._get_websites_where(
+                '"generatedMessage" IS NOT NULL AND "generatedMessage" != \'\'', fileUploadId, userId)
+        except Exception as e:
+            logger.error(f"Error getting websites with messages: {e}")
+            return []
+
+    async def get_websites_without_messages(self, fileUploadId: str = None, userId: str = None) -> List[Dict[str, Any]]:
+        """Get websites that don't have generated messages"""
+        try:
+            return await self._get_websites_where(
+                '("generatedMessage" IS NULL OR "generatedMessage" != \'\')', fileUploadId, userId)
+        except Exception as e:
+            logger.error(f"Error getting websites without messages: {e}")
+            return []
+
+    async def update_website_message(self, website_id: str, generatedMessage: str,
+                                     messageStatus: str = "GENERATED") -> bool:
+        """Update website with generated message"""
+        try:
+            await self.execute("""
+                UPDATE websites
+                SET "generatedMessage" = $1, "messageStatus" = $2, "updatedAt" = CURRENT_TIMESTAMP
+                WHERE id = $3
+            """, generatedMessage, messageStatus, website_id)
+            logger.info(f"Updated website {website_id} with generated message")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating website message: {e}")
+            return False
+
+    # File uploads
+
+    async def get_all_file_uploads(self) -> List[Dict[str, Any]]:
+        """Get all file uploads (for admin view)"""
+        try:
+            return await self.fetch("""
+                SELECT id, "userId", filename, "originalName", "fileSize",
+                       "fileType", status, "totalWebsites", "processedWebsites",
+                       "failedWebsites", "createdAt", "updatedAt"
+                FROM file_uploads
+                ORDER BY "createdAt" DESC
+            """)
+        except Exception as e:
+            logger.error(f"Error getting all file uploads: {e}")
+            return []
+
+    async def get_file_upload_by_id(self, fileUploadId: str) -> Optional[Dict[str, Any]]:
+        """Get file upload by ID"""
+        try:
+            return await self.fetchrow("""
+                SELECT id, "userId", filename, "originalName", "fileSize", "fileType",
+                       status, "totalWebsites", "processedWebsites", "failedWebsites",
+                       "totalChunks", "completedChunks", "createdAt", "updatedAt"
+                FROM file_uploads
+                WHERE id = $1
+            """, fileUploadId)
+        except Exception as e:
+            logger.error(f"Error getting file upload by ID: {e}")
+            return None
+
+    async def get_file_upload_by_original_name(self, original_name: str, userId: str) -> Optional[Dict[str, Any]]:
+        """Get the newest file upload of a user with this original filename"""
+        try:
+            return await self.fetchrow("""
+                SELECT id, "userId", filename, "originalName", "fileSize", "fileType",
+                       status, "totalWebsites", "processedWebsites", "failedWebsites",
+                       "totalChunks", "completedChunks", "createdAt", "updatedAt"
+                FROM file_uploads
+                WHERE "originalName" = $1 AND "userId" = $2
+                ORDER BY "createdAt" DESC
+                LIMIT 1
+            """, original_name, userId)
+        except Exception as e:
+            logger.error(f"Error getting file upload by original name: {e}")
+            return None
+
+    async def get_file_upload_history(self) -> List[Dict[str, Any]]:
+        """Get every file upload with its uploader and count of successful submissions"""
+        return await self.fetch("""
+            SELECT fu.id, fu.filename, fu."originalName", fu."fileSize", fu."fileType", fu.status,
+                   fu."totalWebsites", fu."processedWebsites", fu."failedWebsites",
+                   fu."createdAt", fu."updatedAt",
+                   u.name AS user_name, u.email AS user_email,
+                   (SELECT COUNT(*) FROM websites w
+                    WHERE w."fileUploadId" = fu.id AND w."submissionStatus" = 'SUCCESS') AS messages_sent
+            FROM file_uploads fu
+            LEFT JOIN users u ON fu."userId" = u.id
+            ORDER BY fu."createdAt" DESC
+        """)
+
+    async def create_file_upload(self, fileUploadId: str = None, userId: str = None, filename: str = None,
+                                 originalName: str = None, fileSize: int = 0, fileType: str = "csv",
+                                 status: str = "PENDING", totalWebsites: int = 0, processedWebsites: int = 0,
+                                 failedWebsites: int = 0, totalChunks: int = 0, completedChunks: int = 0) -> Optional[str]:
+        """Create a file upload record and return the ID"""
+        try:
+            created = await self.execute("""
+                INSERT INTO file_uploads (id, "userId", filename, "originalName", "fileSize", "fileType", status,
+                                          "totalWebsites", "processedWebsites", "failedWebsites", "totalChunks",
+                                          "completedChunks", "updatedAt")
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, CURRENT_TIMESTAMP)
+                ON CONFLICT (id) DO NOTHING
+            """, fileUploadId, userId, filename or "unknown", originalName or filename or "unknown",
+                fileSize, fileType, status, totalWebsites, processedWebsites, failedWebsites,
+                totalChunks, completedChunks)
+            if created:
+                logger.info(f"Created file upload record: {fileUploadId}")
+            else:
+                logger.info(f"File upload {fileUploadId} already exists, skipping creation")
+            return fileUploadId
+        except Exception as e:
+            logger.error(f"Error creating file upload record {fileUploadId}: {e}")
+            return None
+
+    async def update_file_upload_status(self, fileUploadId: str, status: str) -> bool:
+        """Update the status of a file upload"""
+        try:
+            await self.execute("""
+                UPDATE file_uploads
+                SET status = $1, "updatedAt" = CURRENT_TIMESTAMP
+                WHERE id = $2
+            """, status, fileUploadId)
+            logger.info(f"Updated file upload {fileUploadId} status to {status}")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating file upload status: {e}")
+            return False
+
+    # Predefined messages
+
+    async def create_predefined_message(self, message_data: Dict[str, Any]) -> bool:
+        """Create a new predefined message"""
+        try:
+            await self.execute("""
+                INSERT INTO predefined_messages (id, title, content, message_type, industry, business_type, tone,
+                                                 is_active, usage_count, success_rate, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 0, 0.0, NOW(), NOW())
+            """, str(uuid.uuid4()),
+                message_data.get('title', ''),
+                message_data.get('content', ''),
+                message_data.get('messageType', 'general'),
+                message_data.get('industry'),
+                message_data.get('businessType'),
+                message_data.get('tone', 'professional'),
+                message_data.get('isActive', True))
+            return True
+        except Exception as e:
+            logger.error(f"Error creating predefined message: {e}")
+            return False
+
+    async def get_predefined_message_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Get predefined message by ID"""
+        try:
+            row = await self.fetchrow("""
+                SELECT id, title, content, message_type AS "messageType", industry,
+                       business_type AS "businessType", tone, is_active AS "isActive",
+                       usage_count AS "usageCount", success_rate AS "successRate",
+                       created_at AS "createdAt", updated_at AS "updatedAt"
+                FROM predefined_messages
+                WHERE id = $1
+            """, message_id)
+            if row is None:
+                return None
+            row['successRate'] = float(row['successRate']) if row['successRate'] else 0.0
+            return _isoformat(row, 'createdAt', 'updatedAt')
+        except Exception as e:
+            logger.error(f"Error getting predefined message by ID: {e}")
+            return None
+
+    async def delete_predefined_message(self, message_id: str) -> bool:
+        """Delete predefined message"""
+        try:
+            await self.execute("DELETE FROM predefined_messages WHERE id = $1", message_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting predefined message: {e}")
+            return False
+
+    # Contact inquiries
+
+    async def get_contact_inquiries_by_user(self, userId: str) -> List[Dict[str, Any]]:
+        """Get all contact inquiries for a specific user"""
+        try:
+            rows = await self.fetch("""
+                SELECT ci.id, ci."websiteId", ci."userId", ci."contactFormUrl", ci."submittedMessage",
+                       ci.status, ci."submittedAt", ci."responseReceived", ci."responseContent",
+                       ci."createdAt", ci."updatedAt", w."websiteUrl", w."companyName"
+                FROM contact_inquiries ci
+                JOIN websites w ON ci."websiteId" = w.id
+                WHERE ci."userId" = $1
+                ORDER BY ci."createdAt" DESC
+            """, userId)
+            return [_isoformat(row, 'submittedAt', 'createdAt', 'updatedAt') for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting contact inquiries by user: {e}")
+            return []
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'backend': self.backend, 'min_size': self.min_size, 'max_size': self.max_size}
+        if self._pool is not None:
+            stats['size'] = self._pool.get_size()
+            stats['idle'] = self._pool.get_idle_size()
+        if self._executor is not None:
+            stats['threads'] = self.threads
+        return stats
+
+    async def close(self):
+        """Close the asyncpg pool and stop the fallback threads"""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=False)
+
+
+# Global repository instance, per process (asyncpg connections must not cross a fork)
+_repository = None
+_repository_pid = None
+_repository_lock = threading.Lock()
+
+
+def get_async_repository() -> AsyncRepository:
+    """Get this process's async repository"""
+    global _repository, _repository_pid
+    if _repository is None or _repository_pid != os.getpid():
+        with _repository_lock:
+            if _repository is None or _repository_pid != os.getpid():
+                _repository = AsyncRepository(os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL))
+                _repository_pid = os.getpid()
+    return _repository
@@ -116,10 +116,19 @@ def create_tables(cursor):
             "generatedMessage" TEXT,
             "confidence" DECIMAL(5,4),
             "errorMessage" TEXT,
+            "platform" VARCHAR(50),
             "createdAt" TIMESTAMP DEFAULT NOW(),
             "updatedAt" TIMESTAMP DEFAULT NOW()
         )
     """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS websites_file_upload_url_key
+        ON websites ("fileUploadId", "websiteUrl")
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS websites_upload_created_idx
+        ON websites ("fileUploadId", "createdAt", id)
+    """)
     logger.info("Created websites table")
     
     # Static content table
@@ -0,0 +1,7 @@
+-- Migration: Add Website Platform Fingerprint
+-- Date: 2026-10-17
+-- Description: Store the CMS / site builder fingerprinted while scraping
+-- (wordpress, wix, squarespace, ..., 'custom' when none matched; NULL until scraped)
+
+ALTER TABLE websites
+ADD COLUMN IF NOT EXISTS "platform" VARCHAR(50);
@@ -0,0 +1,13 @@
+-- Migration: Index Website Listings by Upload and Creation Time
+-- Date: 2026-10-17
+-- Description: The website listing endpoints page through an upload's
+-- websites in SQL, ordered by ("createdAt", id), and continue from a
+-- keyset cursor; this index serves that order. Keyset comparisons skip
+-- rows whose sort value is NULL, so missing timestamps are backfilled.
+-- Run outside a transaction block (CREATE INDEX CONCURRENTLY), e.g. with psql -f.
+
+UPDATE websites SET "createdAt" = COALESCE("updatedAt", NOW()) WHERE "createdAt" IS NULL;
+UPDATE websites SET "updatedAt" = "createdAt" WHERE "updatedAt" IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS websites_upload_created_idx
+ON websites ("fileUploadId", "createdAt", id);
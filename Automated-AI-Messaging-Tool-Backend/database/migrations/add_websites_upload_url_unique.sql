@@ -0,0 +1,68 @@
+-- Migration: Unique Website URL per File Upload
+-- Date: 2026-10-17
+-- Description: create_websites_batch inserts with
+-- ON CONFLICT ("fileUploadId", "websiteUrl") DO NOTHING, which needs a
+-- unique index on those columns. Duplicate rows left by the old
+-- check-then-insert path are removed first, keeping the row that got
+-- furthest (message sent, then submission attempted, then generated
+-- message, then completed scrape, then the oldest). Form submissions and contact inquiries of
+-- the removed rows are moved to the kept row instead of being deleted
+-- with them (form_submissions cascades) or blocking the delete
+-- (contact_inquiries does not).
+-- Run outside a transaction block (CREATE INDEX CONCURRENTLY), e.g. with psql -f.
+
+BEGIN;
+
+CREATE TEMP TABLE website_duplicates ON COMMIT DROP AS
+SELECT id, kept_id
+FROM (
+    SELECT id,
+           FIRST_VALUE(id) OVER progress AS kept_id,
+           ROW_NUMBER() OVER progress AS duplicate_rank
+    FROM websites
+    WINDOW progress AS (
+        PARTITION BY "fileUploadId", "websiteUrl"
+        ORDER BY
+            -- Sent messages first, so a contacted company is never messaged again;
+            -- RESPONDED is not written by the backend, but the column documents it
+            CASE "submissionStatus"
+                WHEN 'SUCCESS' THEN 0
+                WHEN 'SUBMITTED' THEN 0
+                WHEN 'RESPONDED' THEN 0
+                WHEN 'SUBMITTING' THEN 1
+                WHEN 'FAILED' THEN 2
+                WHEN 'NO_FORM_FOUND' THEN 3
+                ELSE 4
+            END,
+            "generatedMessage" IS NULL,
+            "scrapingStatus" IS DISTINCT FROM 'COMPLETED',
+            "createdAt" NULLS LAST,
+            id
+    )
+) ranked
+WHERE duplicate_rank > 1;
+
+DO $$
+BEGIN
+    IF to_regclass('form_submissions') IS NOT NULL THEN
+        UPDATE form_submissions
+        SET website_id = d.kept_id
+        FROM website_duplicates d
+        WHERE form_submissions.website_id = d.id;
+    END IF;
+
+    IF to_regclass('contact_inquiries') IS NOT NULL THEN
+        UPDATE contact_inquiries
+        SET "websiteId" = d.kept_id
+        FROM website_duplicates d
+        WHERE contact_inquiries."websiteId" = d.id;
+    END IF;
+END $$;
+
+DELETE FROM websites
+WHERE id IN (SELECT id FROM website_duplicates);
+
+COMMIT;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS websites_file_upload_url_key
+ON websites ("fileUploadId", "websiteUrl");
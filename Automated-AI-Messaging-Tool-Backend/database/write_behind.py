@@ -0,0 +1,166 @@
+"""
+Write-behind buffer for per-website result updates
+
+The scraping, message generation and form submission loops store one
+result per website. Written one UPDATE and one commit at a time, those
+round trips dominated per-site time; WebsiteWriteBehind collects the row
+updates instead and writes them with a single UPDATE ... FROM (VALUES ...)
+every DB_WRITE_BEHIND_ROWS rows or DB_WRITE_BEHIND_MS milliseconds,
+whichever comes first, from a background thread. Leaving its `with`
+block (normally or on an exception) writes whatever is still buffered.
+
+Callers learn whether their row was written through the on_flushed
+callback given to add(), which runs after the flush's commit - anything
+that reads the row back (follow-up tasks) belongs there.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Write-behind configuration
+# - DB_WRITE_BEHIND_ROWS: buffered rows that trigger a flush (default: 100)
+# - DB_WRITE_BEHIND_MS: longest a row waits in the buffer, in milliseconds (default: 500)
+DB_WRITE_BEHIND_ROWS = int(os.getenv('DB_WRITE_BEHIND_ROWS', '100'))
+DB_WRITE_BEHIND_MS = int(os.getenv('DB_WRITE_BEHIND_MS', '500'))
+
+
+class WebsiteUpdate(NamedTuple):
+    """One kind of websites row update, for DatabaseManager.update_websites_batch"""
+    name: str
+    key: Tuple[str, ...]                     # columns identifying the row
+    columns: Tuple[Tuple[str, str], ...]     # (column, Postgres type) of key and updated columns
+    keep_stored: Tuple[str, ...] = ()        # updated columns where NULL keeps the stored value
+
+
+# Row of update_website_with_scraping_data
+SCRAPING_UPDATE = WebsiteUpdate(
+    'scraping',
+    ('fileUploadId', 'websiteUrl'),
+    (('fileUploadId', 'text'), ('websiteUrl', 'text'), ('companyName', 'text'), ('industry', 'text'),
+     ('businessType', 'text'), ('contactFormUrl', 'text'), ('hasContactForm', 'boolean'),
+     ('aboutUsContent', 'text'), ('scrapingStatus', 'text'), ('errorMessage', 'text'), ('platform', 'text')),
+    keep_stored=('platform',)
+)
+
+# Row of update_website_message
+MESSAGE_UPDATE = WebsiteUpdate(
+    'message',
+    ('id',),
+    (('id', 'text'), ('generatedMessage', 'text'), ('messageStatus', 'text'))
+)
+
+# Row of update_website_submission
+SUBMISSION_UPDATE = WebsiteUpdate(
+    'submission',
+    ('id',),
+    (('id', 'text'), ('submissionStatus', 'text'), ('submissionResponse', 'text'),
+     ('submissionError', 'text'), ('submittedFormFields', 'jsonb'))
+)
+
+
+class WebsiteWriteBehind:
+    """Buffers websites row updates of one kind and writes them in batches"""
+
+    def __init__(self, db_manager, update: WebsiteUpdate, max_rows: int = DB_WRITE_BEHIND_ROWS,
+                 max_delay_ms: int = DB_WRITE_BEHIND_MS):
+        self.db_manager = db_manager
+        self.update = update
+        self.max_rows = max(1, max_rows)
+        self.max_delay = max(1, max_delay_ms) / 1000
+
+        self._lock = threading.Lock()            # guards _pending
+        self._flush_lock = threading.Lock()      # one flush at a time, in order
+        self._pending: Dict[Tuple, Tuple[Tuple, List[Callable[[bool], Any]]]] = {}
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.flushes = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+
+    def add(self, values: Dict[str, Any], on_flushed: Optional[Callable[[bool], Any]] = None):
+        """
+        Buffer one row update; values maps the update's columns to their values.
+        A later update of the same row replaces this one (both callbacks run).
+        """
+        key = tuple(values.get(column) for column in self.update.key)
+        row = tuple(values.get(column) for column, _ in self.update.columns)
+        with self._lock:
+            _, callbacks = self._pending.get(key, (None, []))
+            if on_flushed is not None:
+                callbacks.append(on_flushed)
+            self._pending[key] = (row, callbacks)
+            full = len(self._pending) >= self.max_rows
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.update.name}", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.max_delay)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row now"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            start = time.perf_counter()
+            updated = self.db_manager.update_websites_batch(self.update, [row for row, _ in pending.values()])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            written = set(updated) if updated is not None else set()
+            failed = len(pending) - len(written & pending.keys())
+            self.flushes += 1
+            self.flush_ms_total += elapsed_ms
+            self.flush_ms_max = max(self.flush_ms_max, elapsed_ms)
+            self.rows_written += len(pending) - failed
+            self.rows_failed += failed
+            logger.info(f"Wrote {len(pending) - failed}/{len(pending)} {self.update.name} rows in {elapsed_ms:.1f} ms")
+
+            for key, (_, callbacks) in pending.items():
+                for callback in callbacks:
+                    try:
+                        callback(key in written)
+                    except Exception as e:
+                        logger.error(f"Error after writing {self.update.name} row {key}: {e}")
+
+    def close(self):
+        """Stop the flush thread and write what is still buffered"""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        if self.flushes:
+            logger.info(f"Write-behind {self.update.name}: {self.rows_written} rows written, {self.rows_failed} failed, "
+                        f"{self.flushes} flushes, {self.flush_ms_total / self.flushes:.1f} ms avg / "
+                        f"{self.flush_ms_max:.1f} ms max flush latency")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rows_written': self.rows_written,
+            'rows_failed': self.rows_failed,
+            'flushes': self.flushes,
+            'avg_flush_ms': round(self.flush_ms_total / self.flushes, 2) if self.flushes else 0.0,
+            'max_flush_ms': round(self.flush_ms_max, 2)
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
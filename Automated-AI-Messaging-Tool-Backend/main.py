@@ -13,7 +13,9 @@ from celery_tasks.scraping_tasks import scrape_websites_task, generate_messages_
 from celery_tasks.file_tasks import process_file_upload_task, process_chunk_task, extract_websites_from_file_task
 from celery_tasks.form_submission_tasks import contact_form_submission_task
 from database.database_manager import DatabaseManager
+from database.async_repository import get_async_repository
 from ai.message_generator import GeminiMessageGenerator, PredefinedMessageIntegration
+from monitoring_endpoints import router as monitoring_router
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +30,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.include_router(monitoring_router)
+
+@app.on_event("shutdown")
+async def close_async_repository():
+    """Close the API's database pool"""
+    await get_async_repository().close()
+
 # System metrics endpoint
 @app.get("/api/monitoring/system-metrics")
 async def get_system_metrics():
@@ -39,15 +48,13 @@ async def get_task_metrics():
     """Get current task metrics from Celery and database"""
     try:
         from celery.result import AsyncResult
-        from database.database_manager import DatabaseManager
         
-        db_manager = DatabaseManager()
         tasks = []
         
         # Get active Celery tasks
         try:
             # This would require Celery inspection - for now, get from database
-            file_uploads = db_manager.get_all_file_uploads()
+            file_uploads = await get_async_repository().get_all_file_uploads()
             
             for upload in file_uploads[-50:]:  # Last 50 uploads
                 if upload.get('status') in ['PENDING', 'PROCESSING', 'COMPLETED']:
@@ -264,10 +271,7 @@ def calculate_duration_between(start_time: str, end_time: str) -> str:
 async def get_website_details(fileUploadId: str):
     """Get detailed information for all websites in a specific upload"""
     try:
-        from database.database_manager import DatabaseManager
-        
-        db_manager = DatabaseManager()
-        websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
+        websites = await get_async_repository().get_websites_by_file_upload_id(fileUploadId)
         
         if not websites:
             return {"error": "No websites found for this upload"}
@@ -499,8 +503,7 @@ async def trigger_ai_generation_for_file_upload(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="File upload ID is required")
         
         # Get all websites for this file upload
-        db_manager = DatabaseManager()
-        websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
+        websites = await get_async_repository().get_websites_by_file_upload_id(fileUploadId)
         
         if not websites:
             raise HTTPException(status_code=404, detail=f"No websites found for file upload ID: {fileUploadId}")
@@ -641,8 +644,7 @@ async def get_task_status(task_id: str):
 async def get_contact_inquiries_by_user(userId: str):
     """Get all contact inquiries for a specific user"""
     try:
-        db_manager = DatabaseManager()
-        inquiries = db_manager.get_contact_inquiries_by_user(userId)
+        inquiries = await get_async_repository().get_contact_inquiries_by_user(userId)
         
         return {
             "success": True,
@@ -658,10 +660,8 @@ async def get_contact_inquiries_by_user(userId: str):
 async def get_scraping_results(fileUploadId: str):
     """Get scraping results for a specific file upload"""
     try:
-        db_manager = DatabaseManager()
-        
         # Get websites for this file upload
-        websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
+        websites = await get_async_repository().get_websites_by_file_upload_id(fileUploadId)
         
         if not websites:
             raise HTTPException(status_code=404, detail=f"No scraping results found for file upload ID: {fileUploadId}")
@@ -717,8 +717,7 @@ async def list_tasks():
 async def create_predefined_message(message_data: Dict[str, Any]):
     """Create a new predefined message"""
     try:
-        db = DatabaseManager()
-        success = db.create_predefined_message(message_data)
+        success = await get_async_repository().create_predefined_message(message_data)
         
         if success:
             return {"success": True, "message": "Predefined message created successfully"}
@@ -732,8 +731,7 @@ async def create_predefined_message(message_data: Dict[str, Any]):
 async def get_predefined_message(message_id: str):
     """Get a specific predefined message by ID"""
     try:
-        db = DatabaseManager()
-        message = db.get_predefined_message_by_id(message_id)
+        message = await get_async_repository().get_predefined_message_by_id(message_id)
         
         if message:
             return message
@@ -747,8 +745,7 @@ async def get_predefined_message(message_id: str):
 async def delete_predefined_message(message_id: str):
     """Delete a predefined message"""
     try:
-        db = DatabaseManager()
-        success = db.delete_predefined_message(message_id)
+        success = await get_async_repository().delete_predefined_message(message_id)
         
         if success:
             return {"success": True, "message": "Predefined message deleted successfully"}
@@ -794,12 +791,12 @@ async def generate_messages_for_selected_websites(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="No website IDs provided")
         
         # Get website data from database
-        db = DatabaseManager()
+        repo = get_async_repository()
         websites_data = []
         
         for website_id in website_ids:
             # Get website data by ID (you'll need to implement this method)
-            website_data = db.get_website_by_id(website_id)
+            website_data = await repo.get_website_by_id(website_id)
             if website_data:
                 websites_data.append(website_data)
         
@@ -807,7 +804,7 @@ async def generate_messages_for_selected_websites(request: Dict[str, Any]):
             raise HTTPException(status_code=404, detail="No valid websites found")
         
         # Generate messages for selected websites
-        ai_generator = GeminiMessageGenerator(db_manager=db)
+        ai_generator = GeminiMessageGenerator(db_manager=DatabaseManager())
         results = []
         
         for website in websites_data:
@@ -818,7 +815,7 @@ async def generate_messages_for_selected_websites(request: Dict[str, Any]):
                 )
                 
                 # Update database with generated message
-                db.update_website_message(
+                await repo.update_website_message(
                     website_id=website.get('id'),
                     generatedMessage=message,
                     messageStatus="GENERATED"
@@ -859,16 +856,27 @@ async def generate_messages_for_selected_websites(request: Dict[str, Any]):
 async def get_websites_with_generated_messages(fileUploadId: str = None, userId: str = None):
     """Get websites that have generated messages for manual selection"""
     try:
-        db = DatabaseManager()
-        
         # Get websites with generated messages
-        websites = db.get_websites_with_messages(fileUploadId, userId)
+        websites = await get_async_repository().get_websites_with_messages(fileUploadId, userId)
         
         return websites
         
     except Exception as e:
         logger.error(f"Error getting websites with messages: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+def websites_pagination(result: Dict[str, Any], page: int, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """Pagination metadata of a list_websites_page result"""
+    limit = max(1, limit)
+    total_count = result['totalCount']
+    return {
+        "page": page,
+        "limit": limit,
+        "totalCount": total_count,
+        "totalPages": (total_count + limit - 1) // limit,
+        "hasNextPage": result['nextCursor'] is not None,
+        "hasPreviousPage": bool(cursor) or page > 1,
+        "nextCursor": result['nextCursor']
+    }
 @app.get("/api/websites/by-file-upload/{fileUploadId}", response_model=Dict[str, Any])
 async def get_websites_by_file_upload(
     fileUploadId: str,
@@ -876,64 +884,27 @@ async def get_websites_by_file_upload(
     limit: int = Query(10, description="Results per page"),
     search: str = Query("", description="Search term"),
     sortBy: str = Query("createdAt", description="Sort field"),
-    sortOrder: str = Query("desc", description="Sort order (asc/desc)")
+    sortOrder: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page (replaces page)")
 ):
     """Get all websites from a specific file upload with pagination, search, and sorting"""
     try:
-        db = DatabaseManager()
-        
-        # Get all websites for this file upload
-        websites = db.get_websites_by_file_upload_id(fileUploadId)
-        
-        # Apply search filter
-        if search:
-            filtered_websites = []
-            for website in websites:
-                if (search.lower() in website.get('websiteUrl', '').lower() or 
-                    search.lower() in website.get('companyName', '').lower() or
-                    search.lower() in website.get('industry', '').lower()):
-                    filtered_websites.append(website)
-            websites = filtered_websites
-        
-        # Apply sorting
-        if sortBy and sortOrder:
-            reverse = sortOrder.lower() == 'desc'
-            try:
-                websites.sort(key=lambda x: x.get(sortBy, ''), reverse=reverse)
-            except:
-                # Fallback to default sorting if sort field doesn't exist
-                websites.sort(key=lambda x: x.get('createdAt', ''), reverse=True)
-        
-        # Calculate pagination
-        total_count = len(websites)
-        total_pages = (total_count + limit - 1) // limit
-        skip = (page - 1) * limit
-        has_next_page = page < total_pages
-        has_previous_page = page > 1
-        
-        # Apply pagination
-        paginated_websites = websites[skip:skip + limit]
-        
-        # Categorize websites
-        with_messages = [w for w in websites if w.get('generatedMessage')]
-        without_messages = [w for w in websites if not w.get('generatedMessage')]
+        # Filter, sort, count and page in the database
+        result = await get_async_repository().list_websites_page(
+            fileUploadId, limit=limit, search=search, sortBy=sortBy, sortOrder=sortOrder, page=page, cursor=cursor
+        )
         
         return {
             "fileUploadId": fileUploadId,
-            "totalWebsites": total_count,
-            "with_messages": len(with_messages),
-            "without_messages": len(without_messages),
-            "websites": paginated_websites,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "totalCount": total_count,
-                "totalPages": total_pages,
-                "hasNextPage": has_next_page,
-                "hasPreviousPage": has_previous_page
-            }
+            "totalWebsites": result['totalCount'],
+            "with_messages": result['withMessages'],
+            "without_messages": result['withoutMessages'],
+            "websites": result['websites'],
+            "pagination": websites_pagination(result, page, limit, cursor)
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting websites by file upload: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -950,8 +921,8 @@ async def bulk_generate_messages(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="File upload ID is required")
         
         # Get websites without messages
-        db = DatabaseManager()
-        websites = db.get_websites_without_messages(fileUploadId, userId)
+        repo = get_async_repository()
+        websites = await repo.get_websites_without_messages(fileUploadId, userId)
         
         if not websites:
             return {
@@ -965,7 +936,7 @@ async def bulk_generate_messages(request: Dict[str, Any]):
         websites_to_process = websites[:limit]
         
         # Generate messages
-        ai_generator = GeminiMessageGenerator(db_manager=db)
+        ai_generator = GeminiMessageGenerator(db_manager=DatabaseManager())
         results = []
         
         for website in websites_to_process:
@@ -976,7 +947,7 @@ async def bulk_generate_messages(request: Dict[str, Any]):
                 )
                 
                 # Update database
-                db.update_website_message(
+                await repo.update_website_message(
                     website_id=website.get('id'),
                     generatedMessage=message,
                     messageStatus="GENERATED"
@@ -1090,8 +1061,8 @@ async def upload_from_frontend(file: UploadFile = File(...), userId: str = Query
             raise HTTPException(status_code=400, detail="Only CSV and Excel files (.csv, .xlsx, .xls) are supported")
         
         # Check if file with same name already exists
-        db_manager = DatabaseManager()
-        existing_upload = db_manager.get_file_upload_by_original_name(file.filename, userId)
+        repo = get_async_repository()
+        existing_upload = await repo.get_file_upload_by_original_name(file.filename, userId)
         
         if existing_upload:
             # Reject duplicate file name and return error
@@ -1124,7 +1095,7 @@ async def upload_from_frontend(file: UploadFile = File(...), userId: str = Query
             file_type = "csv" if file_extension == "csv" else "excel"
             
             # Create new file upload record in database
-            success = db_manager.create_file_upload(
+            success = await repo.create_file_upload(
                 fileUploadId=file_upload_id,
                 userId=userId,
                 filename=backend_file_path,  # Use backend path
@@ -1262,7 +1233,7 @@ async def upload_from_frontend(file: UploadFile = File(...), userId: str = Query
                 raise HTTPException(status_code=500, detail=f"Celery task failed: {task_error}")
             
             # Update status to PROCESSING
-            db_manager.update_file_upload_status(file_upload_id, "PROCESSING")
+            await repo.update_file_upload_status(file_upload_id, "PROCESSING")
             
             logger.info(f"Automatically started processing task {task.id} for upload {file_upload_id}")
             
@@ -1280,7 +1251,7 @@ async def upload_from_frontend(file: UploadFile = File(...), userId: str = Query
         except Exception as processing_error:
             logger.error(f"Error starting automatic processing: {processing_error}")
             # Update status to ERROR
-            db_manager.update_file_upload_status(file_upload_id, "ERROR")
+            await repo.update_file_upload_status(file_upload_id, "ERROR")
             
             return {
                 "success": True,
@@ -1308,70 +1279,23 @@ async def get_websites_for_file_upload(
     limit: int = Query(10, description="Results per page"),
     search: str = Query("", description="Search term"),
     sortBy: str = Query("createdAt", description="Sort field"),
-    sortOrder: str = Query("desc", description="Sort order (asc/desc)")
+    sortOrder: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page (replaces page)")
 ):
     """Get websites for a specific file upload with pagination, search, and sorting"""
     try:
-        db_manager = DatabaseManager()
-        
-        # Get all websites for this file upload
-        websites = db_manager.get_websites_by_file_upload_id(fileUploadId)
-        
-        if not websites:
-            return {
-                "websites": [],
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "totalCount": 0,
-                    "totalPages": 0,
-                    "hasNextPage": False,
-                    "hasPreviousPage": False
-                }
-            }
-        
-        # Apply search filter
-        if search:
-            filtered_websites = []
-            for website in websites:
-                if (search.lower() in website.get('websiteUrl', '').lower() or 
-                    search.lower() in website.get('companyName', '').lower() or
-                    search.lower() in website.get('industry', '').lower() or
-                    search.lower() in website.get('businessType', '').lower()):
-                    filtered_websites.append(website)
-            websites = filtered_websites
-        
-        # Apply sorting
-        if sortBy and sortOrder:
-            reverse = sortOrder.lower() == 'desc'
-            try:
-                websites.sort(key=lambda x: x.get(sortBy, '') or '', reverse=reverse)
-            except:
-                # Fallback to default sorting if sort field doesn't exist
-                websites.sort(key=lambda x: x.get('createdAt', '') or '', reverse=True)
-        
-        # Calculate pagination
-        total_count = len(websites)
-        total_pages = (total_count + limit - 1) // limit
-        skip = (page - 1) * limit
-        has_next_page = page < total_pages
-        has_previous_page = page > 1
-        
-        # Apply pagination
-        paginated_websites = websites[skip:skip + limit]
+        # Filter, sort and page in the database
+        result = await get_async_repository().list_websites_page(
+            fileUploadId, limit=limit, search=search, sortBy=sortBy, sortOrder=sortOrder, page=page, cursor=cursor
+        )
         
         return {
-            "websites": paginated_websites,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "totalCount": total_count,
-                "totalPages": total_pages,
-                "hasNextPage": has_next_page,
-                "hasPreviousPage": has_previous_page
-            }
+            "websites": result['websites'],
+            "pagination": websites_pagination(result, page, limit, cursor)
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting websites for file upload {fileUploadId}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1407,55 +1331,23 @@ async def download_file(filename: str):
 async def get_admin_history(userId: str = Query(..., description="Admin user ID")):
     """Get admin history with all file uploads and statistics"""
     try:
-        db_manager = DatabaseManager()
-        
-        # Get all file uploads with user information
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                fu.id,
-                fu.filename,
-                fu."originalName",
-                fu."fileSize",
-                fu."fileType",
-                fu.status,
-                fu."totalWebsites",
-                fu."processedWebsites",
-                fu."failedWebsites",
-                fu."createdAt",
-                fu."updatedAt",
-                u.name as user_name,
-                u.email as user_email
-            FROM file_uploads fu
-            LEFT JOIN users u ON fu."userId" = u.id
-            ORDER BY fu."createdAt" DESC
-        """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
+        # Get all file uploads with user information and submission counts
+        uploads = await get_async_repository().get_file_upload_history()
         
         history_items = []
-        for row in results:
+        for upload in uploads:
             # Calculate statistics
-            websites_count = row[6] or 0
-            processed_websites = row[7] or 0
-            failed_websites = row[8] or 0
-            
-            # Get messages sent count for this upload
-            cursor.execute("""
-                SELECT COUNT(*) FROM websites 
-                WHERE "fileUploadId" = %s AND "submissionStatus" = 'SUCCESS'
-            """, (row[0],))
-            messages_sent = cursor.fetchone()[0] or 0
+            websites_count = upload['totalWebsites'] or 0
+            processed_websites = upload['processedWebsites'] or 0
+            failed_websites = upload['failedWebsites'] or 0
+            messages_sent = upload['messages_sent'] or 0
             
             # Calculate success rate
             success_rate = (processed_websites / websites_count * 100) if websites_count > 0 else 0
             
             # Calculate processing time
-            created_at = row[9]
-            updated_at = row[10]
+            created_at = upload['createdAt']
+            updated_at = upload['updatedAt']
             processing_time = "N/A"
             if created_at and updated_at:
                 time_diff = updated_at - created_at
@@ -1466,14 +1358,14 @@ async def get_admin_history(userId: str = Query(..., description="Admin user ID"
                     processing_time = f"{hours:.1f}h"
             
             history_items.append({
-                "id": row[0],
-                "fileName": row[2] or row[1],  # Use originalName if available, otherwise filename
-                "userName": row[11] or "Unknown User",
-                "userEmail": row[12] or "unknown@example.com",
-                "fileSize": f"{(row[3] or 0) / 1024:.1f} KB" if row[3] else "0 KB",
-                "fileType": row[4] or "Unknown",
-                "uploadDate": row[9].isoformat() if row[9] else None,
-                "status": row[5] or "UNKNOWN",
+                "id": upload['id'],
+                "fileName": upload['originalName'] or upload['filename'],  # Use originalName if available, otherwise filename
+                "userName": upload['user_name'] or "Unknown User",
+                "userEmail": upload['user_email'] or "unknown@example.com",
+                "fileSize": f"{upload['fileSize'] / 1024:.1f} KB" if upload['fileSize'] else "0 KB",
+                "fileType": upload['fileType'] or "Unknown",
+                "uploadDate": created_at.isoformat() if created_at else None,
+                "status": upload['status'] or "UNKNOWN",
                 "websitesCount": websites_count,
                 "messagesSent": messages_sent,
                 "processedWebsites": processed_websites,
@@ -1482,9 +1374,6 @@ async def get_admin_history(userId: str = Query(..., description="Admin user ID"
                 "processingTime": processing_time
             })
         
-        cursor.close()
-        conn.close()
-        
         return {
             "success": True,
             "history": history_items,
@@ -1499,23 +1388,12 @@ async def get_admin_history(userId: str = Query(..., description="Admin user ID"
 async def download_admin_file(fileId: str, userId: str = Query(..., description="Admin user ID")):
     """Download a file from admin history"""
     try:
-        db_manager = DatabaseManager()
-        
         # Get file upload details
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT filename, "originalName" FROM file_uploads WHERE id = %s
-        """, (fileId,))
-        
-        result = cursor.fetchone()
-        if not result:
+        upload = await get_async_repository().get_file_upload_by_id(fileId)
+        if not upload:
             raise HTTPException(status_code=404, detail="File not found")
         
-        filename, original_name = result
-        cursor.close()
-        conn.close()
+        filename, original_name = upload['filename'], upload['originalName']
         
         # Construct the file path
         import os
@@ -12,7 +12,10 @@ router = APIRouter()
 async def get_system_resources() -> Dict[str, Any]:
     """Get current system resource usage"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+        from scraping.concurrency import get_system_sampler
+        
+        # Sampled in the background; interval=1 held the event loop for a second
+        cpu_percent = get_system_sampler().latest()['cpu_percent']
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -131,3 +134,60 @@ async def get_performance_metrics() -> Dict[str, Any]:
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting performance metrics: {str(e)}")
+
+@router.get("/api/monitoring/scrape-cache")
+async def get_scrape_cache_metrics() -> Dict[str, Any]:
+    """Get hit/miss counters of the cross-upload scrape result and response caches"""
+    try:
+        from scraping.result_cache import get_result_cache
+        from scraping.response_cache import get_response_cache
+        
+        return {
+            "timestamp": time.time(),
+            "result_cache": get_result_cache().stats(),
+            "response_cache": get_response_cache().stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting scrape cache metrics: {str(e)}")
+
+@router.get("/api/monitoring/parse-pool")
+async def get_parse_pool_metrics() -> Dict[str, Any]:
+    """Get page counts, parse time and queue wait of the scraping parse pool"""
+    try:
+        from scraping.parse_pool import parse_stats
+        
+        return {
+            "timestamp": time.time(),
+            "parse_pool": parse_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting parse pool metrics: {str(e)}")
+
+@router.get("/api/monitoring/db-pool")
+async def get_db_pool_metrics() -> Dict[str, Any]:
+    """Get size, checkouts, waits and connection churn of this process's database pools"""
+    try:
+        from database.connection_pool import pool_stats
+        from database.async_repository import get_async_repository
+        
+        return {
+            "timestamp": time.time(),
+            "db_pool": pool_stats(),
+            "api_db_pool": get_async_repository().stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting database pool metrics: {str(e)}")
+
+@router.get("/api/monitoring/concurrency")
+async def get_concurrency_limits() -> Dict[str, Any]:
+    """Get the adaptive scraping and submission concurrency limits of every worker"""
+    try:
+        from scraping.concurrency import concurrency_stats, get_system_sampler
+        
+        return {
+            "timestamp": time.time(),
+            "workers": concurrency_stats(),
+            "system": get_system_sampler().latest()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting concurrency limits: {str(e)}")
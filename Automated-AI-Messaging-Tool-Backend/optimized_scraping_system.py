@@ -12,8 +12,8 @@ from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import psutil
 import threading
+from scraping.concurrency import get_system_sampler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,8 +42,10 @@ class ResourceMonitor:
     def check_resources(self) -> bool:
         """Check if system has enough resources"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory_percent = psutil.virtual_memory().percent
+            # Read the background sample instead of blocking a second per check
+            sample = get_system_sampler().latest()
+            cpu_percent = sample['cpu_percent']
+            memory_percent = sample['memory_percent']
             
             with self.lock:
                 if cpu_percent > self.config.MAX_CPU_USAGE:
@@ -79,13 +81,12 @@ class ResourceMonitor:
     def get_stats(self) -> Dict[str, Any]:
         """Get current resource statistics"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
+            sample = get_system_sampler().latest()
             
             return {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available_gb": memory.available / (1024**3),
+                "cpu_percent": sample['cpu_percent'],
+                "memory_percent": sample['memory_percent'],
+                "memory_available_gb": sample['memory_available_gb'],
                 "current_tasks": self.current_tasks,
                 "max_concurrent": self.config.MAX_CONCURRENT_WEBSITES,
                 "uptime_seconds": time.time() - self.start_time
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Re-run website extraction over stored page snapshots
+
+Rebuilds company info and contact form URLs for the websites of one or
+more uploads (or of every upload) from the snapshot store, without
+fetching anything, using one process per core. Without --write it only
+reports what would change.
+
+Usage:
+    python reextract_snapshots.py --upload <fileUploadId> [--upload <id> ...] [--write]
+    python reextract_snapshots.py --all [--workers 8] [--write] [--output results.jsonl]
+"""
+import sys
+import os
+import json
+import logging
+import argparse
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.database_manager import DatabaseManager
+from scraping.reextract import reextract_many
+
+# Fields compared with (and written to) the websites table
+COMPARED_FIELDS = {
+    'companyName': 'companyName',
+    'industry': 'industry',
+    'businessType': 'businessType',
+    'contactFormUrl': 'contactFormUrl',
+    'has_contact_form': 'hasContactForm',
+    'aboutUsContent': 'aboutUsContent'
+}
+
+
+def merge(website, result):
+    """Replayed data with the stored contact form kept when the replay finds none"""
+    merged = dict(result)
+    if not result['has_contact_form'] and website.get('contactFormUrl'):
+        merged['contactFormUrl'] = website['contactFormUrl']
+        merged['has_contact_form'] = bool(website.get('hasContactForm'))
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract website data from stored page snapshots")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--upload', action='append', help="fileUploadId to re-extract (repeatable)")
+    target.add_argument('--all', action='store_true', help="re-extract every upload")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="extraction processes (default: CPU count)")
+    parser.add_argument('--write', action='store_true', help="update the websites table (default: report only)")
+    parser.add_argument('--output', help="also write every re-extracted website as JSON lines to this file")
+    args = parser.parse_args()
+
+    # Extraction logs every candidate it finds; keep the output readable
+    logging.disable(logging.INFO)
+
+    db = DatabaseManager()
+    upload_ids = args.upload or [upload['id'] for upload in db.get_all_file_uploads()]
+
+    # Only completed websites have a homepage worth replaying; each upload keeps its own
+    websites = {}
+    for upload_id in upload_ids:
+        for website in db.get_websites_by_file_upload_id(upload_id):
+            if website.get('scrapingStatus') == 'COMPLETED':
+                websites[(website['websiteUrl'], upload_id)] = website
+    print(f"🔁 Re-extracting {len(websites)} websites from {len(upload_ids)} uploads with {args.workers} processes")
+
+    counts = Counter()
+    output = open(args.output, 'w') if args.output else None
+    try:
+        for job, result, error in reextract_many(list(websites), args.workers):
+            url, upload_id = job
+            if error:
+                counts['errors'] += 1
+                print(f"  ❌ {url} ({upload_id}): {error}")
+                continue
+            if result is None:
+                counts['not_stored'] += 1
+                continue
+            website = websites[job]
+            merged = merge(website, result)
+            changed = [field for field, column in COMPARED_FIELDS.items() if merged[field] != website.get(column)]
+            counts['replayed'] += 1
+            counts.update(f"changed_{field}" for field in changed)
+            if output:
+                output.write(json.dumps({'fileUploadId': upload_id, 'changed': changed, **merged}) + '\n')
+            if changed and args.write:
+                ok = db.update_website_with_scraping_data(
+                    upload_id, url,
+                    title=merged['title'], companyName=merged['companyName'], industry=merged['industry'],
+                    businessType=merged['businessType'], contactFormUrl=merged['contactFormUrl'],
+                    has_contact_form=merged['has_contact_form'], aboutUsContent=merged['aboutUsContent'],
+                    scrapingStatus='COMPLETED', error_message=''
+                )
+                counts['written' if ok else 'write_failures'] += 1
+    finally:
+        if output:
+            output.close()
+
+    print(f"\n🎯 Summary: {counts['replayed']} re-extracted, {counts['not_stored']} without snapshots, "
+          f"{counts['errors']} errors")
+    for field in COMPARED_FIELDS:
+        print(f"  {field:<18} changed on {counts[f'changed_{field}']} websites")
+    if args.write:
+        print(f"  written: {counts['written']}, failed writes: {counts['write_failures']}")
+    else:
+        print("  (report only, pass --write to update the websites table)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""
+Website Scraping Package
+Fetch engine and helpers used by the scraping Celery tasks
+"""
+
+from .async_engine import AsyncScrapeEngine
+from .page_index import PageIndex
+from .keyword_matcher import KeywordMatcher, scan_page_keywords
+from .browser_pool import BrowserPool, get_browser_pool
+from .result_cache import ScrapeResultCache, cache_key, canonical_domain, get_result_cache
+
+__all__ = [
+    'AsyncScrapeEngine',
+    'PageIndex',
+    'KeywordMatcher',
+    'scan_page_keywords',
+    'BrowserPool',
+    'get_browser_pool',
+    'ScrapeResultCache',
+    'cache_key',
+    'canonical_domain',
+    'get_result_cache'
+]
@@ -0,0 +1,385 @@
+"""
+Async fetch engine for website scraping
+
+Runs homepage and sub-page fetches for a whole upload on one event loop
+with aiohttp, bounded by a global concurrency limit and per-host connection
+limits. The number of websites in flight is adjusted between a floor and
+SCRAPER_MAX_CONCURRENCY by the adaptive limiter (see scraping.concurrency),
+fed with the latency and outcome of every request. HTML parsing runs in the
+parse process pool behind a bounded queue (see scraping.parse_pool); other blocking work (caches, the contact page
+crawl, Selenium fallbacks) runs in a thread pool so it never stalls the
+in-flight fetches. Repeat requests to the same host are spaced out by the
+shared politeness scheduler.
+"""
+import os
+import time
+import socket
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from .politeness import get_politeness_scheduler
+from .host_cache import CachedResolver, dead_host_result, get_host_cache
+from .result_cache import get_result_cache
+from .response_cache import get_response_cache
+from .fetch_failures import (
+    FAILURE_CONNECTION, FAILURE_DNS, FAILURE_NOT_HTML, FAILURE_SSL, classify_error, classify_status
+)
+from .body_reader import NonHtmlContentError, read_html_body_async
+from .parse_pool import SCRAPER_PARSE_QUEUE_SIZE, SCRAPER_PARSE_WORKERS, ParseQueue
+from .subpage_fetcher import BROKEN_LINK_STATUS_CODES
+from .concurrency import OUTCOME_ERROR, OUTCOME_TIMEOUT, AdaptiveLimiter, get_limiter
+from .snapshot_store import get_snapshot_store
+from .platform_fingerprint import fingerprint_headers
+
+logger = logging.getLogger(__name__)
+
+# Engine configuration
+# - SCRAPER_MAX_CONCURRENCY: most websites scraped at the same time per worker (default: 100)
+# - SCRAPER_PER_HOST_CONNECTIONS: open connections allowed per host (default: 2)
+# - SCRAPER_REQUEST_TIMEOUT: total timeout per HTTP request in seconds (default: 30)
+# - SCRAPER_BLOCKING_WORKERS: threads for caches, crawls and Selenium fallbacks (default: 16)
+SCRAPER_MAX_CONCURRENCY = int(os.getenv('SCRAPER_MAX_CONCURRENCY', '100'))
+SCRAPER_PER_HOST_CONNECTIONS = int(os.getenv('SCRAPER_PER_HOST_CONNECTIONS', '2'))
+SCRAPER_REQUEST_TIMEOUT = int(os.getenv('SCRAPER_REQUEST_TIMEOUT', '30'))
+SCRAPER_BLOCKING_WORKERS = int(os.getenv('SCRAPER_BLOCKING_WORKERS', '16'))
+
+# Status codes worth retrying, same list as the requests session retry strategy
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncScrapeEngine:
+    """
+    Concurrent replacement for calling scrape_website_data in a loop
+
+    Usage:
+        async with AsyncScrapeEngine() as engine:
+            async for website, website_data in engine.scrape_many(jobs):
+                ...
+
+    Every result has exactly the shape returned by scrape_website_data.
+    """
+
+    def __init__(self, max_concurrency: int = SCRAPER_MAX_CONCURRENCY,
+                 per_host_connections: int = SCRAPER_PER_HOST_CONNECTIONS,
+                 request_timeout: int = SCRAPER_REQUEST_TIMEOUT,
+                 blocking_workers: int = SCRAPER_BLOCKING_WORKERS,
+                 parse_workers: int = SCRAPER_PARSE_WORKERS,
+                 parse_queue_size: int = SCRAPER_PARSE_QUEUE_SIZE,
+                 max_retries: int = 3, backoff_factor: int = 2, upload_id: Optional[str] = None):
+        self.upload_id = upload_id
+        self.max_concurrency = max_concurrency
+        self.per_host_connections = per_host_connections
+        self.request_timeout = request_timeout
+        self.blocking_workers = blocking_workers
+        self.parse_workers = parse_workers
+        self.parse_queue_size = parse_queue_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limiter: Optional[AdaptiveLimiter] = None
+        self._parse_queue: Optional[ParseQueue] = None
+        self._scheduler = get_politeness_scheduler()
+        self._host_cache = get_host_cache()
+        self._result_cache = get_result_cache()
+        self._response_cache = get_response_cache()
+
+    async def __aenter__(self) -> 'AsyncScrapeEngine':
+        from celery_tasks.scraping_tasks import get_browser_headers
+
+        headers = get_browser_headers()
+        # aiohttp can only decode brotli when the optional Brotli package is installed
+        headers['Accept-Encoding'] = 'gzip, deflate'
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_connections,
+            ttl_dns_cache=300,
+            resolver=CachedResolver(self._host_cache)
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.blocking_workers,
+            thread_name_prefix='scrape-blocking'
+        )
+        self._limiter = get_limiter('scraping', self.max_concurrency)
+        self._parse_queue = ParseQueue(self.parse_workers, self.parse_queue_size)
+        await self._parse_queue.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._parse_queue:
+            await self._parse_queue.close()
+        if self._session:
+            await self._session.close()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking callable in the engine's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Fetch a single URL
+
+        Returns the same dict shape as RobustWebScraper.scrape_with_error_handling.
+        Connection-level failures (DNS, refused, TLS) are not retried because
+        the next attempt would fail the same way. Failed results carry a
+        'failure_type' (see scraping.fetch_failures). A stored copy of the
+        page is revalidated with If-None-Match / If-Modified-Since and reused
+        on a 304.
+        """
+        last_error = None
+        last_status = None
+        cached = await self._run_blocking(self._response_cache.lookup, url)
+        conditional_headers = self._response_cache.conditional_headers(cached)
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self._scheduler.wait_async(url, self._session)
+                if cached:
+                    await self._run_blocking(self._response_cache.record_request, cached)
+                started = time.monotonic()
+                async with self._session.get(url, allow_redirects=True, headers=conditional_headers) as response:
+                    self._limiter.record_status(time.monotonic() - started, response.status)
+                    if response.status == 304 and cached:
+                        content = await self._run_blocking(
+                            self._response_cache.not_modified, url, cached, response.headers
+                        )
+                        return {
+                            'success': True,
+                            'content': content,
+                            'status_code': response.status,
+                            'headers': fingerprint_headers(response.headers),
+                            'url': url
+                        }
+                    if response.status < 400:
+                        content = await read_html_body_async(response)
+                        await self._run_blocking(self._response_cache.store, url, content, response.headers)
+                        return {
+                            'success': True,
+                            'content': content,
+                            'status_code': response.status,
+                            'headers': fingerprint_headers(response.headers),
+                            'url': url
+                        }
+
+                    last_error = f"HTTP Error: {response.status} {response.reason} for url: {url}"
+                    last_status = response.status
+                    logger.warning(f"HTTP error for {url}: {response.status}")
+                    if response.status not in RETRY_STATUS_CODES:
+                        return {'success': False, 'error': last_error, 'url': url, 'attempts': attempt,
+                                'status_code': last_status, 'failure_type': classify_status(last_status)}
+
+            except NonHtmlContentError as e:
+                logger.warning(f"{url} is not an HTML page ({e.content_type})")
+                return {'success': False, 'error': str(e), 'url': url, 'attempts': attempt,
+                        'failure_type': FAILURE_NOT_HTML}
+
+            except aiohttp.ClientConnectorError as e:
+                logger.warning(f"Connection error for {url}: {e}")
+                failure = self._connector_failure(e)
+                # An unresolvable host says nothing about load
+                if failure != FAILURE_DNS:
+                    self._limiter.record(time.monotonic() - started, OUTCOME_ERROR)
+                return {'success': False, 'error': f"Connection Error: {str(e)}", 'url': url, 'attempts': attempt,
+                        'failure_type': failure}
+
+            except asyncio.TimeoutError:
+                last_error = f"Timeout Error: no response within {self.request_timeout}s"
+                logger.warning(f"Timeout error for {url}")
+                self._limiter.record(time.monotonic() - started, OUTCOME_TIMEOUT)
+
+            except aiohttp.ClientError as e:
+                last_error = f"Request Error: {str(e)}"
+                logger.warning(f"Request error for {url}: {e}")
+                self._limiter.record(time.monotonic() - started, OUTCOME_ERROR)
+
+            if attempt < self.max_retries:
+                wait_time = self.backoff_factor ** attempt
+                logger.info(f"Retrying {url} in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+
+        return {
+            'success': False,
+            'error': last_error,
+            'url': url,
+            'attempts': self.max_retries,
+            'status_code': last_status,
+            'failure_type': classify_status(last_status) if last_status else classify_error(last_error)
+        }
+
+    @staticmethod
+    def _connector_failure(error: aiohttp.ClientConnectorError) -> str:
+        if isinstance(error, aiohttp.ClientSSLError):
+            return FAILURE_SSL
+        if isinstance(error.os_error, socket.gaierror):
+            return FAILURE_DNS
+        return FAILURE_CONNECTION
+
+    async def fetch_variants(self, urls: List[str], stagger: Optional[float]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Async counterpart of fetch_url_variants
+
+        The next variant starts when a running one fails or after `stagger`
+        seconds without an answer; the first success cancels the rest.
+        """
+        pending: Dict[asyncio.Future, int] = {}
+        failures = []
+        next_index = 0
+
+        def start_next():
+            nonlocal next_index
+            pending[asyncio.ensure_future(self.fetch(urls[next_index]))] = next_index
+            next_index += 1
+
+        try:
+            start_next()
+            while pending:
+                more_variants = next_index < len(urls)
+                done, _ = await asyncio.wait(
+                    pending, timeout=stagger if more_variants else None, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    start_next()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': f"Unexpected Error: {str(e)}", 'url': urls[index]}
+
+                    if result['success']:
+                        return result, failures
+
+                    result['variant_index'] = index
+                    failures.append(result)
+
+                if next_index < len(urls):
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        failures.sort(key=lambda failure: failure['variant_index'])
+        return None, failures
+
+    async def fetch_with_fallbacks(self, url: str) -> Dict[str, Any]:
+        """Async counterpart of robust_scrape_website"""
+        from celery_tasks.scraping_tasks import (
+            validate_and_fix_url, get_alternative_urls, scrape_with_selenium_fallbacks,
+            SCRAPER_RACE_VARIANTS, SCRAPER_VARIANT_STAGGER
+        )
+
+        fixed_url = validate_and_fix_url(url)
+        alternative_urls = get_alternative_urls(fixed_url)
+
+        dead = await self._host_cache.dead_host_async(fixed_url)
+        if dead:
+            logger.info(f"Skipping {url}: host is known to be unreachable ({dead['failure_type']})")
+            return dead_host_result(url, dead)
+
+        stagger = SCRAPER_VARIANT_STAGGER if SCRAPER_RACE_VARIANTS else None
+        result, failures = await self.fetch_variants([fixed_url] + alternative_urls, stagger)
+        if result:
+            return result
+
+        return await self._run_blocking(scrape_with_selenium_fallbacks, url, fixed_url, alternative_urls, failures)
+
+    async def preflight(self, urls: List[str]) -> Dict[int, Dict[str, Any]]:
+        """Resolve every host of an upload up front; see HostCache.preflight"""
+        return await self._host_cache.preflight(urls)
+
+    async def _fetch_subpage(self, url: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not url:
+            return None
+        result = await self.fetch(url)
+        snapshot_store = get_snapshot_store()
+        if snapshot_store and result.get('status_code'):
+            snapshot_store.save_page(url, result.get('content') if result['success'] else None, result['status_code'])
+        return result
+
+    async def extract_company_info(self, html: str, base_url: str) -> Dict[str, Any]:
+        """
+        Async counterpart of extract_company_info
+
+        The homepage and the about page are parsed in the parse pool; the
+        about page and the best contact link are fetched on the event loop.
+        """
+        from celery_tasks.scraping_tasks import extract_about_content, finish_company_info, parse_company_page
+
+        parsed = await self._parse_queue.parse(parse_company_page, html, base_url)
+        about_result, contact_result = await asyncio.gather(
+            self._fetch_subpage(parsed['about_url']), self._fetch_subpage(parsed['contact_link'])
+        )
+
+        broken_link = None
+        if contact_result and contact_result.get('status_code') in BROKEN_LINK_STATUS_CODES:
+            logger.info(f"Contact link {parsed['contact_link']} is broken (HTTP {contact_result['status_code']}), skipping it")
+            broken_link = parsed['contact_link']
+
+        aboutUsContent = None
+        if about_result and about_result['success']:
+            try:
+                aboutUsContent = await self._parse_queue.parse(extract_about_content, about_result['content'])
+            except Exception as e:
+                logger.warning(f"Failed to parse about page {parsed['about_url']}: {str(e)}")
+        elif about_result:
+            logger.warning(f"Failed to fetch about page {parsed['about_url']}: {about_result['error']}")
+
+        return finish_company_info(parsed, base_url, aboutUsContent, broken_link)
+
+    async def scrape(self, url: str, csv_contact_form_url: str = None) -> Dict[str, Any]:
+        """Async counterpart of scrape_website_data"""
+        from celery_tasks.scraping_tasks import build_website_data, failed_website_data
+
+        try:
+            cached = await self._run_blocking(self._result_cache.get, url, csv_contact_form_url)
+            if cached:
+                return cached
+
+            result = await self.fetch_with_fallbacks(url)
+            info = await self.extract_company_info(result['content'], url) if result['success'] else None
+            website_data = await self._run_blocking(build_website_data, url, result, csv_contact_form_url, info,
+                                                   self.upload_id)
+            await self._run_blocking(self._result_cache.store, url, website_data, csv_contact_form_url)
+            return website_data
+        except Exception as e:
+            logger.error(f"Unexpected error scraping website {url}: {str(e)}")
+            return failed_website_data(url, str(e))
+
+    async def scrape_many(self, jobs: Iterable[Tuple[Any, Optional[str]]]) -> AsyncIterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Scrape many websites concurrently
+
+        Args:
+            jobs: (website, csv_contact_form_url) pairs
+
+        Yields:
+            (website, website_data) pairs in completion order
+        """
+        async def _bounded_scrape(website, csv_contact_form_url):
+            async with self._limiter.slot():
+                return website, await self.scrape(website, csv_contact_form_url)
+
+        pending = [asyncio.ensure_future(_bounded_scrape(website, csv_url)) for website, csv_url in jobs]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for future in pending:
+                future.cancel()
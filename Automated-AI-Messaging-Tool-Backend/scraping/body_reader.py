@@ -0,0 +1,141 @@
+"""
+Bounded reads of HTML response bodies
+
+`response.text` downloads the whole body into memory and, when the server
+declares no charset, runs charset detection over all of it, which is slow
+on multi-MB pages. The readers here stream the body in chunks and stop at
+SCRAPER_MAX_BODY_BYTES (the title, meta tags, navigation and forms the
+extractor needs are near the top of the page), refuse non-HTML content
+types before reading anything, and pick the charset from the
+Content-Type header, a BOM or the page's own <meta> tag instead of
+statistical detection.
+"""
+import os
+import re
+import codecs
+import logging
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Body reader configuration
+# - SCRAPER_MAX_BODY_BYTES: bytes of a page read before the rest is dropped (default: 3000000)
+SCRAPER_MAX_BODY_BYTES = int(os.getenv('SCRAPER_MAX_BODY_BYTES', '3000000'))
+
+CHUNK_SIZE = 64 * 1024
+
+# Bytes searched for a <meta charset> declaration
+META_SNIFF_BYTES = 4096
+
+# Content types parsed as pages; a missing Content-Type is given the benefit of the doubt
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', 'application/xml', 'text/xml')
+
+HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+
+class NonHtmlContentError(Exception):
+    """The response is not a page (PDF, image, download...)"""
+
+    def __init__(self, content_type: str):
+        self.content_type = content_type
+        super().__init__(f"Not an HTML page: {content_type}")
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    media_type = (content_type or '').split(';', 1)[0].strip().lower()
+    return not media_type or media_type in HTML_CONTENT_TYPES
+
+
+def _known_codec(name: Optional[Union[bytes, str]]) -> Optional[str]:
+    if not name:
+        return None
+    if isinstance(name, bytes):
+        name = name.decode('ascii', 'ignore')
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def resolve_charset(content_type: Optional[str], body: bytes) -> Optional[str]:
+    """Charset from the Content-Type header, a BOM or a <meta> tag; None when undeclared"""
+    match = HEADER_CHARSET_RE.search(content_type or '')
+    charset = _known_codec(match.group(1)) if match else None
+    if charset:
+        return charset
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    match = META_CHARSET_RE.search(body[:META_SNIFF_BYTES])
+    return _known_codec(match.group(1)) if match else None
+
+
+def decode_body(body: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Decode a page body without statistical charset detection
+
+    Undeclared charsets are tried as UTF-8 first and fall back to
+    windows-1252, which decodes any byte sequence.
+    """
+    charset = resolve_charset(content_type, body)
+    if charset:
+        return body.decode(charset, errors='replace')
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A cut-off multi-byte character at the byte cap is still UTF-8
+        if e.start >= len(body) - 3 and e.reason == 'unexpected end of data':
+            return body.decode('utf-8', errors='replace')
+        return body.decode('cp1252', errors='replace')
+
+
+def _check_content_type(content_type: Optional[str], url: str):
+    if not is_html_content_type(content_type):
+        logger.info(f"Skipping body of {url}: {content_type}")
+        raise NonHtmlContentError(content_type)
+
+
+def _log_truncated(url: str, max_bytes: int):
+    logger.info(f"Body of {url} exceeds {max_bytes} bytes, reading only the first {max_bytes}")
+
+
+def read_html_body(response, max_bytes: int = SCRAPER_MAX_BODY_BYTES) -> str:
+    """
+    Text of a requests response opened with stream=True, read up to max_bytes
+
+    Raises NonHtmlContentError before reading when the content type is not
+    a page. The caller closes the response.
+    """
+    content_type = response.headers.get('Content-Type')
+    _check_content_type(content_type, response.url)
+
+    body = bytearray()
+    for chunk in response.iter_content(CHUNK_SIZE):
+        body += chunk
+        if len(body) >= max_bytes:
+            _log_truncated(response.url, max_bytes)
+            del body[max_bytes:]
+            break
+    return decode_body(bytes(body), content_type)
+
+
+async def read_html_body_async(response, max_bytes: int = SCRAPER_MAX_BODY_BYTES) -> str:
+    """aiohttp counterpart of read_html_body"""
+    content_type = response.headers.get('Content-Type')
+    _check_content_type(content_type, str(response.url))
+
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        body += chunk
+        if len(body) >= max_bytes:
+            _log_truncated(str(response.url), max_bytes)
+            del body[max_bytes:]
+            break
+    return decode_body(bytes(body), content_type)
@@ -0,0 +1,385 @@
+"""
+Reusable headless Chrome pool for Selenium fallbacks
+
+Starting Chrome costs seconds and hundreds of MB, and every Selenium
+fallback used to start its own browser with a fresh temporary profile.
+The pool keeps a few drivers alive per worker process and hands them out
+with checkout()/release(). Between uses a driver is reset (cookies, cache
+and storage cleared, extra windows closed, timeouts restored) so sites
+never see each other's state. Drivers are recycled after a number of uses
+or once Chrome's memory grows past a limit, and their profile directories
+are removed when they quit. Every driver uses the shared profile of
+scraping.browser_profile (eager page loads, non-essential requests blocked).
+"""
+import os
+import glob
+import time
+import shutil
+import atexit
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import psutil
+
+from .browser_profile import apply_profile_options, apply_request_blocking
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (per worker process)
+# - SELENIUM_POOL_SIZE: Chrome instances kept per worker process (default: 2)
+# - SELENIUM_MAX_USES: pages served by one Chrome instance before it is restarted (default: 50)
+# - SELENIUM_MAX_RSS_MB: restart Chrome once its processes use more memory than this (default: 1024)
+# - SELENIUM_CHECKOUT_TIMEOUT: seconds to wait for a free browser before giving up (default: 120)
+SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', '2'))
+SELENIUM_MAX_USES = int(os.getenv('SELENIUM_MAX_USES', '50'))
+SELENIUM_MAX_RSS_MB = int(os.getenv('SELENIUM_MAX_RSS_MB', '1024'))
+SELENIUM_CHECKOUT_TIMEOUT = float(os.getenv('SELENIUM_CHECKOUT_TIMEOUT', '120'))
+
+PAGE_LOAD_TIMEOUT = 30
+SCRIPT_TIMEOUT = 30
+
+PROFILE_PREFIX = 'chrome_pool_'
+# Profiles leaked by the per-URL drivers used before the pool existed
+LEGACY_PROFILE_PREFIXES = ('chrome_scraping_', 'chrome_user_data_', 'chrome_ai_')
+LEGACY_PROFILE_MAX_AGE = 24 * 3600
+
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def default_chrome_options(profile_dir: str):
+    """Chrome options shared by every pooled driver"""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument(f'--user-agent={BROWSER_USER_AGENT}')
+    options.add_argument(f'--user-data-dir={profile_dir}')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-default-apps')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-crash-reporter')
+    options.add_argument('--no-crash-upload')
+    return apply_profile_options(options)
+
+
+def _origin(url: Optional[str]) -> Optional[str]:
+    """scheme://host[:port] of an http(s) URL, the form Storage.clearDataForOrigin expects"""
+    try:
+        parts = urlsplit(url or '')
+        host, port = parts.hostname, parts.port
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or not host:
+        return None
+    return f"{parts.scheme}://{host}:{port}" if port else f"{parts.scheme}://{host}"
+
+
+def _frame_origins(frame_tree: Dict[str, Any], origins: Set[str]):
+    origin = _origin(frame_tree.get('frame', {}).get('url'))
+    if origin:
+        origins.add(origin)
+    for child in frame_tree.get('childFrames', []):
+        _frame_origins(child, origins)
+
+
+class PooledBrowser:
+    """A Chrome driver owned by the pool and its profile directory"""
+
+    def __init__(self, driver, profile_dir: str):
+        self.driver = driver
+        self.profile_dir = profile_dir
+        self.uses = 0
+        self.created = time.monotonic()
+
+    def rss_mb(self) -> float:
+        """Resident memory of chromedriver and every Chrome process it started"""
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except Exception:
+            return 0.0
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting pooled Chrome: {e}")
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    Per-process pool of headless Chrome drivers
+
+    Usage:
+        pool = get_browser_pool()
+        with pool.browser() as driver:
+            driver.get(url)
+
+    or checkout()/release(driver) when the driver outlives a single block.
+    """
+
+    def __init__(self, size: int = SELENIUM_POOL_SIZE, max_uses: int = SELENIUM_MAX_USES,
+                 max_rss_mb: int = SELENIUM_MAX_RSS_MB, checkout_timeout: float = SELENIUM_CHECKOUT_TIMEOUT):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+        self.pid = os.getpid()
+
+        self._condition = threading.Condition()
+        self._idle: List[PooledBrowser] = []
+        self._in_use: Dict[int, PooledBrowser] = {}
+        self._launching = 0
+        self._closed = False
+
+        self._metrics = {
+            'launches': 0,
+            'launch_failures': 0,
+            'checkouts': 0,
+            'reuses': 0,
+            'releases': 0,
+            'recycled_max_uses': 0,
+            'recycled_memory': 0,
+            'recycled_reset_failed': 0,
+            'discarded': 0,
+            'checkout_timeouts': 0,
+            'checkout_wait_seconds': 0.0
+        }
+
+        sweep_stale_profiles()
+
+    def _launch(self) -> PooledBrowser:
+        from selenium import webdriver
+
+        profile_dir = tempfile.mkdtemp(prefix=f'{PROFILE_PREFIX}{os.getpid()}_')
+        try:
+            driver = webdriver.Chrome(options=default_chrome_options(profile_dir))
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            driver.set_script_timeout(SCRIPT_TIMEOUT)
+        except Exception:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+        # Stays on for the tab across resets (see scraping.browser_profile)
+        apply_request_blocking(driver)
+        logger.info(f"Started pooled Chrome (profile {profile_dir})")
+        return PooledBrowser(driver, profile_dir)
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Take a driver from the pool, starting Chrome if the pool is not full
+
+        Raises TimeoutError when every driver stays busy for `timeout` seconds.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    browser = self._idle.pop()
+                    self._metrics['reuses'] += 1
+                    break
+                if len(self._in_use) + self._launching < self.size:
+                    self._launching += 1
+                    browser = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['checkout_timeouts'] += 1
+                    raise TimeoutError(f"No browser available within {timeout}s")
+                self._condition.wait(remaining)
+
+        launched = browser is None
+        if launched:
+            try:
+                browser = self._launch()
+            except Exception:
+                with self._condition:
+                    self._launching -= 1
+                    self._metrics['launch_failures'] += 1
+                    self._condition.notify()
+                raise
+
+        with self._condition:
+            if launched:
+                self._launching -= 1
+                self._metrics['launches'] += 1
+            browser.uses += 1
+            self._in_use[id(browser.driver)] = browser
+            self._metrics['checkouts'] += 1
+            self._metrics['checkout_wait_seconds'] += time.monotonic() - started
+        return browser.driver
+
+    def owns(self, driver) -> bool:
+        """True when driver is currently checked out of this pool"""
+        with self._condition:
+            return id(driver) in self._in_use
+
+    def release(self, driver, discard: bool = False):
+        """
+        Give a driver back to the pool
+
+        The driver is reset for the next site, or quit instead when it is
+        worn out (max uses, memory), the reset fails or discard is True.
+        """
+        with self._condition:
+            browser = self._in_use.pop(id(driver), None)
+            if browser is None:
+                logger.warning("Released a driver that is not checked out of the pool")
+                return
+            self._metrics['releases'] += 1
+
+        reason = None
+        if discard or self._closed:
+            reason = 'discarded'
+        elif browser.uses >= self.max_uses:
+            reason = 'recycled_max_uses'
+        elif self.max_rss_mb and browser.rss_mb() > self.max_rss_mb:
+            reason = 'recycled_memory'
+        elif not self._reset(browser.driver):
+            reason = 'recycled_reset_failed'
+
+        if reason:
+            logger.info(f"Quitting pooled Chrome after {browser.uses} uses ({reason})")
+            browser.quit()
+
+        with self._condition:
+            if reason:
+                self._metrics[reason] += 1
+            else:
+                self._idle.append(browser)
+            self._condition.notify()
+
+    @staticmethod
+    def _visited_origins(driver) -> Set[str]:
+        """Origins the current tab navigated to since its history was last reset, and its frames' origins"""
+        origins = set()
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        for entry in history.get('entries', []):
+            origin = _origin(entry.get('url'))
+            if origin:
+                origins.add(origin)
+        _frame_origins(driver.execute_cdp_cmd('Page.getFrameTree', {}).get('frameTree', {}), origins)
+        return origins
+
+    @classmethod
+    def _reset(cls, driver) -> bool:
+        """Clear everything a site left behind; False when the driver is unusable"""
+        try:
+            # Storage can only be cleared per origin, so collect every origin
+            # the tabs visited before closing the extra ones
+            origins = set()
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                origins |= cls._visited_origins(driver)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origins |= cls._visited_origins(driver)
+            driver.get('about:blank')
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            for origin in origins:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            driver.execute_cdp_cmd('Page.resetNavigationHistory', {})
+            driver.implicitly_wait(0)
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            driver.set_script_timeout(SCRIPT_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not reset pooled Chrome: {e}")
+            return False
+
+    @contextmanager
+    def browser(self, timeout: Optional[float] = None):
+        """Check out a driver for the duration of a with block"""
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool counters plus the current idle/in-use split"""
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics.update({
+                'pid': self.pid,
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'launching': self._launching
+            })
+        metrics['avg_checkout_wait_seconds'] = (
+            metrics['checkout_wait_seconds'] / metrics['checkouts'] if metrics['checkouts'] else 0.0
+        )
+        return metrics
+
+    def close(self):
+        """Quit idle drivers; drivers still checked out are quit when released"""
+        if os.getpid() != self.pid:
+            # Inherited through fork: the drivers belong to the parent process
+            return
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for browser in idle:
+            browser.quit()
+
+
+def sweep_stale_profiles():
+    """Remove pool profiles of dead processes and old profiles leaked by per-URL drivers"""
+    tmp_dir = tempfile.gettempdir()
+    now = time.time()
+
+    for path in glob.glob(os.path.join(tmp_dir, f'{PROFILE_PREFIX}*')):
+        try:
+            pid = int(os.path.basename(path)[len(PROFILE_PREFIX):].split('_', 1)[0])
+        except ValueError:
+            continue
+        if not psutil.pid_exists(pid):
+            shutil.rmtree(path, ignore_errors=True)
+
+    for prefix in LEGACY_PROFILE_PREFIXES:
+        for path in glob.glob(os.path.join(tmp_dir, f'{prefix}*')):
+            try:
+                if now - os.path.getmtime(path) > LEGACY_PROFILE_MAX_AGE:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get this worker process's browser pool (a forked child gets its own)"""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,141 @@
+"""
+Shared headless Chrome profile: request blocking and page-load strategy
+
+Selenium fallbacks only need a page's DOM and scripts, yet a plain
+driver.get() downloads every image, font and video and runs the site's
+ad and analytics tags before it returns. Pooled drivers block those
+requests through CDP (Network.setBlockedURLs): images, fonts and media by
+file extension, and known tracker and ad domains. Form builder and
+captcha domains are never blocked, so embedded forms still render; a
+blocked domain pattern that would cover one of them is dropped.
+
+Drivers use the 'eager' page-load strategy, so driver.get() returns at
+DOMContentLoaded instead of waiting for every subresource, and
+wait_for_page_ready() replaces the fixed sleep that followed it: it
+returns once the DOM has stopped changing, capped at a few seconds.
+"""
+import os
+import time
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Browser profile configuration
+# - SELENIUM_BLOCK_RESOURCES: block images, fonts, media, trackers and ads in pooled Chrome (default: true)
+# - SELENIUM_PAGE_LOAD_STRATEGY: normal, eager or none (default: eager)
+# - SELENIUM_BLOCKED_DOMAINS: extra comma-separated domains to block (default: none)
+# - SELENIUM_SETTLE_TIMEOUT: most seconds to wait for a page's DOM to settle after load (default: 3)
+SELENIUM_BLOCK_RESOURCES = os.getenv('SELENIUM_BLOCK_RESOURCES', 'true').lower() == 'true'
+SELENIUM_PAGE_LOAD_STRATEGY = os.getenv('SELENIUM_PAGE_LOAD_STRATEGY', 'eager')
+SELENIUM_BLOCKED_DOMAINS = [d.strip().lower() for d in os.getenv('SELENIUM_BLOCKED_DOMAINS', '').split(',') if d.strip()]
+SELENIUM_SETTLE_TIMEOUT = float(os.getenv('SELENIUM_SETTLE_TIMEOUT', '3'))
+
+# Resource types nothing downstream reads, by file extension
+BLOCKED_EXTENSIONS = [
+    # images
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg',
+    # fonts
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    # audio and video
+    'mp4', 'webm', 'ogg', 'ogv', 'mp3', 'wav', 'm4a', 'mov', 'm3u8'
+]
+
+# Analytics, tag managers, session recorders and ad networks
+TRACKER_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'connect.facebook.net', 'hotjar.com', 'clarity.ms',
+    'segment.com', 'segment.io', 'mixpanel.com', 'fullstory.com', 'hs-analytics.net', 'hs-banner.com',
+    'snap.licdn.com', 'ads.linkedin.com', 'bat.bing.com', 'analytics.tiktok.com', 'quantserve.com',
+    'scorecardresearch.com', 'adsrvr.org', 'amazon-adsystem.com', 'criteo.com', 'criteo.net',
+    'taboola.com', 'outbrain.com', 'js-agent.newrelic.com', 'nr-data.net', 'mouseflow.com',
+    'crazyegg.com', 'optimizely.com', 'youtube.com/embed', 'player.vimeo.com'
+]
+
+# Form builders and captchas (see scraping.form_widgets); never blocked
+FORM_WIDGET_DOMAINS = [
+    'hsforms.net', 'hsforms.com', 'hubspot.com', 'hsleadflows.net', 'hs-scripts.com', 'jotform.com',
+    'typeform.com', 'wix.com', 'parastorage.com', 'squarespace.com', 'formstack.com', 'cognitoforms.com',
+    'google.com/recaptcha', 'gstatic.com', 'recaptcha.net', 'hcaptcha.com', 'challenges.cloudflare.com'
+]
+
+
+def _covers_form_widget(domain: str) -> bool:
+    """True when blocking domain would also block a form builder or captcha"""
+    host = domain.split('/', 1)[0]
+    for allowed in FORM_WIDGET_DOMAINS:
+        allowed_host, _, allowed_path = allowed.partition('/')
+        # The same host or a parent domain of it
+        if allowed_host == host or allowed_host.endswith('.' + host):
+            return True
+        # A subdomain of a domain allowed as a whole
+        if not allowed_path and host.endswith('.' + allowed_host):
+            return True
+    return False
+
+
+def blocked_url_patterns() -> List[str]:
+    """Network.setBlockedURLs patterns of the shared profile"""
+    patterns = []
+    for extension in BLOCKED_EXTENSIONS:
+        patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+
+    for domain in TRACKER_DOMAINS + SELENIUM_BLOCKED_DOMAINS:
+        if _covers_form_widget(domain):
+            logger.warning(f"Not blocking {domain}: it serves form widgets")
+            continue
+        # The domain itself and its subdomains, over http and https
+        patterns.extend([f'*//{domain}/*', f'*.{domain}/*'] if '/' not in domain else
+                        [f'*//{domain}*', f'*.{domain}*'])
+    return patterns
+
+
+def apply_profile_options(options):
+    """Set the shared page-load strategy on Chrome options"""
+    options.page_load_strategy = SELENIUM_PAGE_LOAD_STRATEGY
+    return options
+
+
+def apply_request_blocking(driver, enabled: bool = SELENIUM_BLOCK_RESOURCES) -> bool:
+    """Turn on request blocking for the driver's tab; False when disabled or CDP is unavailable"""
+    if not enabled:
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns()})
+        return True
+    except Exception as e:
+        logger.warning(f"Request blocking unavailable, loading every resource: {e}")
+        return False
+
+
+# Counts DOM nodes; a page is settled when the count stops changing
+DOM_SIZE_SCRIPT = "return document.readyState === 'loading' ? -1 : document.getElementsByTagName('*').length"
+SETTLE_POLL_INTERVAL = 0.25
+
+
+def wait_for_page_ready(driver, timeout: float = SELENIUM_SETTLE_TIMEOUT) -> float:
+    """
+    Wait for scripts to finish building the page after driver.get()
+
+    Returns once the DOM node count is unchanged over two polls, or after
+    timeout seconds. Returns the seconds waited.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    previous = None
+    stable_polls = 0
+    while time.monotonic() < deadline:
+        try:
+            size = driver.execute_script(DOM_SIZE_SCRIPT)
+        except Exception:
+            break
+        if size >= 0 and size == previous:
+            stable_polls += 1
+            if stable_polls >= 2:
+                break
+        else:
+            stable_polls = 0
+        previous = size
+        time.sleep(SETTLE_POLL_INTERVAL)
+    return time.monotonic() - started
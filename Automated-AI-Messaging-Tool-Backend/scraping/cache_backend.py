@@ -0,0 +1,237 @@
+"""
+Shared key/value store for scraping caches
+
+Caches that must survive across uploads and be shared between workers
+(host health, DNS, scrape results, worker metrics) store JSON values with
+a TTL here, next to a few counters that never expire. Redis is used when
+reachable; otherwise a local sqlite file keeps the cache working on a
+single machine. Cache errors are logged and treated as misses, they never
+fail a scrape.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+# - SCRAPER_CACHE_BACKEND: 'redis' or 'sqlite' (default: redis, falls back to sqlite when Redis is unreachable)
+# - SCRAPER_CACHE_REDIS_URL: Redis URL for the cache (default: REDIS_URL)
+# - SCRAPER_CACHE_SQLITE_PATH: sqlite file used by the sqlite backend (default: <tmp>/scraper_cache.sqlite3)
+SCRAPER_CACHE_BACKEND = os.getenv('SCRAPER_CACHE_BACKEND', 'redis').lower()
+SCRAPER_CACHE_REDIS_URL = os.getenv('SCRAPER_CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+SCRAPER_CACHE_SQLITE_PATH = os.getenv(
+    'SCRAPER_CACHE_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'scraper_cache.sqlite3')
+)
+
+KEY_PREFIX = 'scraper:'
+
+# Expired sqlite rows are purged once every this many writes
+SQLITE_PURGE_EVERY = 1000
+
+
+class CacheBackend:
+    """JSON values with a TTL under string keys"""
+
+    name = 'none'
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Add amount to a counter that never expires; returns the new value (0 on error)"""
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        """Every live value whose key starts with prefix, by key (for monitoring, not hot paths)"""
+        raise NotImplementedError
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every worker through Redis"""
+
+    name = 'redis'
+
+    def __init__(self, url: str = SCRAPER_CACHE_REDIS_URL):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self.client.ping()
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(KEY_PREFIX + key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.debug(f"Redis cache get failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: int):
+        try:
+            self.client.set(KEY_PREFIX + key, json.dumps(value), ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.debug(f"Redis cache set failed for {key}: {e}")
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(KEY_PREFIX + key)
+        except Exception as e:
+            logger.debug(f"Redis cache delete failed for {key}: {e}")
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        try:
+            return int(self.client.incrby(KEY_PREFIX + key, amount))
+        except Exception as e:
+            logger.debug(f"Redis cache incr failed for {key}: {e}")
+            return 0
+
+    def get_counter(self, key: str) -> int:
+        try:
+            return int(self.client.get(KEY_PREFIX + key) or 0)
+        except Exception as e:
+            logger.debug(f"Redis cache counter read failed for {key}: {e}")
+            return 0
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        try:
+            keys = list(self.client.scan_iter(match=KEY_PREFIX + prefix + '*', count=500))
+            if not keys:
+                return {}
+            values = self.client.mget(keys)
+            return {
+                key.decode()[len(KEY_PREFIX):]: json.loads(raw)
+                for key, raw in zip(keys, values) if raw is not None
+            }
+        except Exception as e:
+            logger.debug(f"Redis cache scan failed for {prefix}: {e}")
+            return {}
+
+
+class SqliteCacheBackend(CacheBackend):
+    """Cache in a local sqlite file, shared by the worker processes of one machine"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = SCRAPER_CACHE_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)'
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.debug(f"sqlite cache get failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: int):
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % SQLITE_PURGE_EVERY == 0:
+                connection.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+            connection.commit()
+        except Exception as e:
+            logger.debug(f"sqlite cache set failed for {key}: {e}")
+
+    def delete(self, key: str):
+        try:
+            connection = self._connection()
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+            connection.commit()
+        except Exception as e:
+            logger.debug(f"sqlite cache delete failed for {key}: {e}")
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT INTO counters (key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+                (key, amount)
+            )
+            row = connection.execute('SELECT value FROM counters WHERE key = ?', (key,)).fetchone()
+            connection.commit()
+            return int(row[0])
+        except Exception as e:
+            logger.debug(f"sqlite cache incr failed for {key}: {e}")
+            return 0
+
+    def get_counter(self, key: str) -> int:
+        try:
+            row = self._connection().execute('SELECT value FROM counters WHERE key = ?', (key,)).fetchone()
+            return int(row[0]) if row else 0
+        except Exception as e:
+            logger.debug(f"sqlite cache counter read failed for {key}: {e}")
+            return 0
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        try:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            rows = self._connection().execute(
+                "SELECT key, value FROM cache WHERE key LIKE ? ESCAPE '\\' AND expires_at > ?",
+                (escaped + '%', time.time())
+            ).fetchall()
+            return {key: json.loads(value) for key, value in rows}
+        except Exception as e:
+            logger.debug(f"sqlite cache scan failed for {prefix}: {e}")
+            return {}
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get the process-wide cache backend"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if SCRAPER_CACHE_BACKEND == 'redis':
+                    try:
+                        _backend = RedisCacheBackend()
+                    except Exception as e:
+                        logger.warning(f"Redis cache unavailable ({e}), using sqlite cache at {SCRAPER_CACHE_SQLITE_PATH}")
+                if _backend is None:
+                    _backend = SqliteCacheBackend()
+                logger.info(f"Scraping cache backend: {_backend.name}")
+    return _backend
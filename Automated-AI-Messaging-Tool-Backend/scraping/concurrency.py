@@ -0,0 +1,349 @@
+"""
+Adaptive concurrency for scraping and form submission
+
+A fixed concurrency limit is either too low for a fast network or too high
+for a struggling one. AdaptiveLimiter adjusts the number of requests in
+flight AIMD-style, like TCP congestion control:
+
+- Slow start: every healthy window doubles the limit until the first cut,
+  then each healthy window adds one. A window is about `limit` completed
+  requests with a low error rate and an average latency under the target.
+- Multiplicative decrease: a 429/503 answer, a window with too many
+  timeouts or errors, or memory pressure cut the limit by
+  SCRAPER_AIMD_DECREASE_FACTOR, at most once per window so one burst of
+  failures does not collapse it.
+- High CPU holds the limit where it is.
+
+CPU and memory come from SystemSampler, a daemon thread that samples psutil
+in the background, so checking them never blocks a request (the old
+cpu_percent(interval=1) calls slept for a second each). The same thread
+publishes every limiter's state to the cache backend for the monitoring
+endpoints. Limiters are process-wide, so the limit learned by one batch
+carries over to the next batch scraped by the same worker.
+"""
+import os
+import time
+import socket
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+import psutil
+
+from .cache_backend import get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Adaptive concurrency configuration
+# - SCRAPER_ADAPTIVE_CONCURRENCY: adjust concurrency to latency, errors and memory, false keeps it at the maximum (default: true)
+# - SCRAPER_MIN_CONCURRENCY: lowest limit a cut can reach (default: 4)
+# - SCRAPER_INITIAL_CONCURRENCY: limit a new limiter starts from (default: 10)
+# - SCRAPER_AIMD_LATENCY_TARGET: seconds; windows with a slower average request do not grow the limit (default: 5)
+# - SCRAPER_AIMD_MAX_ERROR_RATE: share of timeouts and errors in a window that cuts the limit (default: 0.2)
+# - SCRAPER_AIMD_DECREASE_FACTOR: multiplier applied on a cut (default: 0.5)
+# - SCRAPER_MAX_MEMORY_PERCENT: system memory use that cuts the limit (default: 85)
+# - SCRAPER_MAX_CPU_PERCENT: system CPU use that stops the limit from growing (default: 90)
+# - SCRAPER_SAMPLE_INTERVAL: seconds between system samples (default: 2)
+SCRAPER_ADAPTIVE_CONCURRENCY = os.getenv('SCRAPER_ADAPTIVE_CONCURRENCY', 'true').lower() == 'true'
+SCRAPER_MIN_CONCURRENCY = int(os.getenv('SCRAPER_MIN_CONCURRENCY', '4'))
+SCRAPER_INITIAL_CONCURRENCY = int(os.getenv('SCRAPER_INITIAL_CONCURRENCY', '10'))
+SCRAPER_AIMD_LATENCY_TARGET = float(os.getenv('SCRAPER_AIMD_LATENCY_TARGET', '5'))
+SCRAPER_AIMD_MAX_ERROR_RATE = float(os.getenv('SCRAPER_AIMD_MAX_ERROR_RATE', '0.2'))
+SCRAPER_AIMD_DECREASE_FACTOR = float(os.getenv('SCRAPER_AIMD_DECREASE_FACTOR', '0.5'))
+SCRAPER_MAX_MEMORY_PERCENT = float(os.getenv('SCRAPER_MAX_MEMORY_PERCENT', '85'))
+SCRAPER_MAX_CPU_PERCENT = float(os.getenv('SCRAPER_MAX_CPU_PERCENT', '90'))
+SCRAPER_SAMPLE_INTERVAL = float(os.getenv('SCRAPER_SAMPLE_INTERVAL', '2'))
+
+# Request outcomes fed to a limiter
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'          # connection reset, refused, 5xx
+OUTCOME_TIMEOUT = 'timeout'
+OUTCOME_OVERLOAD = 'overload'    # the server asks us to slow down
+
+OVERLOAD_STATUS_CODES = {429, 503}
+
+# Published limiter state expires when its worker stops publishing
+PUBLISH_EVERY = 5
+PUBLISH_TTL = 60
+
+
+def outcome_for_status(status: int) -> str:
+    """Outcome of a request that got an HTTP answer"""
+    if status in OVERLOAD_STATUS_CODES:
+        return OUTCOME_OVERLOAD
+    if status >= 500:
+        return OUTCOME_ERROR
+    # 4xx answers are about the page, not about load
+    return OUTCOME_OK
+
+
+class SystemSampler:
+    """CPU and memory use sampled by a daemon thread; reads never block"""
+
+    def __init__(self, interval: float = SCRAPER_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._sample: Dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                # The first cpu_percent(None) call only sets the baseline
+                psutil.cpu_percent(interval=None)
+                self._take_sample()
+                self._thread = threading.Thread(target=self._run, name='system-sampler', daemon=True)
+                self._thread.start()
+
+    def _take_sample(self):
+        memory = psutil.virtual_memory()
+        self._sample = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_available_gb': round(memory.available / (1024 ** 3), 2),
+            'sampled_at': time.time()
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self._take_sample()
+                if time.time() - self._last_publish >= PUBLISH_EVERY:
+                    self._last_publish = time.time()
+                    publish_limiters()
+            except Exception as e:
+                logger.debug(f"System sample failed: {e}")
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent sample (empty until the sampler has started)"""
+        return self._sample
+
+    def memory_pressure(self) -> bool:
+        return self._sample.get('memory_percent', 0) > SCRAPER_MAX_MEMORY_PERCENT
+
+    def cpu_saturated(self) -> bool:
+        return self._sample.get('cpu_percent', 0) > SCRAPER_MAX_CPU_PERCENT
+
+
+_sampler: Optional[SystemSampler] = None
+_sampler_pid: Optional[int] = None
+_sampler_lock = threading.Lock()
+
+
+def get_system_sampler() -> SystemSampler:
+    """This process's running system sampler (a forked child gets its own)"""
+    global _sampler, _sampler_pid
+    if _sampler is None or _sampler_pid != os.getpid():
+        with _sampler_lock:
+            if _sampler is None or _sampler_pid != os.getpid():
+                _sampler = SystemSampler()
+                _sampler_pid = os.getpid()
+    _sampler.start()
+    return _sampler
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrent operations
+
+    Usage:
+        async with limiter.slot():
+            started = time.monotonic()
+            ...request...
+            limiter.record(time.monotonic() - started, outcome)
+
+    slot() gates concurrency; record() feeds the controller and can be
+    called for every request made inside a slot. The limiter is used from
+    one event loop at a time.
+    """
+
+    def __init__(self, name: str, max_limit: int, min_limit: int = SCRAPER_MIN_CONCURRENCY,
+                 initial_limit: int = SCRAPER_INITIAL_CONCURRENCY, adaptive: bool = SCRAPER_ADAPTIVE_CONCURRENCY,
+                 latency_target: float = SCRAPER_AIMD_LATENCY_TARGET,
+                 max_error_rate: float = SCRAPER_AIMD_MAX_ERROR_RATE,
+                 decrease_factor: float = SCRAPER_AIMD_DECREASE_FACTOR):
+        self.name = name
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.adaptive = adaptive
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.decrease_factor = decrease_factor
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit) if adaptive else self.max_limit)
+
+        self.in_flight = 0
+        self.slow_start = True
+        self.increases = 0
+        self.decreases = 0
+        self.last_decrease_reason: Optional[str] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._sampler = get_system_sampler()
+        self._reset_window()
+        # A cut is allowed again once this many requests have completed after it
+        self._cooldown = 0
+
+    def _reset_window(self):
+        self._window_count = 0
+        self._window_failures = 0
+        self._window_latency = 0.0
+        self._window_started = time.monotonic()
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up this waiter received on to the next one
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake_next()
+
+    def _wake_next(self):
+        # Wake as many waiters as the (possibly raised) limit has room for
+        room = self.current_limit - self.in_flight
+        while room > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            # Skip waiters of an earlier task's event loop that is gone
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(None)
+                room -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def record(self, latency: float, outcome: str = OUTCOME_OK):
+        """Feed one finished request to the controller"""
+        if not self.adaptive:
+            return
+        if self._cooldown > 0:
+            self._cooldown -= 1
+
+        if outcome == OUTCOME_OVERLOAD:
+            self._decrease('server asked to slow down (429/503)')
+            return
+
+        self._window_count += 1
+        self._window_latency += latency
+        if outcome in (OUTCOME_ERROR, OUTCOME_TIMEOUT):
+            self._window_failures += 1
+
+        if self._sampler.memory_pressure():
+            self._decrease(f"memory use {self._sampler.latest().get('memory_percent')}%")
+            return
+
+        if self._window_count >= self.current_limit:
+            self._end_window()
+
+    def record_status(self, latency: float, status: int):
+        self.record(latency, outcome_for_status(status))
+
+    def _end_window(self):
+        error_rate = self._window_failures / self._window_count
+        avg_latency = self._window_latency / self._window_count
+        self._reset_window()
+
+        if error_rate > self.max_error_rate:
+            self._decrease(f"{error_rate:.0%} timeouts/errors")
+        elif avg_latency > self.latency_target:
+            logger.debug(f"{self.name} concurrency held at {self.current_limit}: average latency {avg_latency:.1f}s")
+        elif self._sampler.cpu_saturated():
+            logger.debug(f"{self.name} concurrency held at {self.current_limit}: CPU saturated")
+        elif self.current_limit < self.max_limit and (self._waiters or self.in_flight >= self.current_limit - 1):
+            # Only grow while the limit is actually the bottleneck
+            self.limit = min(self.max_limit, self.limit * 2 if self.slow_start else self.limit + 1)
+            self.increases += 1
+            self._wake_next()
+
+    def _decrease(self, reason: str):
+        if self._cooldown > 0:
+            return
+        self.slow_start = False
+        if self.current_limit <= self.min_limit:
+            return
+        previous = self.current_limit
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.decreases += 1
+        self.last_decrease_reason = reason
+        self._cooldown = previous
+        self._reset_window()
+        logger.info(f"{self.name} concurrency cut from {previous} to {self.current_limit}: {reason}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'adaptive': self.adaptive,
+            'limit': self.current_limit,
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'slow_start': self.slow_start,
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'last_decrease_reason': self.last_decrease_reason
+        }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_pid: Optional[int] = None
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, max_limit: int) -> AdaptiveLimiter:
+    """This process's limiter called name, created with max_limit on first use"""
+    global _limiters, _limiters_pid
+    with _limiters_lock:
+        if _limiters_pid != os.getpid():
+            _limiters = {}
+            _limiters_pid = os.getpid()
+        limiter = _limiters.get(name)
+        if limiter is None or limiter.max_limit != max(1, max_limit):
+            limiter = AdaptiveLimiter(name, max_limit)
+            _limiters[name] = limiter
+        return limiter
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def publish_limiters():
+    """Store this process's limiter states and system sample in the cache backend"""
+    if _limiters_pid != os.getpid() or not _limiters:
+        return
+    state = {
+        'limiters': {name: limiter.stats() for name, limiter in list(_limiters.items())},
+        'system': get_system_sampler().latest(),
+        'published_at': time.time()
+    }
+    get_cache_backend().set(f'concurrency:{_worker_id()}', state, PUBLISH_TTL)
+
+
+def concurrency_stats() -> Dict[str, Any]:
+    """Current limits of every worker that published in the last minute"""
+    workers = get_cache_backend().scan('concurrency:')
+    return {key[len('concurrency:'):]: state for key, state in workers.items()}
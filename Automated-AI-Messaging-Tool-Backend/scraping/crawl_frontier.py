@@ -0,0 +1,190 @@
+"""
+Per-site crawl frontier for contact page discovery
+
+When the homepage shows no contact link, popup or form, build_website_data
+used to go straight to a Selenium pass. ContactCrawler first visits a
+handful of the site's own pages over plain HTTP, best candidates first:
+contact URLs listed in sitemap.xml, links found on visited pages (scored
+like homepage links), the common /contact paths, then about pages, which
+often link to the contact page. The crawl stops at the first page with a
+contact form or form widget, or that a site link names as its contact page, or once the
+page budget is spent (the sitemap.xml request is not counted). Fetches run
+one after another on the current thread's session, so they share one
+kept-alive connection to the site.
+"""
+import os
+import re
+import heapq
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from celery_tasks.form_detection_utils import is_contact_form
+from .form_widgets import detect_form_widget
+from .link_scoring import about_link_match, contact_link_score
+from .page_index import PageIndex
+from .politeness import host_key
+from .subpage_fetcher import fetch_subpage
+
+logger = logging.getLogger(__name__)
+
+# Crawl frontier configuration
+# - SCRAPER_CRAWL_BUDGET: pages visited per site looking for a contact page, 0 disables the crawl (default: 5)
+# - SCRAPER_CRAWL_SITEMAP: read sitemap.xml for contact page URLs (default: true)
+SCRAPER_CRAWL_BUDGET = int(os.getenv('SCRAPER_CRAWL_BUDGET', '5'))
+SCRAPER_CRAWL_SITEMAP = os.getenv('SCRAPER_CRAWL_SITEMAP', 'true').lower() == 'true'
+
+# Guessed paths; kept short so about pages still fit in the budget
+COMMON_CONTACT_PATHS = ['/contact', '/contact-us', '/contactus']
+
+# How a candidate was found
+SOURCE_LINK = 'link'          # contact link on a visited page
+SOURCE_SITEMAP = 'sitemap'    # contact URL listed in sitemap.xml
+SOURCE_COMMON_PATH = 'common_path'
+SOURCE_ABOUT = 'about'        # visited only for its links and forms
+
+# Candidates that are the site's own statement of where its contact page is
+PUBLISHED_SOURCES = {SOURCE_LINK, SOURCE_SITEMAP}
+
+# Frontier scores for candidates without a link score of their own
+COMMON_PATH_SCORE = 9
+ABOUT_PAGE_SCORE = 1
+
+SITEMAP_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.IGNORECASE)
+MAX_SITEMAP_CANDIDATES = 5
+
+
+class ContactCrawler:
+    """Best-first crawl of one site with a page budget"""
+
+    def __init__(self, base_url: str, budget: int = SCRAPER_CRAWL_BUDGET,
+                 fetch: Callable[[str], Dict[str, Any]] = fetch_subpage, platform: Optional[str] = None):
+        self.base_url = base_url
+        self.budget = budget
+        # fetch_subpage, or a stand-in with its result shape (re-extraction reads snapshots)
+        self.fetch = fetch
+        # The site's platform fingerprint narrows form widget detection on visited pages
+        self.platform = platform
+        self.host = host_key(base_url)
+        self.pages_fetched = 0
+        self._frontier: List[Tuple[int, int, str, str]] = []
+        self._seen: Set[str] = set()
+        self._pushed = 0
+
+    def _normalize(self, url: str) -> Optional[str]:
+        """Absolute URL without fragment when it is on this site, else None"""
+        url = urljoin(self.base_url, url).split('#', 1)[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or host_key(url) != self.host:
+            return None
+        return url
+
+    def push(self, url: str, score: int, source: str):
+        url = self._normalize(url)
+        if not url or url.rstrip('/') in self._seen:
+            return
+        self._seen.add(url.rstrip('/'))
+        # Highest score first, discovery order among equals
+        heapq.heappush(self._frontier, (-score, self._pushed, url, source))
+        self._pushed += 1
+
+    def seed(self, homepage_html: str):
+        """Queue the homepage's about links, sitemap contact URLs and the common contact paths"""
+        self._seen.add(self.base_url.split('#', 1)[0].rstrip('/'))
+
+        if SCRAPER_CRAWL_SITEMAP:
+            for url, score in self._sitemap_candidates():
+                self.push(url, score, SOURCE_SITEMAP)
+
+        root = f"{urlparse(self.base_url).scheme}://{urlparse(self.base_url).netloc}"
+        for path in COMMON_CONTACT_PATHS:
+            self.push(root + path, COMMON_PATH_SCORE, SOURCE_COMMON_PATH)
+
+        page = PageIndex(BeautifulSoup(homepage_html, 'html.parser'))
+        self._queue_links(page, self.base_url)
+
+    def _sitemap_candidates(self) -> List[Tuple[str, int]]:
+        """Contact-looking URLs of /sitemap.xml with their link scores (nested sitemaps are not followed)"""
+        parsed = urlparse(self.base_url)
+        result = self.fetch(f"{parsed.scheme}://{parsed.netloc}/sitemap.xml")
+        if not result['success']:
+            return []
+        candidates = []
+        for loc in SITEMAP_LOC_RE.findall(result['content']):
+            score = contact_link_score(loc.lower(), '', self.base_url)
+            if score:
+                candidates.append((loc, score))
+        candidates.sort(key=lambda candidate: -candidate[1])
+        return candidates[:MAX_SITEMAP_CANDIDATES]
+
+    def _queue_links(self, page: PageIndex, page_url: str):
+        for a in page.links:
+            link_text = page.text_of(a)
+            score = contact_link_score(a['href'].lower(), link_text, page_url)
+            if score is not None:
+                self.push(urljoin(page_url, a['href']), score, SOURCE_LINK)
+            elif about_link_match(a['href'].lower(), link_text):
+                self.push(urljoin(page_url, a['href']), ABOUT_PAGE_SCORE, SOURCE_ABOUT)
+
+    def _contact_form_url(self, page: PageIndex, source: str, result: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(contact form URL, reason) when the fetched page is the contact page, else None"""
+        url = result['url']
+        if any(is_contact_form(form) for form in page.forms):
+            return url, 'contact form'
+        widget = detect_form_widget(result['content'], url, self.platform)
+        if widget:
+            return widget.form_url, f'{widget.name} form'
+        if source in PUBLISHED_SOURCES:
+            # A contact link that redirects back to the homepage is no contact page
+            final_path = urlparse(result.get('final_url') or url).path
+            if final_path not in ('', '/'):
+                return url, f'{source} to a contact page'
+        if source == SOURCE_COMMON_PATH:
+            title = page.title_tag.get_text(strip=True).lower() if page.title_tag else ''
+            h1 = page.first_h1.get_text(strip=True).lower() if page.first_h1 else ''
+            if 'contact' in title or 'contact' in h1:
+                return url, 'contact page title'
+        return None
+
+    def find_contact_page(self, homepage_html: str) -> Optional[Dict[str, Any]]:
+        """
+        Crawl until a contact page is found or the budget is spent
+
+        Returns:
+            {'url', 'reason', 'pages_fetched'} or None
+        """
+        if self.budget <= 0 or not self.host:
+            return None
+        self.seed(homepage_html)
+
+        while self._frontier and self.pages_fetched < self.budget:
+            _, _, url, source = heapq.heappop(self._frontier)
+            self.pages_fetched += 1
+            result = self.fetch(url)
+            if not result['success']:
+                logger.debug(f"Crawl of {self.host}: {url} failed ({result['error']})")
+                continue
+
+            page = PageIndex(BeautifulSoup(result['content'], 'html.parser'))
+            found = self._contact_form_url(page, source, result)
+            if found:
+                logger.info(f"Crawl of {self.host} found contact page {found[0]} ({found[1]}) "
+                            f"after {self.pages_fetched} pages")
+                return {'url': found[0], 'reason': found[1], 'pages_fetched': self.pages_fetched}
+            self._queue_links(page, url)
+
+        logger.info(f"Crawl of {self.host} found no contact page in {self.pages_fetched} pages")
+        return None
+
+
+def find_contact_page(base_url: str, homepage_html: str, budget: int = SCRAPER_CRAWL_BUDGET,
+                      fetch: Callable[[str], Dict[str, Any]] = fetch_subpage,
+                      platform: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Crawl a site's own pages for its contact page; see ContactCrawler"""
+    try:
+        return ContactCrawler(base_url, budget, fetch, platform).find_contact_page(homepage_html)
+    except Exception as e:
+        logger.warning(f"Contact page crawl of {base_url} failed: {e}")
+        return None
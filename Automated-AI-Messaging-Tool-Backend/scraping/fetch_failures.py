@@ -0,0 +1,91 @@
+"""
+Classification of failed homepage fetches
+
+Every failed fetch result carries a 'failure_type'. Once all URL variants
+of a website have failed, the types decide whether a Selenium pass is worth
+it: only failures that look like bot protection or a JavaScript challenge
+are retried in a real browser. DNS, refused connections, TLS errors,
+timeouts, plain HTTP errors and non-HTML responses fail the same way in
+Chrome.
+"""
+from typing import Any, Dict, List, Optional
+
+FAILURE_DNS = 'dns'
+FAILURE_CONNECTION = 'connection'
+FAILURE_TIMEOUT = 'timeout'
+FAILURE_SSL = 'ssl'
+FAILURE_HTTP = 'http'
+FAILURE_NOT_HTML = 'not_html'
+FAILURE_JS_REQUIRED = 'js_required'
+FAILURE_CANCELLED = 'cancelled'
+FAILURE_UNKNOWN = 'unknown'
+
+# Status codes bot walls and JavaScript challenges answer with
+JS_CHALLENGE_STATUS_CODES = {403, 503}
+
+DNS_ERROR_MARKERS = (
+    'name or service not known', 'failed to resolve', 'nameresolutionerror',
+    'nodename nor servname', 'getaddrinfo failed', 'temporary failure in name resolution',
+    'no address associated with hostname'
+)
+# Servers that drop non-browser clients mid-handshake instead of answering
+DROPPED_CONNECTION_MARKERS = (
+    'connection reset', 'connection aborted', 'remotedisconnected', 'remote end closed', 'server disconnected'
+)
+SSL_ERROR_MARKERS = ('ssl', 'certificate')
+TIMEOUT_ERROR_MARKERS = ('timed out', 'timeout')
+
+# Most informative failure first: the variant that got furthest explains the site best
+FAILURE_PRIORITY = [
+    FAILURE_JS_REQUIRED, FAILURE_NOT_HTML, FAILURE_HTTP, FAILURE_SSL, FAILURE_TIMEOUT,
+    FAILURE_CONNECTION, FAILURE_DNS, FAILURE_UNKNOWN, FAILURE_CANCELLED
+]
+
+
+def classify_status(status_code: int) -> str:
+    """Failure type for an HTTP error status"""
+    if status_code in JS_CHALLENGE_STATUS_CODES:
+        return FAILURE_JS_REQUIRED
+    return FAILURE_HTTP
+
+
+def classify_error(error: Optional[str]) -> str:
+    """Failure type for a requests/aiohttp error message"""
+    message = (error or '').lower()
+    if any(marker in message for marker in DNS_ERROR_MARKERS):
+        return FAILURE_DNS
+    if any(marker in message for marker in DROPPED_CONNECTION_MARKERS):
+        return FAILURE_JS_REQUIRED
+    if any(marker in message for marker in SSL_ERROR_MARKERS):
+        return FAILURE_SSL
+    if any(marker in message for marker in TIMEOUT_ERROR_MARKERS):
+        return FAILURE_TIMEOUT
+    if 'connect' in message:
+        return FAILURE_CONNECTION
+    return FAILURE_UNKNOWN
+
+
+def failure_type(result: Dict[str, Any]) -> str:
+    """Failure type of a failed fetch result, classifying it when the fetcher did not"""
+    if result.get('failure_type'):
+        return result['failure_type']
+    if result.get('status_code'):
+        return classify_status(result['status_code'])
+    return classify_error(result.get('error'))
+
+
+def primary_failure(failures: List[Dict[str, Any]]) -> str:
+    """The most informative failure type among the variants of one website"""
+    types = {failure_type(failure) for failure in failures}
+    for candidate in FAILURE_PRIORITY:
+        if candidate in types:
+            return candidate
+    return FAILURE_UNKNOWN
+
+
+def browser_retry_url(failures: List[Dict[str, Any]]) -> Optional[str]:
+    """First variant whose failure a real browser could get past, or None"""
+    for failure in failures:
+        if failure_type(failure) == FAILURE_JS_REQUIRED:
+            return failure.get('url')
+    return None
@@ -0,0 +1,183 @@
+"""
+Fingerprints of third-party contact form widgets
+
+Many sites without a plain <form> on the page embed their contact form
+through a form builder (HubSpot, Contact Form 7, Gravity Forms, WPForms,
+Wix, Squarespace, Jotform, Typeform). Their script tags, iframes, CSS
+classes and inline JSON are recognizable in the raw HTML, so the form can
+be found without rendering the page in Selenium. Only markup of the form
+itself counts: WordPress plugins load their assets on every page, not
+just the one with the form. Where the builder's ids
+are in the markup, the submission endpoint (and, for hosted forms, the
+form's own URL) is derived as well.
+"""
+import re
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from .platform_fingerprint import PLATFORM_CUSTOM, PLATFORM_SQUARESPACE, PLATFORM_WIX, PLATFORM_WORDPRESS
+
+
+class FormWidget(NamedTuple):
+    """A contact form widget found in a page"""
+    name: str
+    form_url: str                  # page to open to fill the form in
+    endpoint: Optional[str]        # where the form posts, when it can be derived
+    form_id: Optional[str]
+
+
+def _origin(page_url: str) -> str:
+    parsed = urlparse(page_url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+# HubSpot: hbspt.forms.create({portalId: "123", formId: "uuid"}) or an embed container
+HUBSPOT_MARKER_RE = re.compile(r'js(?:-[a-z0-9]+)?\.hsforms\.net/forms|hbspt\.forms\.create|hs-form-frame', re.IGNORECASE)
+HUBSPOT_PORTAL_RE = re.compile(r'''portal[_-]?id["']?\s*[:=]\s*["']?(\d+)''', re.IGNORECASE)
+HUBSPOT_FORM_RE = re.compile(r'''form[_-]?id["']?\s*[:=]\s*["']([0-9a-f-]{36})''', re.IGNORECASE)
+
+# Contact Form 7: <div class="wpcf7" id="wpcf7-f123-o1"> / <input name="_wpcf7" value="123">
+CF7_MARKER_RE = re.compile(r'''class=["'][^"']*\bwpcf7(?:-form)?\b''', re.IGNORECASE)
+CF7_ID_RE = re.compile(r'''wpcf7-f(\d+)-|name=["']_wpcf7["']\s+value=["'](\d+)''', re.IGNORECASE)
+
+# Gravity Forms: <div class="gform_wrapper" id="gform_wrapper_3"> / <form id="gform_3" action="...">
+GRAVITY_MARKER_RE = re.compile(r'\bgform_wrapper\b', re.IGNORECASE)
+GRAVITY_FORM_RE = re.compile(r'''<form[^>]*\bid=["']gform_(\d+)["'][^>]*>''', re.IGNORECASE)
+
+# WPForms: <form class="wpforms-form" id="wpforms-form-42" action="...">
+WPFORMS_MARKER_RE = re.compile(r'\bwpforms-form\b', re.IGNORECASE)
+WPFORMS_FORM_RE = re.compile(r'''<form[^>]*\bid=["']wpforms-form-(\d+)["'][^>]*>''', re.IGNORECASE)
+
+# Wix Forms: the server-rendered form component (the app id in the site JSON is on every page)
+WIX_MARKER_RE = re.compile(r'\bwixui-form\b', re.IGNORECASE)
+
+# Squarespace form blocks (newsletter blocks are a different block type)
+SQUARESPACE_MARKER_RE = re.compile(r'\bsqs-block-form\b|\bform-block\b[^>]*data-block-json', re.IGNORECASE)
+SQUARESPACE_FORM_RE = re.compile(r'''formId&quot;:&quot;([0-9a-f]{24})|"formId"\s*:\s*"([0-9a-f]{24})"''', re.IGNORECASE)
+
+# Jotform: embed script form.jotform.com/jsform/123 or an iframe to form.jotform.com/123
+JOTFORM_RE = re.compile(r'(?:form|www|eu|hipaa)\.jotform\.com/(?:jsform/)?(\d{6,})', re.IGNORECASE)
+
+# Typeform: data-tf-widget="abc123", embed.typeform.com, or links to form.typeform.com/to/abc123
+TYPEFORM_ID_RE = re.compile(r'''data-tf-(?:widget|popup|slider|popover|sidetab|live)=["']([A-Za-z0-9]+)|typeform\.com/to/([A-Za-z0-9]+)''')
+TYPEFORM_MARKER_RE = re.compile(r'embed\.typeform\.com|typeform\.com/to/', re.IGNORECASE)
+
+
+def _form_action(form_tag: str, page_url: str) -> str:
+    action = re.search(r'''\baction=["']([^"']*)["']''', form_tag, re.IGNORECASE)
+    return urljoin(page_url, action.group(1)) if action and action.group(1).strip() else page_url
+
+
+def _hubspot(html: str, page_url: str) -> Optional[FormWidget]:
+    if not HUBSPOT_MARKER_RE.search(html):
+        return None
+    portal = HUBSPOT_PORTAL_RE.search(html)
+    form = HUBSPOT_FORM_RE.search(html)
+    endpoint = None
+    if portal and form:
+        endpoint = (f"https://api.hsforms.com/submissions/v3/integration/submit/"
+                    f"{portal.group(1)}/{form.group(1)}")
+    return FormWidget('HubSpot', page_url, endpoint, form.group(1) if form else None)
+
+
+def _contact_form_7(html: str, page_url: str) -> Optional[FormWidget]:
+    if not CF7_MARKER_RE.search(html):
+        return None
+    match = CF7_ID_RE.search(html)
+    form_id = (match.group(1) or match.group(2)) if match else None
+    endpoint = (f"{_origin(page_url)}/wp-json/contact-form-7/v1/contact-forms/{form_id}/feedback"
+                if form_id else None)
+    return FormWidget('Contact Form 7', page_url, endpoint, form_id)
+
+
+def _gravity_forms(html: str, page_url: str) -> Optional[FormWidget]:
+    if not GRAVITY_MARKER_RE.search(html):
+        return None
+    form = GRAVITY_FORM_RE.search(html)
+    if form:
+        return FormWidget('Gravity Forms', page_url, _form_action(form.group(0), page_url), form.group(1))
+    return FormWidget('Gravity Forms', page_url, None, None)
+
+
+def _wpforms(html: str, page_url: str) -> Optional[FormWidget]:
+    if not WPFORMS_MARKER_RE.search(html):
+        return None
+    form = WPFORMS_FORM_RE.search(html)
+    if form:
+        return FormWidget('WPForms', page_url, _form_action(form.group(0), page_url), form.group(1))
+    return FormWidget('WPForms', page_url, None, None)
+
+
+def _wix(html: str, page_url: str) -> Optional[FormWidget]:
+    if not WIX_MARKER_RE.search(html):
+        return None
+    return FormWidget('Wix Forms', page_url, None, None)
+
+
+def _squarespace(html: str, page_url: str) -> Optional[FormWidget]:
+    if not SQUARESPACE_MARKER_RE.search(html):
+        return None
+    form = SQUARESPACE_FORM_RE.search(html)
+    # Submissions go through Squarespace's session-bound API, so there is no endpoint to record
+    return FormWidget('Squarespace', page_url, None, (form.group(1) or form.group(2)) if form else None)
+
+
+def _jotform(html: str, page_url: str) -> Optional[FormWidget]:
+    match = JOTFORM_RE.search(html)
+    if not match:
+        return None
+    form_id = match.group(1)
+    return FormWidget('Jotform', f"https://form.jotform.com/{form_id}",
+                      f"https://submit.jotform.com/submit/{form_id}/", form_id)
+
+
+def _typeform(html: str, page_url: str) -> Optional[FormWidget]:
+    if not TYPEFORM_MARKER_RE.search(html) and 'data-tf-' not in html:
+        return None
+    match = TYPEFORM_ID_RE.search(html)
+    if not match:
+        return None
+    form_id = match.group(1) or match.group(2)
+    # Typeform posts through its own app; the hosted form is the endpoint to use
+    return FormWidget('Typeform', f"https://form.typeform.com/to/{form_id}", None, form_id)
+
+
+# (substrings of the lowercased page one of which must be present, platform
+# the builder only runs on or None for hosted forms embeddable anywhere, fingerprint)
+# Checked in this order: hosted forms first (their URL is directly usable),
+# then builders whose ids give a submission endpoint
+FINGERPRINTS: List[Tuple[Tuple[str, ...], Optional[str], Callable[[str, str], Optional[FormWidget]]]] = [
+    (('jotform.com',), None, _jotform),
+    (('typeform.com', 'data-tf-'), None, _typeform),
+    (('hsforms.net', 'hbspt.forms', 'hs-form-frame'), None, _hubspot),
+    (('wpcf7',), PLATFORM_WORDPRESS, _contact_form_7),
+    (('gform_wrapper',), PLATFORM_WORDPRESS, _gravity_forms),
+    (('wpforms-form',), PLATFORM_WORDPRESS, _wpforms),
+    (('sqs-block-form', 'form-block'), PLATFORM_SQUARESPACE, _squarespace),
+    (('wixui-form',), PLATFORM_WIX, _wix)
+]
+
+
+def _matches(html: str, page_url: str, platform: Optional[str] = None):
+    # Substring tests on one lowercased copy are much cheaper than the
+    # case-insensitive regexes, which then only run on likely pages.
+    # On a fingerprinted site, other platforms' builders are not looked for.
+    known = platform if platform and platform != PLATFORM_CUSTOM else None
+    lowered = html.lower()
+    for needles, builder_platform, fingerprint in FINGERPRINTS:
+        if known and builder_platform and builder_platform != known:
+            continue
+        if any(needle in lowered for needle in needles):
+            widget = fingerprint(html, page_url)
+            if widget:
+                yield widget
+
+
+def detect_form_widgets(html: str, page_url: str, platform: Optional[str] = None) -> List[FormWidget]:
+    """Every known form widget embedded in html, in FINGERPRINTS order"""
+    return list(_matches(html, page_url, platform))
+
+
+def detect_form_widget(html: str, page_url: str, platform: Optional[str] = None) -> Optional[FormWidget]:
+    """The most useful form widget embedded in html, or None (platform: the site's fingerprint, when known)"""
+    return next(_matches(html, page_url, platform), None)
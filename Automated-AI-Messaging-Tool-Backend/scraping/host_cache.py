@@ -0,0 +1,308 @@
+"""
+DNS and dead-host caches shared across uploads
+
+Uploads repeat many domains, and a domain that did not resolve or refused
+connections an hour ago almost always still does. HostCache remembers
+DNS answers and hosts whose every URL variant failed at the DNS or
+connection level, in the shared cache backend with a TTL, and keeps a
+small in-process copy so repeat lookups cost microseconds.
+
+The backend (Redis, sqlite) is blocking; the *_async methods used by the
+async engine and resolver reach it from the loop's default executor so a
+slow backend delays one fetch, not every fetch on the loop.
+"""
+import os
+import time
+import socket
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+
+from .cache_backend import CacheBackend, get_cache_backend
+from .fetch_failures import FAILURE_CONNECTION, FAILURE_DNS
+from .politeness import host_key
+
+logger = logging.getLogger(__name__)
+
+# Host cache configuration
+# - SCRAPER_DNS_TTL: seconds a DNS answer is reused (default: 300)
+# - SCRAPER_NEGATIVE_TTL: seconds a dead host (no DNS, connection refused) is skipped (default: 21600)
+# - SCRAPER_PREFLIGHT_CONCURRENCY: DNS lookups in flight during the pre-flight pass (default: 50)
+SCRAPER_DNS_TTL = int(os.getenv('SCRAPER_DNS_TTL', '300'))
+SCRAPER_NEGATIVE_TTL = int(os.getenv('SCRAPER_NEGATIVE_TTL', '21600'))
+SCRAPER_PREFLIGHT_CONCURRENCY = int(os.getenv('SCRAPER_PREFLIGHT_CONCURRENCY', '50'))
+
+# Failure types that mark a whole host as dead
+DEAD_HOST_FAILURES = {FAILURE_DNS, FAILURE_CONNECTION}
+
+# Resolver answers that only mean "try again later"; never cached as dead
+TRANSIENT_DNS_ERRNOS = {socket.EAI_AGAIN}
+TRANSIENT_DNS_MARKERS = ('temporary failure in name resolution', 'try again')
+
+# Bound on the in-process copies
+MAX_LOCAL_ENTRIES = 10000
+
+
+def is_transient_dns_error(error: Optional[str]) -> bool:
+    message = (error or '').lower()
+    return any(marker in message for marker in TRANSIENT_DNS_MARKERS)
+
+
+class HostCache:
+    """Shared DNS answers and dead-host markers with an in-process front"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None,
+                 dns_ttl: int = SCRAPER_DNS_TTL, negative_ttl: int = SCRAPER_NEGATIVE_TTL):
+        self._backend = backend
+        self.dns_ttl = dns_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._local: Dict[str, Tuple[float, Any]] = {}
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = get_cache_backend()
+        return self._backend
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    return entry[1]
+                del self._local[key]
+        return None
+
+    def _load(self, key: str) -> Optional[Any]:
+        """Read key from the backend (blocking) into the in-process copy"""
+        value = self.backend.get(key)
+        if value is not None:
+            self._remember(key, value, value.get('expires_at', time.time() + self.dns_ttl))
+        return value
+
+    def _get(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        return value if value is not None else self._load(key)
+
+    async def _get_async(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        return await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+
+    def _set(self, key: str, value: Dict[str, Any], ttl: int):
+        value['expires_at'] = time.time() + ttl
+        self._remember(key, value, value['expires_at'])
+        self.backend.set(key, value, ttl)
+
+    async def _set_async(self, key: str, value: Dict[str, Any], ttl: int):
+        value['expires_at'] = time.time() + ttl
+        self._remember(key, value, value['expires_at'])
+        await asyncio.get_running_loop().run_in_executor(None, self.backend.set, key, value, ttl)
+
+    def _remember(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            if len(self._local) >= MAX_LOCAL_ENTRIES:
+                now = time.time()
+                stale = [k for k, (entry_expires, _) in self._local.items() if entry_expires <= now]
+                # Nothing expired yet: drop the oldest tenth
+                for k in stale or list(self._local)[:MAX_LOCAL_ENTRIES // 10]:
+                    del self._local[k]
+            self._local[key] = (expires_at, value)
+
+    # Dead hosts
+
+    def dead_host(self, url: str) -> Optional[Dict[str, Any]]:
+        """The recorded failure when url's host is known to be dead, else None"""
+        host = host_key(url)
+        if not host:
+            return None
+        return self._get(f'dead:{host}')
+
+    async def dead_host_async(self, url: str) -> Optional[Dict[str, Any]]:
+        """dead_host for coroutines"""
+        host = host_key(url)
+        if not host:
+            return None
+        return await self._get_async(f'dead:{host}')
+
+    def _dead_host_key(self, url: str, failure_type: str, error: str) -> Optional[str]:
+        """Cache key to mark dead, or None when the failure does not condemn the host"""
+        if failure_type not in DEAD_HOST_FAILURES:
+            return None
+        if failure_type == FAILURE_DNS and is_transient_dns_error(error):
+            return None
+        host = host_key(url)
+        return f'dead:{host}' if host else None
+
+    def mark_dead(self, url: str, failure_type: str, error: str):
+        """Remember that every variant of url's host failed with failure_type"""
+        key = self._dead_host_key(url, failure_type, error)
+        if key:
+            self._set(key, {'failure_type': failure_type, 'error': error}, self.negative_ttl)
+            logger.info(f"Marked {key[5:]} as dead ({failure_type}) for {self.negative_ttl}s")
+
+    async def mark_dead_async(self, url: str, failure_type: str, error: str):
+        """mark_dead for coroutines"""
+        key = self._dead_host_key(url, failure_type, error)
+        if key:
+            await self._set_async(key, {'failure_type': failure_type, 'error': error}, self.negative_ttl)
+            logger.info(f"Marked {key[5:]} as dead ({failure_type}) for {self.negative_ttl}s")
+
+    def clear_dead(self, url: str):
+        host = host_key(url)
+        with self._lock:
+            self._local.pop(f'dead:{host}', None)
+        self.backend.delete(f'dead:{host}')
+
+    # DNS
+
+    def cached_addresses(self, hostname: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._get(f'dns:{hostname.lower()}')
+        return entry['addresses'] if entry else None
+
+    def store_addresses(self, hostname: str, addresses: List[Dict[str, Any]]):
+        self._set(f'dns:{hostname.lower()}', {'addresses': addresses}, self.dns_ttl)
+
+    def resolve(self, hostname: str, port: int = 443) -> List[str]:
+        """IP addresses for hostname, from cache or getaddrinfo (raises socket.gaierror)"""
+        addresses = self.cached_addresses(hostname)
+        if addresses is None:
+            infos = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+            addresses = _address_dicts(hostname, port, infos)
+            self.store_addresses(hostname, addresses)
+        return [address['host'] for address in addresses]
+
+    async def resolve_async(self, hostname: str, port: int = 443) -> List[Dict[str, Any]]:
+        """Async counterpart of resolve returning aiohttp resolver dicts"""
+        key = f'dns:{hostname.lower()}'
+        entry = await self._get_async(key)
+        addresses = entry['addresses'] if entry else None
+        if addresses is None:
+            loop = asyncio.get_running_loop()
+            infos = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+            addresses = _address_dicts(hostname, port, infos)
+            await self._set_async(key, {'addresses': addresses}, self.dns_ttl)
+        return [dict(address, port=port) for address in addresses]
+
+    async def preflight(self, urls: List[str], concurrency: int = SCRAPER_PREFLIGHT_CONCURRENCY) -> Dict[int, Dict[str, Any]]:
+        """
+        Resolve the hosts of a whole upload before scraping starts
+
+        Returns:
+            {index in urls: failed fetch result} for URLs whose host is known
+            dead or does not resolve (with or without www.)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(host: str) -> Optional[Dict[str, Any]]:
+            dead = await self.dead_host_async(f'https://{host}')
+            if dead:
+                return dead
+            last_error = None
+            for hostname in (host, f'www.{host}'):
+                try:
+                    async with semaphore:
+                        await self.resolve_async(hostname)
+                    return None
+                except socket.gaierror as e:
+                    if e.errno in TRANSIENT_DNS_ERRNOS:
+                        return None
+                    last_error = f"DNS resolution failed: {e}"
+                except Exception as e:
+                    # Anything but a clear negative answer: let the scraper decide
+                    logger.debug(f"Pre-flight lookup for {hostname} inconclusive: {e}")
+                    return None
+            await self.mark_dead_async(f'https://{host}', FAILURE_DNS, last_error)
+            return {'failure_type': FAILURE_DNS, 'error': last_error}
+
+        hosts = {}
+        for index, url in enumerate(urls):
+            target = url if '://' in url else f'https://{url.strip()}'
+            host = host_key(target)
+            if host and urlparse(target).hostname:
+                hosts.setdefault(host, []).append(index)
+
+        results = await asyncio.gather(*(check(host) for host in hosts))
+        host_results = dict(zip(hosts, results))
+
+        unreachable = {}
+        for host, indexes in hosts.items():
+            dead = host_results[host]
+            if dead:
+                for index in indexes:
+                    unreachable[index] = dead_host_result(urls[index], dead)
+        if unreachable:
+            logger.info(f"Pre-flight: {len(unreachable)} of {len(urls)} websites are unreachable, skipping them")
+        return unreachable
+
+
+def _address_dicts(hostname: str, port: int, infos) -> List[Dict[str, Any]]:
+    """getaddrinfo results in the shape aiohttp resolvers return (JSON friendly)"""
+    addresses = []
+    for family, _, proto, _, sockaddr in infos:
+        if family == socket.AF_INET6 and sockaddr[3]:
+            # Link-local IPv6 needs the scope id, which does not survive the cache
+            continue
+        addresses.append({
+            'hostname': hostname,
+            'host': sockaddr[0],
+            'port': port,
+            'family': int(family),
+            'proto': proto,
+            'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+        })
+    if not addresses:
+        raise socket.gaierror(socket.EAI_NONAME, f"No usable addresses for {hostname}")
+    return addresses
+
+
+def dead_host_result(url: str, dead: Dict[str, Any]) -> Dict[str, Any]:
+    """Failed fetch result for a URL whose host is known to be dead"""
+    return {
+        'success': False,
+        'error': f"Known unreachable host ({dead['failure_type']}): {dead.get('error')}",
+        'url': url,
+        'failure_type': dead['failure_type'],
+        'cached': True
+    }
+
+
+class CachedResolver(AbstractResolver):
+    """aiohttp resolver backed by the shared DNS cache"""
+
+    def __init__(self, host_cache: 'HostCache'):
+        self._host_cache = host_cache
+        self._fallback = DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+        try:
+            return await self._host_cache.resolve_async(host, port)
+        except socket.gaierror:
+            raise
+        except Exception:
+            return await self._fallback.resolve(host, port, family)
+
+    async def close(self) -> None:
+        await self._fallback.close()
+
+
+_host_cache: Optional[HostCache] = None
+_host_cache_lock = threading.Lock()
+
+
+def get_host_cache() -> HostCache:
+    """Get the process-wide host cache"""
+    global _host_cache
+    if _host_cache is None:
+        with _host_cache_lock:
+            if _host_cache is None:
+                _host_cache = HostCache()
+    return _host_cache
@@ -0,0 +1,102 @@
+"""
+Keyword classification of page text
+
+Industry and business-type detection used to run `keyword in page_text`
+once per keyword. The keyword tables live here and are compiled once at
+import into an Aho-Corasick automaton (pyahocorasick), so the page text is
+scanned a single time for every keyword. Without pyahocorasick installed
+the matcher falls back to one substring test per keyword, which gives the
+same results.
+"""
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+    logger.warning("pyahocorasick not available, keyword matching falls back to per-keyword scans")
+
+# Industry -> keywords, each keyword present in the page counts once per list entry
+INDUSTRY_KEYWORDS: Dict[str, List[str]] = {
+    'insurance': ['insurance', 'insurer', 'coverage', 'policy', 'premium', 'claim', 'farmers insurance', 'state farm', 'allstate', 'geico', 'progressive', 'agent', 'broker', 'underwriter'],
+    'automotive': ['car dealership', 'auto dealership', 'used cars', 'new cars', 'auto sales', 'car sales', 'automotive dealer', 'vehicle dealer', 'car lot', 'auto lot'],
+    'technology': ['tech', 'software', 'hardware', 'digital', 'ai', 'artificial intelligence', 'app', 'platform', 'saas', 'cloud', 'cyber', 'data'],
+    'retail': ['shop', 'store', 'buy', 'sell', 'retail', 'commerce', 'online store', 'ecommerce', 'e-commerce', 'merchandise'],
+    'finance': ['bank', 'financial', 'investment', 'credit', 'loan', 'mortgage', 'wealth', 'banking', 'financial services'],
+    'healthcare': ['health', 'medical', 'hospital', 'clinic', 'pharmacy', 'doctor', 'physician', 'dental', 'healthcare', 'medical services'],
+    'education': ['school', 'university', 'college', 'education', 'learning', 'academy', 'institute', 'educational'],
+    'manufacturing': ['manufacturing', 'factory', 'production', 'industrial', 'manufacturer', 'manufacturing company'],
+    'real estate': ['real estate', 'property', 'housing', 'construction', 'realtor', 'broker', 'realty', 'homes for sale'],
+    'consulting': ['consulting', 'advisory', 'services', 'solutions', 'consultant', 'consulting firm'],
+    'restaurant': ['restaurant', 'food', 'dining', 'cafe', 'bistro', 'grill', 'kitchen', 'restaurant', 'food service'],
+    'legal': ['law', 'legal', 'attorney', 'lawyer', 'law firm', 'legal services', 'legal counsel']
+}
+
+# Business types in priority order: the first type with any keyword present wins
+BUSINESS_TYPE_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ('Auto Dealership', ['car dealership', 'auto dealership', 'dealership', 'used cars', 'new cars', 'auto sales', 'car sales']),
+    ('Startup', ['startup', 'start-up']),
+    ('Enterprise', ['enterprise', 'corporation', 'corp']),
+    ('Small Business', ['small business', 'sme']),
+    ('Non-Profit', ['non-profit', 'nonprofit'])
+]
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur in a text, in one pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(keywords))
+        self._automaton = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords occurring anywhere in text (substring match, like `keyword in text`)"""
+        if self._automaton is None:
+            return {keyword for keyword in self.keywords if keyword in text}
+        return {keyword for _, keyword in self._automaton.iter(text)}
+
+
+class KeywordHits(NamedTuple):
+    """Classification signals found in a page's text"""
+    industry_scores: Dict[str, int]
+    business_type: Optional[str]
+
+
+PAGE_KEYWORD_MATCHER = KeywordMatcher(
+    [keyword for keywords in INDUSTRY_KEYWORDS.values() for keyword in keywords] +
+    [keyword for _, keywords in BUSINESS_TYPE_KEYWORDS for keyword in keywords]
+)
+
+
+def scan_page_keywords(page_text: str) -> KeywordHits:
+    """
+    Scan lowercased page text once for industry and business-type keywords
+
+    Returns:
+        industry_scores: industries with at least one hit, in INDUSTRY_KEYWORDS order
+        business_type: first matching entry of BUSINESS_TYPE_KEYWORDS, or None
+    """
+    found = PAGE_KEYWORD_MATCHER.find(page_text)
+
+    industry_scores = {}
+    for industry, keywords in INDUSTRY_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in found)
+        if score > 0:
+            industry_scores[industry] = score
+
+    business_type = None
+    for label, keywords in BUSINESS_TYPE_KEYWORDS:
+        if any(keyword in found for keyword in keywords):
+            business_type = label
+            break
+
+    return KeywordHits(industry_scores, business_type)
@@ -0,0 +1,68 @@
+"""
+Classification of page links as contact or about pages
+
+Shared by extract_company_info (homepage links) and the per-site crawl
+frontier (links of the pages it visits), so both rank links the same way.
+"""
+from typing import Optional
+
+# Widgets and services that are never the site's own contact form
+THIRD_PARTY_CONTACT_MARKERS = ['usablenet', 'a40.', 'feedback', 'survey', 'zendesk', 'intercom']
+# Links that are never the site's own about page
+EXTERNAL_ABOUT_MARKERS = ['usablenet', 'a40.', 'facebook', 'twitter', 'instagram', 'youtube', 'pinterest']
+
+ABOUT_HREF_WORDS = ['about', 'about-us', 'aboutus', 'company', 'who-we-are', 'our-story']
+ABOUT_TEXT_WORDS = ['about', 'about us', 'company', 'who we are', 'our story']
+CONTACT_HREF_WORDS = ['contact', 'reach', 'get-in-touch']
+CONTACT_TEXT_WORDS = ['contact', 'reach us', 'get in touch']
+
+
+def contact_link_score(href: str, link_text: str, base_url: str) -> Optional[int]:
+    """
+    Score of a link as the site's contact page, None when it is not one
+
+    Args:
+        href: lowercased href of the link
+        link_text: lowercased text of the link
+        base_url: URL of the page the link is on; links to about pages only
+            count when that page is an about page itself
+    """
+    # Skip third-party widgets and external services
+    if any(external in href for external in THIRD_PARTY_CONTACT_MARKERS):
+        return None
+
+    on_about_page = any(word in base_url for word in ABOUT_HREF_WORDS)
+
+    # Skip about pages that might be misidentified as contact forms
+    # UNLESS we're specifically looking for contact forms on about pages
+    if any(word in href for word in ABOUT_HREF_WORDS) and not on_about_page:
+        return None
+
+    score = 0
+    if any(word in href for word in CONTACT_HREF_WORDS):
+        if 'contact' in href: score += 10
+        if 'contact' in link_text: score += 5
+        if 'form' in href: score += 3
+        if 'message' in href: score += 2
+        return score
+
+    if any(word in link_text for word in CONTACT_TEXT_WORDS):
+        if any(word in link_text for word in ABOUT_TEXT_WORDS) and not on_about_page:
+            return None
+        if 'contact' in link_text: score += 8
+        if 'reach' in link_text: score += 4
+        if 'get in touch' in link_text: score += 6
+        return score
+
+    return None
+
+
+def about_link_match(href: str, link_text: str) -> Optional[str]:
+    """'URL' or 'text' when a link (lowercased href and text) points to an about page, else None"""
+    if any(external in href for external in EXTERNAL_ABOUT_MARKERS):
+        return None
+    if any(word in href for word in ABOUT_HREF_WORDS):
+        return 'URL'
+    if any(word in link_text for word in ABOUT_TEXT_WORDS):
+        return 'text'
+    return None
@@ -0,0 +1,122 @@
+"""
+Single-pass index over a parsed HTML page
+
+extract_company_info used to call find_all and get_text over the same
+BeautifulSoup tree many times. PageIndex walks the tree once and keeps
+everything the extractor looks at: title, meta tags, links, clickable
+elements, forms and the page text. Element texts are sliced out of the
+page text collected during the walk instead of walking each subtree again.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+# Tags whose class attribute is inspected for popup/contact triggers
+CLASS_ELEMENT_TAGS = frozenset(['button', 'input', 'div', 'span', 'a'])
+
+_END = object()
+
+
+class PageIndex:
+    """Elements and text of a page, gathered in document order in one tree walk"""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.title_tag: Optional[Tag] = None
+        self.first_h1: Optional[Tag] = None
+        self.meta_by_property: Dict[str, Tag] = {}
+        self.meta_by_name: Dict[str, Tag] = {}
+        self.links: List[Tag] = []
+        self.class_elements: List[Tag] = []
+        self.data_toggle_elements: List[Tag] = []
+        self.onclick_elements: List[Tag] = []
+        self.forms: List[Tag] = []
+
+        self._strings: List[str] = []
+        self._spans: Dict[int, Tuple[int, int]] = {}
+        self._text_cache: Dict[int, str] = {}
+        self._page_text: Optional[str] = None
+
+        self._walk(soup)
+
+    def _walk(self, soup: BeautifulSoup):
+        # Same string types BeautifulSoup.get_text() collects (skips comments, scripts, styles)
+        text_types = soup.interesting_string_types
+        strings = self._strings
+        spans = self._spans
+
+        iterators = [iter(soup.contents)]
+        open_tags: List[Optional[Tag]] = [None]
+        while iterators:
+            child = next(iterators[-1], _END)
+            if child is _END:
+                iterators.pop()
+                tag = open_tags.pop()
+                if tag is not None and id(tag) in spans:
+                    spans[id(tag)] = (spans[id(tag)][0], len(strings))
+                continue
+
+            if isinstance(child, Tag):
+                if self._visit(child):
+                    spans[id(child)] = (len(strings), len(strings))
+                iterators.append(iter(child.contents))
+                open_tags.append(child)
+            elif type(child) in text_types:
+                strings.append(child)
+
+    def _visit(self, tag: Tag) -> bool:
+        """File a tag under every category it belongs to; True when its text may be needed"""
+        name = tag.name
+        attrs = tag.attrs
+        needs_text = False
+
+        if name == 'a':
+            if 'href' in attrs:
+                self.links.append(tag)
+                needs_text = True
+        elif name == 'meta':
+            meta_property = attrs.get('property')
+            if meta_property is not None and meta_property not in self.meta_by_property:
+                self.meta_by_property[meta_property] = tag
+            meta_name = attrs.get('name')
+            if meta_name is not None and meta_name not in self.meta_by_name:
+                self.meta_by_name[meta_name] = tag
+        elif name == 'title':
+            if self.title_tag is None:
+                self.title_tag = tag
+        elif name == 'h1':
+            if self.first_h1 is None:
+                self.first_h1 = tag
+        elif name == 'form':
+            self.forms.append(tag)
+
+        if name in CLASS_ELEMENT_TAGS and 'class' in attrs:
+            self.class_elements.append(tag)
+            needs_text = True
+        if 'data-toggle' in attrs:
+            self.data_toggle_elements.append(tag)
+            needs_text = True
+        if 'onclick' in attrs:
+            self.onclick_elements.append(tag)
+            needs_text = True
+
+        return needs_text
+
+    @property
+    def page_text(self) -> str:
+        """Lowercased text of the whole page, same as soup.get_text().lower()"""
+        if self._page_text is None:
+            self._page_text = ''.join(self._strings).lower()
+        return self._page_text
+
+    def text_of(self, tag: Tag) -> str:
+        """Lowercased text of an indexed element, same as tag.get_text().lower()"""
+        key = id(tag)
+        text = self._text_cache.get(key)
+        if text is None:
+            span = self._spans.get(key)
+            if span is None:
+                text = tag.get_text().lower()
+            else:
+                text = ''.join(self._strings[span[0]:span[1]]).lower()
+            self._text_cache[key] = text
+        return text
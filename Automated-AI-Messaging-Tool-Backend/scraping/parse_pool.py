@@ -0,0 +1,288 @@
+"""
+Process pool for HTML parsing
+
+BeautifulSoup with html.parser is pure Python: a large page keeps a core
+busy for tens to hundreds of milliseconds, and in a thread it holds the
+GIL, stalling the event loop that drives every in-flight fetch.
+AsyncScrapeEngine hands parsing (parse_company_page, extract_about_content)
+to a process pool sized to the machine's cores through a bounded queue.
+When parsing falls behind, fetch tasks wait on the full queue and no new
+fetches start, instead of downloaded pages piling up in memory.
+
+Celery's prefork children are daemonic, which multiprocessing takes to
+mean they may not start processes. The pool lifts that flag for its own
+process and is shut down by a worker_process_shutdown hook (celery_app.py)
+instead, so parsing runs in processes under the shipped prefork workers.
+
+Queue depth, time waited in the queue and parse time per page are kept in
+ParseMetrics; every run adds its totals to counters in the cache backend so
+the API process can report them for all workers.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache_backend import get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Parse pool configuration
+# - SCRAPER_PARSE_WORKERS: parse processes per worker process (default: CPU count)
+# - SCRAPER_PARSE_QUEUE_SIZE: downloaded pages waiting for a parse process before fetching pauses (default: 2 x SCRAPER_PARSE_WORKERS)
+# - SCRAPER_PARSE_PROCESSES: parse in child processes, false parses in threads (default: true)
+SCRAPER_PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', str(os.cpu_count() or 1)))
+SCRAPER_PARSE_QUEUE_SIZE = int(os.getenv('SCRAPER_PARSE_QUEUE_SIZE', str(2 * SCRAPER_PARSE_WORKERS)))
+SCRAPER_PARSE_PROCESSES = os.getenv('SCRAPER_PARSE_PROCESSES', 'true').lower() == 'true'
+
+# Seconds allowed for the first parse process to start
+POOL_START_TIMEOUT = 60
+
+# Last run's metrics are kept this long for the monitoring endpoint
+LAST_RUN_TTL = 86400
+
+COUNTER_KEYS = ('pages', 'parse_ms', 'queue_wait_ms', 'backpressure_waits', 'failures')
+
+
+def timed_call(func: Callable, *args) -> Tuple[Any, float]:
+    """Run func in the parse worker; returns (result, seconds spent in it)"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+# Imported once by the fork server, so parse processes start with the parsers loaded
+FORKSERVER_PRELOAD = ['celery_tasks.scraping_tasks']
+
+
+def _mp_context():
+    # Forking a worker that already runs fetch and Selenium threads can copy a
+    # held lock (logging, sessions) into the child; a fork server forks from a
+    # clean process instead
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+_executor: Optional[Executor] = None
+_executor_pid: Optional[int] = None
+_executor_mode: Optional[str] = None
+_executor_lock = threading.Lock()
+
+
+def _allow_child_processes():
+    """
+    Let a daemonic process (a Celery prefork child) start the parse processes
+
+    multiprocessing refuses because a daemonic process may exit without
+    reaping its children; shutdown_parse_executor does the reaping here.
+    The pool starts processes on demand, so the flag stays lifted. Under
+    billiard the process's authkey is billiard's type, which the standard
+    library will not pickle for a fork server or spawned child.
+    """
+    process = multiprocessing.current_process()
+    if process._config.get('daemon'):
+        process._config['daemon'] = False
+        logger.info(f"Allowing daemonic process {process.name} to start parse processes")
+    authkey = process._config.get('authkey')
+    if authkey is not None and not isinstance(authkey, multiprocessing.process.AuthenticationString):
+        process._config['authkey'] = multiprocessing.process.AuthenticationString(bytes(authkey))
+
+
+def _create_executor(workers: int) -> Tuple[Executor, str]:
+    if SCRAPER_PARSE_PROCESSES:
+        executor = None
+        try:
+            _allow_child_processes()
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            # Find out now rather than on the first page whether processes start
+            executor.submit(os.getpid).result(timeout=POOL_START_TIMEOUT)
+            logger.info(f"Parse pool: {workers} processes")
+            return executor, 'process'
+        except Exception as e:
+            logger.warning(f"Parse processes unavailable ({e}), parsing in threads")
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse'), 'thread'
+
+
+def get_parse_executor(workers: int = SCRAPER_PARSE_WORKERS) -> Tuple[Executor, str]:
+    """This process's parse pool and its mode, 'process' or 'thread' (a forked child gets its own)"""
+    global _executor, _executor_pid, _executor_mode
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor, _executor_mode = _create_executor(workers)
+                _executor_pid = os.getpid()
+    return _executor, _executor_mode
+
+
+def shutdown_parse_executor():
+    """Stop this process's parse pool and wait for its processes to exit"""
+    global _executor
+    with _executor_lock:
+        executor = _executor if _executor_pid == os.getpid() else None
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def discard_parse_executor(executor: Executor):
+    """Drop a broken pool (a parse process was killed) so the next caller gets a new one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ParseMetrics:
+    """Queue depth, queue wait and parse time of one engine run"""
+
+    def __init__(self, mode: str, workers: int, queue_size: int):
+        self.mode = mode
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pages = 0
+        self.failures = 0
+        self.parse_seconds = 0.0
+        self.max_parse_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_depth = 0
+        self.backpressure_waits = 0
+
+    def observe_depth(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record(self, queue_wait: float, parse_seconds: float):
+        self.pages += 1
+        self.queue_wait_seconds += queue_wait
+        self.parse_seconds += parse_seconds
+        self.max_parse_seconds = max(self.max_parse_seconds, parse_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'pages': self.pages,
+            'failures': self.failures,
+            'avg_parse_ms': round(self.parse_seconds / self.pages * 1000, 2) if self.pages else 0.0,
+            'max_parse_ms': round(self.max_parse_seconds * 1000, 2),
+            'avg_queue_wait_ms': round(self.queue_wait_seconds / self.pages * 1000, 2) if self.pages else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'backpressure_waits': self.backpressure_waits
+        }
+
+    def publish(self):
+        """Add this run's totals to the shared counters and keep its snapshot as the last run"""
+        backend = get_cache_backend()
+        totals = {
+            'pages': self.pages,
+            'parse_ms': int(self.parse_seconds * 1000),
+            'queue_wait_ms': int(self.queue_wait_seconds * 1000),
+            'backpressure_waits': self.backpressure_waits,
+            'failures': self.failures
+        }
+        for key, amount in totals.items():
+            if amount:
+                backend.incr(f'parse_stats:{key}', amount)
+        backend.set('parse_stats:last_run', self.snapshot(), LAST_RUN_TTL)
+
+
+def parse_stats() -> Dict[str, Any]:
+    """Parse counters summed over every worker sharing the cache backend"""
+    backend = get_cache_backend()
+    stats = {key: backend.get_counter(f'parse_stats:{key}') for key in COUNTER_KEYS}
+    pages = stats['pages']
+    stats.update({
+        'avg_parse_ms': round(stats['parse_ms'] / pages, 2) if pages else 0.0,
+        'avg_queue_wait_ms': round(stats['queue_wait_ms'] / pages, 2) if pages else 0.0,
+        'last_run': backend.get('parse_stats:last_run')
+    })
+    return stats
+
+
+class ParseQueue:
+    """
+    Bounded queue between fetch tasks and the parse pool
+
+    One consumer task per parse worker takes jobs off the queue, so at most
+    `workers` pages are being parsed and at most `queue_size` wait; parse()
+    blocks its caller while the queue is full.
+    """
+
+    def __init__(self, workers: int = SCRAPER_PARSE_WORKERS, queue_size: int = SCRAPER_PARSE_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Optional[Executor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self.metrics: Optional[ParseMetrics] = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._executor, mode = await loop.run_in_executor(None, get_parse_executor, self.workers)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self.metrics = ParseMetrics(mode, self.workers, self.queue_size)
+        self._consumers = [asyncio.ensure_future(self._consume()) for _ in range(self.workers)]
+
+    async def close(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self.metrics and self.metrics.pages:
+            logger.info(f"Parse pool run: {self.metrics.snapshot()}")
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.metrics.publish)
+            except Exception as e:
+                logger.warning(f"Failed to publish parse metrics: {e}")
+
+    async def parse(self, func: Callable, *args) -> Any:
+        """Run func(*args) in the parse pool once a worker is free; raises what func raises"""
+        future = asyncio.get_running_loop().create_future()
+        if self._queue.full():
+            self.metrics.backpressure_waits += 1
+        await self._queue.put((func, args, future, time.monotonic()))
+        self.metrics.observe_depth(self._queue.qsize())
+        return await future
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future, enqueued = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                queue_wait = time.monotonic() - enqueued
+                result, parse_seconds = await loop.run_in_executor(self._executor, timed_call, func, *args)
+                self.metrics.record(queue_wait, parse_seconds)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except BrokenProcessPool as e:
+                self.metrics.failures += 1
+                if not future.done():
+                    future.set_exception(e)
+                logger.warning(f"Parse pool is broken ({e}), starting a new one")
+                broken = self._executor
+                await loop.run_in_executor(None, discard_parse_executor, broken)
+                if self._executor is broken:
+                    self._executor, _ = await loop.run_in_executor(None, get_parse_executor, self.workers)
+            except Exception as e:
+                self.metrics.failures += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,227 @@
+"""
+Website platform fingerprints
+
+Which CMS or site builder a website runs on (WordPress, Wix, Squarespace,
+Shopify, ...) decides how its contact form is built and how it can be
+submitted. The platform is fingerprinted once, while the homepage is
+scraped, from response headers, <meta name="generator"> and asset paths,
+then stored with the website ("platform" column) and per domain in the
+shared cache. Form widget detection, the contact page crawl and both
+form submitters read it to pick their strategy directly instead of
+analysing the page again (or asking the AI analyzer) at submission time.
+"""
+import os
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .cache_backend import get_cache_backend
+from .keyword_matcher import KeywordMatcher
+from .politeness import host_key
+
+logger = logging.getLogger(__name__)
+
+# Platform fingerprint configuration
+# - SCRAPER_PLATFORM_TTL: seconds a domain's platform fingerprint is reused (default: 2592000)
+SCRAPER_PLATFORM_TTL = int(os.getenv('SCRAPER_PLATFORM_TTL', '2592000'))
+
+PLATFORM_WORDPRESS = 'wordpress'
+PLATFORM_WIX = 'wix'
+PLATFORM_SQUARESPACE = 'squarespace'
+PLATFORM_SHOPIFY = 'shopify'
+PLATFORM_WEBFLOW = 'webflow'
+PLATFORM_HUBSPOT = 'hubspot'
+PLATFORM_DRUPAL = 'drupal'
+PLATFORM_JOOMLA = 'joomla'
+PLATFORM_GODADDY = 'godaddy'
+PLATFORM_WEEBLY = 'weebly'
+PLATFORM_DUDA = 'duda'
+# Fingerprinted, no known platform (a NULL column means "not fingerprinted yet")
+PLATFORM_CUSTOM = 'custom'
+
+# (lowercased response header, substring of its lowercased value or '' for presence, platform)
+HEADER_SIGNATURES = [
+    ('x-wix-request-id', '', PLATFORM_WIX),
+    ('server', 'pepyaka', PLATFORM_WIX),
+    ('x-shopid', '', PLATFORM_SHOPIFY),
+    ('x-shopify-stage', '', PLATFORM_SHOPIFY),
+    ('server', 'squarespace', PLATFORM_SQUARESPACE),
+    ('x-pingback', 'xmlrpc.php', PLATFORM_WORDPRESS),
+    ('link', 'wp-json', PLATFORM_WORDPRESS),
+    ('x-powered-by', 'wp engine', PLATFORM_WORDPRESS),
+    ('x-drupal-cache', '', PLATFORM_DRUPAL),
+    ('x-generator', 'drupal', PLATFORM_DRUPAL)
+]
+
+# Headers kept on fetch results for fingerprinting
+FINGERPRINT_HEADERS = sorted({header for header, _, _ in HEADER_SIGNATURES})
+
+# (substring of the lowercased generator meta content, platform); WordPress
+# sites often carry several generator tags (plugins), so all are checked
+GENERATOR_SIGNATURES = [
+    ('wordpress', PLATFORM_WORDPRESS),
+    ('wix.com', PLATFORM_WIX),
+    ('squarespace', PLATFORM_SQUARESPACE),
+    ('shopify', PLATFORM_SHOPIFY),
+    ('webflow', PLATFORM_WEBFLOW),
+    ('hubspot', PLATFORM_HUBSPOT),
+    ('drupal', PLATFORM_DRUPAL),
+    ('joomla', PLATFORM_JOOMLA),
+    ('go daddy', PLATFORM_GODADDY),
+    ('godaddy', PLATFORM_GODADDY),
+    ('weebly', PLATFORM_WEEBLY),
+    ('duda', PLATFORM_DUDA)
+]
+
+GENERATOR_TAG_RE = re.compile(r'''<meta\b[^>]*\bname\s*=\s*["']?generator\b[^>]*>''', re.IGNORECASE)
+META_CONTENT_RE = re.compile(r'''\bcontent\s*=\s*["']([^"']*)''', re.IGNORECASE)
+
+# Asset paths and CDNs only a platform serves
+ASSET_SIGNATURES = {
+    '/wp-content/': PLATFORM_WORDPRESS,
+    '/wp-includes/': PLATFORM_WORDPRESS,
+    'static.wixstatic.com': PLATFORM_WIX,
+    'static.parastorage.com': PLATFORM_WIX,
+    'static1.squarespace.com': PLATFORM_SQUARESPACE,
+    'assets.squarespace.com': PLATFORM_SQUARESPACE,
+    'cdn.shopify.com': PLATFORM_SHOPIFY,
+    'website-files.com': PLATFORM_WEBFLOW,
+    '/hubfs/': PLATFORM_HUBSPOT,
+    '/sites/default/files/': PLATFORM_DRUPAL,
+    '/misc/drupal.js': PLATFORM_DRUPAL,
+    '/media/jui/': PLATFORM_JOOMLA,
+    '/media/system/js/': PLATFORM_JOOMLA,
+    'img1.wsimg.com': PLATFORM_GODADDY,
+    'editmysite.com': PLATFORM_WEEBLY,
+    'irp.cdn-website.com': PLATFORM_DUDA
+}
+
+ASSET_MATCHER = KeywordMatcher(ASSET_SIGNATURES)
+
+# Tie-break between platforms with as many asset signatures
+ASSET_PLATFORM_ORDER = list(dict.fromkeys(ASSET_SIGNATURES.values()))
+
+
+class PlatformProfile(NamedTuple):
+    """How forms are found and submitted on a known platform"""
+    strategy: str                     # IntelligentFormSubmitter fallback: traditional|ajax|modal|alternative
+    challenges: Tuple[str, ...]       # as in AI strategy answers ('dynamic_loading' opens Firefox)
+    form_selectors: Tuple[str, ...]   # the platform's contact form markup, best first
+    http_order: Tuple[str, ...]       # UltraFastFormSubmitter strategies, in the order to try them
+
+
+PLATFORM_PROFILES: Dict[str, PlatformProfile] = {
+    PLATFORM_WORDPRESS: PlatformProfile('ajax', (), ('form.wpcf7-form', 'form.wpforms-form', 'form[id^="gform_"]', 'form'),
+                                        ('ajax', 'post', 'get')),
+    PLATFORM_WIX: PlatformProfile('traditional', ('dynamic_loading',), ('form.wixui-form', 'form'), ('post', 'ajax', 'get')),
+    PLATFORM_SQUARESPACE: PlatformProfile('traditional', ('dynamic_loading',), ('.sqs-block-form form', 'form'),
+                                          ('post', 'ajax', 'get')),
+    PLATFORM_SHOPIFY: PlatformProfile('traditional', (), ('form#contact_form', 'form[action*="/contact"]', 'form'),
+                                      ('post', 'get', 'ajax')),
+    PLATFORM_WEBFLOW: PlatformProfile('ajax', (), ('form[data-name]', 'form'), ('ajax', 'post', 'get')),
+    PLATFORM_HUBSPOT: PlatformProfile('ajax', ('dynamic_loading',), ('form.hs-form', 'form'), ('ajax', 'post', 'get')),
+    PLATFORM_DRUPAL: PlatformProfile('traditional', (), ('form.webform-submission-form', 'form.contact-form', 'form'),
+                                     ('post', 'get', 'ajax')),
+    PLATFORM_JOOMLA: PlatformProfile('traditional', (), ('form#contact-form', 'form'), ('post', 'get', 'ajax'))
+}
+
+# Order of UltraFastFormSubmitter strategies when the platform is unknown
+DEFAULT_HTTP_ORDER = ('post', 'get', 'ajax')
+
+
+def fingerprint_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    """The response headers fingerprinting looks at, lowercased, to keep on a fetch result"""
+    if not headers:
+        return {}
+    kept = {}
+    for name in FINGERPRINT_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            kept[name] = str(value)
+    return kept
+
+
+def detect_platform(html: str, headers: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Platform of a page from its headers, generator meta tags and asset paths
+
+    Returns:
+        One of the PLATFORM_* names, PLATFORM_CUSTOM when nothing matched
+    """
+    for header, needle, platform in HEADER_SIGNATURES:
+        value = (headers or {}).get(header)
+        if value is not None and needle in str(value).lower():
+            return platform
+
+    for tag in GENERATOR_TAG_RE.findall(html or ''):
+        content = META_CONTENT_RE.search(tag)
+        generator = content.group(1).lower() if content else ''
+        for needle, platform in GENERATOR_SIGNATURES:
+            if needle in generator:
+                return platform
+
+    # Assets: the platform with the most distinct signatures (a WordPress
+    # site embedding one Shopify buy button is still WordPress)
+    votes = Counter(ASSET_SIGNATURES[signature] for signature in ASSET_MATCHER.find(html or ''))
+    if votes:
+        return max(votes, key=lambda platform: (votes[platform], -ASSET_PLATFORM_ORDER.index(platform)))
+    return PLATFORM_CUSTOM
+
+
+def platform_profile(platform: Optional[str]) -> Optional[PlatformProfile]:
+    """How to handle forms on platform, or None when it is not a platform we know how to handle"""
+    return PLATFORM_PROFILES.get(platform or '')
+
+
+def submission_strategy(platform: str) -> Optional[Dict[str, Any]]:
+    """
+    The submission strategy for a known platform, shaped like
+    AIFormAnalyzer.suggest_submission_strategy's answer, or None
+    """
+    profile = platform_profile(platform)
+    if profile is None:
+        return None
+    return {
+        'success': True,
+        'strategy': profile.strategy,
+        'challenges': list(profile.challenges),
+        'platform': platform,
+        'source': 'platform'
+    }
+
+
+# Per-domain cache
+
+def _cache_key(url: str) -> Optional[str]:
+    host = host_key(url if '://' in url else f'https://{url}')
+    return f'platform:{host}' if host else None
+
+
+def cached_platform(url: str) -> Optional[str]:
+    """Platform recorded for url's domain, or None"""
+    key = _cache_key(url)
+    entry = get_cache_backend().get(key) if key else None
+    return entry.get('platform') if entry else None
+
+
+def remember_platform(url: str, platform: str, ttl: int = SCRAPER_PLATFORM_TTL):
+    key = _cache_key(url)
+    if key and platform:
+        get_cache_backend().set(key, {'platform': platform}, ttl)
+
+
+def resolve_platform(url: str, stored: Optional[str] = None, html: Optional[str] = None,
+                     headers: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Platform of a website: the stored fingerprint, else the domain's cached
+    one, else a fingerprint of html (remembered for the domain)
+    """
+    if stored:
+        return stored
+    platform = cached_platform(url)
+    if platform:
+        return platform
+    platform = detect_platform(html or '', headers)
+    remember_platform(url, platform)
+    return platform
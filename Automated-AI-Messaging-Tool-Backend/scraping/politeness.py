@@ -0,0 +1,240 @@
+"""
+Per-host politeness scheduling for website scraping
+
+Replaces fixed sleeps before every request with a token bucket per host.
+The first requests to a host go out immediately; only repeat requests to the
+same host are spaced out, using the robots.txt Crawl-delay when the site
+declares one. A process-wide semaphore caps the number of requests in flight.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Politeness configuration
+# - SCRAPER_HOST_RATE: sustained requests per second allowed per host (default: 1.0)
+# - SCRAPER_HOST_BURST: requests a host may receive back to back before spacing kicks in (default: 2)
+# - SCRAPER_MAX_IN_FLIGHT: requests in flight per worker process on the sync path (default: 100)
+# - SCRAPER_RESPECT_ROBOTS: honour robots.txt Crawl-delay for repeat requests to a host (default: true)
+# - SCRAPER_MAX_CRAWL_DELAY: upper bound applied to robots.txt Crawl-delay values, in seconds (default: 30)
+SCRAPER_HOST_RATE = float(os.getenv('SCRAPER_HOST_RATE', '1.0'))
+SCRAPER_HOST_BURST = int(os.getenv('SCRAPER_HOST_BURST', '2'))
+SCRAPER_MAX_IN_FLIGHT = int(os.getenv('SCRAPER_MAX_IN_FLIGHT', '100'))
+SCRAPER_RESPECT_ROBOTS = os.getenv('SCRAPER_RESPECT_ROBOTS', 'true').lower() == 'true'
+SCRAPER_MAX_CRAWL_DELAY = float(os.getenv('SCRAPER_MAX_CRAWL_DELAY', '30'))
+
+ROBOTS_TIMEOUT = 5
+ROBOTS_USER_AGENT = '*'
+
+# Idle buckets are dropped once the table grows past this many hosts
+MAX_TRACKED_HOSTS = 10000
+
+
+def host_key(url: str) -> str:
+    """Politeness key for a URL: lowercased host without a leading www."""
+    host = (urlparse(url).hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out delays instead of blocking
+
+    Each reservation takes one token. When the bucket is empty the balance
+    goes negative and the caller is told how long to wait for its token,
+    so concurrent callers are spaced out in reservation order.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """True once the bucket has refilled completely"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+    def slow_down(self, min_interval: float):
+        """Space requests at least min_interval seconds apart"""
+        if min_interval > 0 and self.rate > 1.0 / min_interval:
+            self.rate = 1.0 / min_interval
+            self.capacity = 1
+            self.tokens = min(self.tokens, 1.0)
+
+
+class PolitenessScheduler:
+    """Token bucket per host, robots.txt Crawl-delay and a global in-flight cap"""
+
+    def __init__(self, host_rate: float = SCRAPER_HOST_RATE, host_burst: int = SCRAPER_HOST_BURST,
+                 max_in_flight: int = SCRAPER_MAX_IN_FLIGHT, respect_robots: bool = SCRAPER_RESPECT_ROBOTS,
+                 max_crawl_delay: float = SCRAPER_MAX_CRAWL_DELAY):
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.respect_robots = respect_robots
+        self.max_crawl_delay = max_crawl_delay
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._crawl_delays: Dict[str, Optional[float]] = {}
+        self._robots_locks: Dict[str, threading.Lock] = {}
+        self._robots_fetches: Dict[str, asyncio.Future] = {}
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_HOSTS:
+                self._prune(time.monotonic())
+            bucket = TokenBucket(self.host_rate, self.host_burst)
+            crawl_delay = self._crawl_delays.get(host)
+            if crawl_delay:
+                bucket.slow_down(min(crawl_delay, self.max_crawl_delay))
+            self._buckets[host] = bucket
+        return bucket
+
+    def _prune(self, now: float):
+        for host in [h for h, b in self._buckets.items() if b.is_idle(now)]:
+            del self._buckets[host]
+
+    def _needs_robots(self, host: str) -> bool:
+        """Robots.txt only matters once a host gets a repeat request"""
+        with self._lock:
+            return self.respect_robots and host in self._buckets and host not in self._crawl_delays
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for url and return the seconds to wait"""
+        host = host_key(url)
+        with self._lock:
+            return self._bucket(host).reserve(time.monotonic())
+
+    def set_crawl_delay(self, host: str, crawl_delay: Optional[float]):
+        """Record the robots.txt Crawl-delay for a host (None when not declared)"""
+        with self._lock:
+            self._crawl_delays[host] = crawl_delay
+            if crawl_delay:
+                self._bucket(host).slow_down(min(crawl_delay, self.max_crawl_delay))
+        if crawl_delay:
+            logger.info(f"Using robots.txt crawl delay of {crawl_delay}s for {host}")
+
+    @staticmethod
+    def _robots_url(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme or 'https'}://{parsed.netloc}/robots.txt"
+
+    @staticmethod
+    def _parse_crawl_delay(robots_txt: str) -> Optional[float]:
+        parser = RobotFileParser()
+        parser.parse(robots_txt.splitlines())
+        crawl_delay = parser.crawl_delay(ROBOTS_USER_AGENT)
+        return float(crawl_delay) if crawl_delay else None
+
+    def _load_robots(self, url: str, session):
+        host = host_key(url)
+        with self._lock:
+            host_lock = self._robots_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            if host in self._crawl_delays:
+                return
+            crawl_delay = None
+            try:
+                response = session.get(self._robots_url(url), timeout=ROBOTS_TIMEOUT)
+                if response.status_code == 200:
+                    crawl_delay = self._parse_crawl_delay(response.text)
+            except Exception as e:
+                logger.debug(f"Could not load robots.txt for {host}: {e}")
+            self.set_crawl_delay(host, crawl_delay)
+        with self._lock:
+            self._robots_locks.pop(host, None)
+
+    async def _load_robots_async(self, url: str, session):
+        host = host_key(url)
+        loop = asyncio.get_running_loop()
+        # One robots.txt fetch per host; concurrent fetches to the host wait for it
+        while True:
+            with self._lock:
+                if host in self._crawl_delays:
+                    return
+                fetch = self._robots_fetches.get(host)
+                if fetch is None or fetch.get_loop() is not loop:
+                    fetch = loop.create_future()
+                    self._robots_fetches[host] = fetch
+                    break
+            # Shielded so a cancelled waiter does not cancel the fetch for the others
+            await asyncio.shield(fetch)
+
+        try:
+            crawl_delay = None
+            try:
+                async with session.get(self._robots_url(url), timeout=ROBOTS_TIMEOUT) as response:
+                    if response.status == 200:
+                        crawl_delay = self._parse_crawl_delay(await response.text(errors='replace'))
+            except Exception as e:
+                logger.debug(f"Could not load robots.txt for {host}: {e}")
+            self.set_crawl_delay(host, crawl_delay)
+        finally:
+            # Waiters re-check the crawl delays, and fetch again if this fetch was cancelled
+            with self._lock:
+                if self._robots_fetches.get(host) is fetch:
+                    del self._robots_fetches[host]
+            fetch.set_result(None)
+
+    def wait(self, url: str, session=None):
+        """Block until a request to url is allowed (requests session used for robots.txt)"""
+        if session is not None and self._needs_robots(host_key(url)):
+            self._load_robots(url, session)
+        delay = self.reserve(url)
+        if delay > 0:
+            logger.debug(f"Politeness delay of {delay:.2f}s for {url}")
+            time.sleep(delay)
+
+    async def wait_async(self, url: str, session=None):
+        """Async counterpart of wait (aiohttp session used for robots.txt)"""
+        if session is not None and self._needs_robots(host_key(url)):
+            await self._load_robots_async(url, session)
+        delay = self.reserve(url)
+        if delay > 0:
+            logger.debug(f"Politeness delay of {delay:.2f}s for {url}")
+            await asyncio.sleep(delay)
+
+    @contextmanager
+    def slot(self, url: str, session=None):
+        """Wait for politeness, then hold one of the global in-flight slots for a request to url"""
+        self.wait(url, session)
+        with self._slots:
+            yield
+
+
+_scheduler: Optional[PolitenessScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    """Get the process-wide politeness scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = PolitenessScheduler()
+    return _scheduler
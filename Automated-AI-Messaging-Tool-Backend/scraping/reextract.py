@@ -0,0 +1,148 @@
+"""
+Offline re-extraction from page snapshots
+
+Replays the static extractors over the pages kept by the snapshot store
+(see scraping.snapshot_store): parse_company_page/finish_company_info on
+the stored homepage, about page and contact link, then form widget
+detection and the contact page crawl, both reading sub-pages from the
+store. Nothing is fetched, so improving the extraction costs CPU only.
+
+Selenium popup detection is not replayed. When the replay finds no
+contact form, the stored contactFormUrl of the website (which may come
+from a Selenium pass) is left as it is by the caller.
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .crawl_frontier import find_contact_page
+from .form_widgets import detect_form_widget
+from .platform_fingerprint import detect_platform
+from .snapshot_store import SnapshotStore, get_snapshot_store
+from .subpage_fetcher import BROKEN_LINK_STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+# Sites handed to a re-extraction process at a time
+CHUNK_SIZE = 16
+
+
+def snapshot_fetch(store: SnapshotStore):
+    """A fetch_subpage stand-in answering from the snapshot store"""
+    def fetch(url: str) -> Dict[str, Any]:
+        record = store.get_page(url)
+        if record is None:
+            return {'success': False, 'url': url, 'status_code': None, 'error': 'not in snapshot store'}
+        if record['content'] is None:
+            return {'success': False, 'url': url, 'status_code': record['status_code'],
+                    'error': f"HTTP {record['status_code']}"}
+        return {'success': True, 'url': url, 'final_url': record['final_url'],
+                'status_code': record['status_code'], 'content': record['content']}
+    return fetch
+
+
+def reextract_website(url: str, store: Optional[SnapshotStore] = None,
+                      upload_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Website data for url rebuilt from its snapshots
+
+    Args:
+        url: Website URL as provided in the upload
+        store: Snapshot store (default: this process's)
+        upload_id: fileUploadId whose homepage snapshot to replay; records
+            written before snapshots were kept per upload are used as a fallback
+
+    Returns:
+        build_website_data's fields plus 'contact_form_source', or None when
+        the homepage of url is not in the store
+    """
+    from celery_tasks.scraping_tasks import extract_about_content, finish_company_info, parse_company_page
+
+    store = store or get_snapshot_store()
+    site = None
+    if store:
+        site = store.get_site(url, upload_id)
+        if site is None and upload_id:
+            site = store.get_site(url)
+    if site is None:
+        return None
+    fetch = snapshot_fetch(store)
+    html = site['content']
+
+    parsed = parse_company_page(html, url)
+    # Snapshots keep no response headers: the fingerprint reads the markup only
+    platform = detect_platform(html)
+
+    broken_link = None
+    if parsed['contact_link']:
+        contact = fetch(parsed['contact_link'])
+        if contact.get('status_code') in BROKEN_LINK_STATUS_CODES:
+            broken_link = parsed['contact_link']
+
+    aboutUsContent = None
+    if parsed['about_url']:
+        about = fetch(parsed['about_url'])
+        if about['success']:
+            try:
+                aboutUsContent = extract_about_content(about['content'])
+            except Exception as e:
+                logger.warning(f"Failed to parse about page {parsed['about_url']}: {str(e)}")
+
+    info = finish_company_info(parsed, url, aboutUsContent, broken_link)
+
+    # Same precedence as build_website_data, minus Selenium
+    source = 'homepage' if info['has_contact_form'] else None
+    if site.get('csv_contact_form_url'):
+        info['has_contact_form'] = True
+        info['contactFormUrl'] = site['csv_contact_form_url']
+        source = 'csv'
+    elif not info['has_contact_form']:
+        widget = detect_form_widget(html, site['page_url'], platform)
+        crawled = None if widget else find_contact_page(site['page_url'], html, fetch=fetch, platform=platform)
+        if widget:
+            info['has_contact_form'] = True
+            info['contactFormUrl'] = widget.form_url
+            source = 'widget'
+        elif crawled:
+            info['has_contact_form'] = True
+            info['contactFormUrl'] = crawled['url']
+            source = 'crawl'
+
+    return {
+        'url': url,
+        'title': info['title'],
+        'companyName': info['companyName'],
+        'industry': info['industry'],
+        'businessType': info['businessType'],
+        'contactFormUrl': info['contactFormUrl'],
+        'has_contact_form': info['has_contact_form'],
+        'aboutUsContent': info['aboutUsContent'],
+        'platform': platform,
+        'contact_form_source': source
+    }
+
+
+def _reextract_job(job: Tuple[str, Optional[str]]) -> Tuple[Tuple[str, Optional[str]], Optional[Dict[str, Any]], Optional[str]]:
+    # Runs in a re-extraction process; one site's failure must not stop the run
+    url, upload_id = job
+    try:
+        return job, reextract_website(url, upload_id=upload_id), None
+    except Exception as e:
+        return job, None, str(e)
+
+
+def reextract_many(jobs: Iterable[Tuple[str, Optional[str]]], workers: int = os.cpu_count() or 1) -> Iterator[Tuple[Tuple[str, Optional[str]], Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Re-extract many websites in a process pool
+
+    Args:
+        jobs: (url, fileUploadId) pairs
+
+    Yields ((url, fileUploadId), website data or None when not stored, error or None) in input order.
+    """
+    if workers <= 1:
+        yield from map(_reextract_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_reextract_job, jobs, chunksize=CHUNK_SIZE)
@@ -0,0 +1,151 @@
+"""
+Conditional homepage fetches
+
+Recurring lists (dealers, insurance agents) bring the same homepages back
+once their scrape results have gone stale. ResponseCache keeps the last
+body of every homepage that came with an ETag or Last-Modified header,
+zlib-compressed, together with those validators. The next fetch sends
+If-None-Match / If-Modified-Since and, when the server answers 304 Not
+Modified, the stored body is used instead of downloading the page again.
+"""
+import os
+import zlib
+import base64
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from .cache_backend import CacheBackend, get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Response cache configuration
+# - SCRAPER_RESPONSE_CACHE: revalidate homepages with ETag/Last-Modified (default: true)
+# - SCRAPER_RESPONSE_CACHE_TTL: seconds a stored body and its validators are kept (default: 2592000, 30 days)
+# - SCRAPER_RESPONSE_CACHE_MAX_BYTES: larger bodies are not stored (default: 2000000)
+SCRAPER_RESPONSE_CACHE = os.getenv('SCRAPER_RESPONSE_CACHE', 'true').lower() == 'true'
+SCRAPER_RESPONSE_CACHE_TTL = int(os.getenv('SCRAPER_RESPONSE_CACHE_TTL', '2592000'))
+SCRAPER_RESPONSE_CACHE_MAX_BYTES = int(os.getenv('SCRAPER_RESPONSE_CACHE_MAX_BYTES', '2000000'))
+
+COUNTER_KEYS = ('conditional_requests', 'not_modified', 'stores', 'bytes_saved')
+
+
+def _compress(content: str) -> str:
+    return base64.b64encode(zlib.compress(content.encode('utf-8'), 6)).decode('ascii')
+
+
+def _decompress(data: str) -> str:
+    return zlib.decompress(base64.b64decode(data)).decode('utf-8')
+
+
+class ResponseCache:
+    """Last body and validators per URL, for If-None-Match / If-Modified-Since revalidation"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: int = SCRAPER_RESPONSE_CACHE_TTL,
+                 max_bytes: int = SCRAPER_RESPONSE_CACHE_MAX_BYTES, enabled: bool = SCRAPER_RESPONSE_CACHE):
+        self._backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled and ttl > 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = get_cache_backend()
+        return self._backend
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return 'response:' + hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for url ('etag', 'last_modified', 'content' and the compressed 'body'), or None"""
+        if not self.enabled:
+            return None
+        entry = self.backend.get(self._key(url))
+        if entry is None:
+            return None
+        try:
+            entry['content'] = _decompress(entry['body'])
+        except Exception as e:
+            logger.debug(f"Dropping unreadable cached response for {url}: {e}")
+            self.backend.delete(self._key(url))
+            return None
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Request headers revalidating entry (empty without an entry)"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, content: str, headers: Mapping[str, str]):
+        """Keep a 200 response body when the server sent validators for it"""
+        if not self.enabled or not content or len(content) > self.max_bytes:
+            return
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        if 'no-store' in (headers.get('Cache-Control') or '').lower():
+            return
+        self.backend.set(self._key(url), {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': _compress(content)
+        }, self.ttl)
+        self.backend.incr('response_stats:stores')
+
+    def record_request(self, entry: Optional[Dict[str, Any]]):
+        if entry:
+            self.backend.incr('response_stats:conditional_requests')
+
+    def not_modified(self, url: str, entry: Dict[str, Any], headers: Mapping[str, str]) -> str:
+        """
+        Handle a 304 answer to a conditional request
+
+        Validators the server sent along replace the stored ones and the
+        entry's TTL starts over. Returns the stored body.
+        """
+        content = entry['content']
+        logger.info(f"{url} not modified, reusing stored body ({len(content)} chars)")
+        self.backend.incr('response_stats:not_modified')
+        self.backend.incr('response_stats:bytes_saved', len(content))
+        self.backend.set(self._key(url), {
+            'etag': headers.get('ETag') or entry.get('etag'),
+            'last_modified': headers.get('Last-Modified') or entry.get('last_modified'),
+            'body': entry['body']
+        }, self.ttl)
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        """Revalidation counters summed over every worker sharing the backend"""
+        stats = {key: self.backend.get_counter(f'response_stats:{key}') for key in COUNTER_KEYS}
+        stats.update({
+            'enabled': self.enabled,
+            'ttl_seconds': self.ttl,
+            'not_modified_rate_percent': round(
+                stats['not_modified'] / stats['conditional_requests'] * 100, 2
+            ) if stats['conditional_requests'] else 0.0
+        })
+        return stats
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
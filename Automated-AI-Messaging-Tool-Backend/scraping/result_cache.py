@@ -0,0 +1,164 @@
+"""
+Scrape results shared across uploads
+
+The same company websites show up in upload after upload. ScrapeResultCache
+keeps the extracted fields of every successful scrape in the shared cache
+backend, keyed by the website's canonical domain (plus its path, for
+sites such as agents.example.com/<state>/<agent> that host many
+businesses), for SCRAPER_RESULT_CACHE_TTL seconds. A fresh entry is copied into the new websites row instead of
+fetching and parsing the site again. Hit/miss counters live in the backend
+too, so the API process can report them for every worker.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from .cache_backend import CacheBackend, get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Scrape result cache configuration
+# - SCRAPER_RESULT_CACHE: reuse scrape results of earlier uploads (default: true)
+# - SCRAPER_RESULT_CACHE_TTL: seconds a scrape result stays fresh (default: 604800, one week)
+SCRAPER_RESULT_CACHE = os.getenv('SCRAPER_RESULT_CACHE', 'true').lower() == 'true'
+SCRAPER_RESULT_CACHE_TTL = int(os.getenv('SCRAPER_RESULT_CACHE_TTL', '604800'))
+
+# Website data fields that describe the site itself, not the upload it came from
+CACHED_FIELDS = (
+    'title', 'companyName', 'industry', 'businessType',
+    'contactFormUrl', 'has_contact_form', 'aboutUsContent'
+)
+
+COUNTER_KEYS = ('hits', 'misses', 'stores')
+
+
+def canonical_domain(url: str) -> str:
+    """
+    Cache key for a website: lowercased IDNA host without scheme, port,
+    path or a leading www. ('' when url has no host)
+    """
+    url = (url or '').strip()
+    if '://' not in url:
+        url = f'https://{url}'
+    try:
+        host = (urlparse(url).hostname or '').rstrip('.')
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        host = host.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    return host.lower()
+
+
+def cache_key(url: str) -> str:
+    """
+    Cache key for a website: its canonical domain when url is the site
+    root, else the domain plus path (trailing '/' dropped) and query
+    ('' when url has no host)
+    """
+    domain = canonical_domain(url)
+    if not domain:
+        return ''
+    url = (url or '').strip()
+    if '://' not in url:
+        url = f'https://{url}'
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return domain
+    path = parsed.path.rstrip('/')
+    if not path and not parsed.query:
+        return domain
+    return f"{domain}{path}?{parsed.query}" if parsed.query else f"{domain}{path}"
+
+
+class ScrapeResultCache:
+    """Extracted website fields by canonical URL, with shared hit/miss counters"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: int = SCRAPER_RESULT_CACHE_TTL,
+                 enabled: bool = SCRAPER_RESULT_CACHE):
+        self._backend = backend
+        self.ttl = ttl
+        self.enabled = enabled and ttl > 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = get_cache_backend()
+        return self._backend
+
+    def get(self, url: str, csv_contact_form_url: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Website data for url built from a fresh cached scrape, or None
+
+        The result has the shape returned by scrape_website_data; a contact
+        form URL provided with the upload still wins over the cached one.
+        """
+        key = cache_key(url) if self.enabled else ''
+        if not key:
+            return None
+
+        entry = self.backend.get(f'result:{key}')
+        if entry is None:
+            self.backend.incr('result_stats:misses')
+            return None
+        self.backend.incr('result_stats:hits')
+
+        website_data = {'url': url}
+        website_data.update({field: entry.get(field, '') for field in CACHED_FIELDS})
+        website_data['has_contact_form'] = bool(entry.get('has_contact_form'))
+        if csv_contact_form_url:
+            website_data['has_contact_form'] = True
+            website_data['contactFormUrl'] = csv_contact_form_url
+        website_data.update({'scrapingStatus': 'COMPLETED', 'error_message': ''})
+
+        age = int(time.time() - entry.get('scraped_at', time.time()))
+        logger.info(f"Using cached scrape of {key} for {url} ({age}s old)")
+        return website_data
+
+    def store(self, url: str, website_data: Dict[str, Any], csv_contact_form_url: str = None):
+        """Remember a successful scrape; results shaped by the upload's own contact form URL are skipped"""
+        key = cache_key(url) if self.enabled else ''
+        if not key or csv_contact_form_url or website_data.get('scrapingStatus') != 'COMPLETED':
+            return
+        entry = {field: website_data.get(field, '') for field in CACHED_FIELDS}
+        entry['scraped_at'] = time.time()
+        self.backend.set(f'result:{key}', entry, self.ttl)
+        self.backend.incr('result_stats:stores')
+
+    def invalidate(self, url: str):
+        key = cache_key(url)
+        if key:
+            self.backend.delete(f'result:{key}')
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters summed over every worker sharing the backend"""
+        stats = {key: self.backend.get_counter(f'result_stats:{key}') for key in COUNTER_KEYS}
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'enabled': self.enabled,
+            'ttl_seconds': self.ttl,
+            'backend': self.backend.name,
+            'hit_rate_percent': round(stats['hits'] / lookups * 100, 2) if lookups else 0.0
+        })
+        return stats
+
+
+_result_cache: Optional[ScrapeResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ScrapeResultCache:
+    """Get the process-wide scrape result cache"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ScrapeResultCache()
+    return _result_cache
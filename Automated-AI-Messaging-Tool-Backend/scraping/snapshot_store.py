@@ -0,0 +1,350 @@
+"""
+Content-addressed store of fetched pages
+
+Every homepage and sub-page the scraper fetches is kept, so a change to
+extract_company_info or to contact form scoring can be applied to past
+uploads by replaying the extractors over stored pages (see
+scraping.reextract) instead of crawling the sites again.
+
+Page bodies are zstd-compressed and stored once under the SHA-256 of
+their content (blobs/ab/<sha256>.zst); the same page fetched by many
+uploads costs one blob. Small JSON records map URLs to blobs:
+
+    sites/<upload id>/<sha1(url)>.json   the homepage a website URL of an upload resolved to
+    pages/<sha1(url)>.json               status and body of a sub-page (about, contact, crawl)
+
+A site record is kept per upload, so re-extracting an upload replays the
+homepage that upload saw; page records hold the latest fetch. Objects
+live in a local directory, or in an S3 bucket (any S3-compatible service
+through an endpoint URL). Writes run on background threads so they never
+slow a fetch down; when SCRAPER_SNAPSHOT_MAX_PENDING writes are already
+queued, new ones are dropped (and counted) rather than piling up page
+bodies in memory. Errors are logged, never raised into a scrape.
+
+Snapshots are off by default: the store grows with every upload and has
+no retention of its own (use a bucket lifecycle rule, or prune the
+directory, when turning them on).
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Snapshot store configuration
+# - SCRAPER_SNAPSHOTS: keep every fetched page for offline re-extraction (default: false)
+# - SCRAPER_SNAPSHOT_BACKEND: 'local' or 's3' (default: local)
+# - SCRAPER_SNAPSHOT_DIR: directory of the local backend (default: <tmp>/scraper_snapshots)
+# - SCRAPER_SNAPSHOT_BUCKET: bucket of the s3 backend (default: S3_BUCKET_NAME)
+# - SCRAPER_SNAPSHOT_PREFIX: key prefix in the bucket (default: scrape-snapshots/)
+# - SCRAPER_SNAPSHOT_ENDPOINT_URL: endpoint of an S3-compatible service, unset for AWS (default: unset)
+# - SCRAPER_SNAPSHOT_LEVEL: zstd compression level (default: 9)
+# - SCRAPER_SNAPSHOT_MAX_PENDING: queued writes per process before new snapshots are dropped (default: 500)
+# - SCRAPER_SNAPSHOT_FLUSH_TIMEOUT: seconds a scraping batch waits for queued writes at its end (default: 60)
+SCRAPER_SNAPSHOTS = os.getenv('SCRAPER_SNAPSHOTS', 'false').lower() == 'true'
+SCRAPER_SNAPSHOT_BACKEND = os.getenv('SCRAPER_SNAPSHOT_BACKEND', 'local').lower()
+SCRAPER_SNAPSHOT_DIR = os.getenv('SCRAPER_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'scraper_snapshots'))
+SCRAPER_SNAPSHOT_BUCKET = os.getenv('SCRAPER_SNAPSHOT_BUCKET', os.getenv('S3_BUCKET_NAME', ''))
+SCRAPER_SNAPSHOT_PREFIX = os.getenv('SCRAPER_SNAPSHOT_PREFIX', 'scrape-snapshots/')
+SCRAPER_SNAPSHOT_ENDPOINT_URL = os.getenv('SCRAPER_SNAPSHOT_ENDPOINT_URL') or None
+SCRAPER_SNAPSHOT_LEVEL = int(os.getenv('SCRAPER_SNAPSHOT_LEVEL', '9'))
+SCRAPER_SNAPSHOT_MAX_PENDING = int(os.getenv('SCRAPER_SNAPSHOT_MAX_PENDING', '500'))
+SCRAPER_SNAPSHOT_FLUSH_TIMEOUT = float(os.getenv('SCRAPER_SNAPSHOT_FLUSH_TIMEOUT', '60'))
+
+# Background threads writing snapshots, per process
+WRITER_THREADS = 2
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class ObjectBackend:
+    """Bytes under string keys"""
+
+    name = 'base'
+
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class LocalObjectBackend(ObjectBackend):
+    """Objects as files under a directory (stand-in for the bucket on a single machine)"""
+
+    name = 'local'
+
+    def __init__(self, root: str = SCRAPER_SNAPSHOT_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+
+class S3ObjectBackend(ObjectBackend):
+    """Objects in an S3 (or S3-compatible) bucket"""
+
+    name = 's3'
+
+    def __init__(self, bucket: str = SCRAPER_SNAPSHOT_BUCKET, prefix: str = SCRAPER_SNAPSHOT_PREFIX,
+                 endpoint_url: Optional[str] = SCRAPER_SNAPSHOT_ENDPOINT_URL):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        if not bucket:
+            raise ValueError("SCRAPER_SNAPSHOT_BUCKET is not set")
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client_error = ClientError
+        self.client = boto3.client('s3', region_name=os.getenv('AWS_REGION', 'us-east-1'), endpoint_url=endpoint_url)
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body'].read()
+        except self._client_error as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except self._client_error as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404', 'NotFound'):
+                return False
+            raise
+
+
+class SnapshotStore:
+    """
+    Compressed page bodies by content hash, and URL records pointing at them
+
+    save_site()/save_page() queue a write and return at once (or drop it
+    when max_pending writes are queued); the get_* methods read
+    synchronously (used by re-extraction).
+    """
+
+    def __init__(self, backend: ObjectBackend, level: int = SCRAPER_SNAPSHOT_LEVEL,
+                 max_pending: int = SCRAPER_SNAPSHOT_MAX_PENDING):
+        self.backend = backend
+        self.level = level
+        self.max_pending = max(1, max_pending)
+        self.dropped = 0
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+        self._local = threading.local()
+        self._writer = ThreadPoolExecutor(max_workers=WRITER_THREADS, thread_name_prefix='snapshot')
+
+    def _compressor(self):
+        # zstd contexts are not thread-safe; one per thread
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompressor(self):
+        decompressor = getattr(self._local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = zstandard.ZstdDecompressor()
+            self._local.decompressor = decompressor
+        return decompressor
+
+    @staticmethod
+    def _blob_key(digest: str) -> str:
+        return f"blobs/{digest[:2]}/{digest}.zst"
+
+    def put_blob(self, content: str) -> str:
+        """Store content once; returns its SHA-256"""
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._blob_key(digest)
+        if not self.backend.exists(key):
+            self.backend.put(key, self._compressor().compress(data))
+        return digest
+
+    def get_blob(self, digest: str) -> Optional[str]:
+        data = self.backend.get(self._blob_key(digest))
+        if data is None:
+            return None
+        return self._decompressor().decompress(data).decode('utf-8')
+
+    @staticmethod
+    def _record_key(kind: str, url: str, upload_id: Optional[str] = None) -> str:
+        if upload_id:
+            return f"{kind}/{upload_id}/{url_key(url)}.json"
+        return f"{kind}/{url_key(url)}.json"
+
+    def _put_record(self, kind: str, url: str, record: Dict[str, Any], upload_id: Optional[str] = None):
+        self.backend.put(self._record_key(kind, url, upload_id), json.dumps(record).encode('utf-8'))
+
+    def _get_record(self, kind: str, url: str, upload_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        data = self.backend.get(self._record_key(kind, url, upload_id))
+        return json.loads(data) if data is not None else None
+
+    def _write_site(self, url: str, page_url: str, content: str, method: str,
+                    csv_contact_form_url: Optional[str], upload_id: Optional[str]):
+        self._put_record('sites', url, {
+            'url': url,
+            'upload_id': upload_id,
+            'page_url': page_url,
+            'digest': self.put_blob(content),
+            'method': method,
+            'csv_contact_form_url': csv_contact_form_url,
+            'fetched_at': time.time()
+        }, upload_id)
+
+    def _write_page(self, url: str, content: Optional[str], status_code: int, final_url: Optional[str]):
+        self._put_record('pages', url, {
+            'url': url,
+            'final_url': final_url or url,
+            'status_code': status_code,
+            'digest': self.put_blob(content) if content is not None else None,
+            'fetched_at': time.time()
+        })
+
+    def _submit(self, func, *args):
+        with self._pending_changed:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                if self.dropped == 1:
+                    logger.warning(f"Snapshot writes are falling behind ({self._pending} queued), dropping new snapshots")
+                return
+            self._pending += 1
+        future = self._writer.submit(func, *args)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        with self._pending_changed:
+            self._pending -= 1
+            self._pending_changed.notify_all()
+        _log_write_failure(future)
+
+    def save_site(self, url: str, page_url: str, content: str, method: str = 'requests',
+                  csv_contact_form_url: Optional[str] = None, upload_id: Optional[str] = None):
+        """Record the homepage a website URL of an upload resolved to (and the contact form URL the upload provided)"""
+        self._submit(self._write_site, url, page_url, content, method, csv_contact_form_url, upload_id)
+
+    def save_page(self, url: str, content: Optional[str], status_code: int, final_url: Optional[str] = None):
+        """Record a sub-page fetch; content is None for error answers (404s are worth keeping)"""
+        self._submit(self._write_page, url, content, status_code, final_url)
+
+    def get_site(self, url: str, upload_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Site record of url in an upload plus its homepage as 'content', or None"""
+        record = self._get_record('sites', url, upload_id)
+        if record is None:
+            return None
+        record['content'] = self.get_blob(record['digest'])
+        return record if record['content'] is not None else None
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Page record plus 'content' (None for error answers), or None"""
+        record = self._get_record('pages', url)
+        if record is None:
+            return None
+        record['content'] = self.get_blob(record['digest']) if record['digest'] else None
+        return record
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued writes; False when some are still queued after timeout seconds"""
+        with self._pending_changed:
+            flushed = self._pending_changed.wait_for(lambda: self._pending == 0, timeout)
+            pending, dropped = self._pending, self.dropped
+            self.dropped = 0
+        if dropped:
+            logger.warning(f"Dropped {dropped} page snapshots, the writer queue was full")
+        if not flushed:
+            logger.warning(f"{pending} page snapshot writes still queued after {timeout}s")
+        return flushed
+
+
+def _log_write_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Failed to store page snapshot: {error}")
+
+
+def _create_backend() -> ObjectBackend:
+    if SCRAPER_SNAPSHOT_BACKEND == 's3':
+        try:
+            return S3ObjectBackend()
+        except Exception as e:
+            logger.warning(f"S3 snapshot store unavailable ({e}), storing snapshots in {SCRAPER_SNAPSHOT_DIR}")
+    return LocalObjectBackend()
+
+
+_store: Optional[SnapshotStore] = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+_disabled_warned = False
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """This process's snapshot store, or None when snapshots are off (a forked child gets its own)"""
+    global _store, _store_pid, _disabled_warned
+    if not SCRAPER_SNAPSHOTS:
+        return None
+    if zstandard is None:
+        if not _disabled_warned:
+            logger.warning("zstandard is not installed, page snapshots are disabled")
+            _disabled_warned = True
+        return None
+    if _store is None or _store_pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store_pid != os.getpid():
+                _store = SnapshotStore(_create_backend())
+                _store_pid = os.getpid()
+                logger.info(f"Page snapshot store: {_store.backend.name}")
+    return _store
+
+
+def flush_snapshots(timeout: Optional[float] = SCRAPER_SNAPSHOT_FLUSH_TIMEOUT) -> bool:
+    """Wait for this process's queued snapshot writes, if it has a store (end of a scraping batch)"""
+    if _store is None or _store_pid != os.getpid():
+        return True
+    return _store.flush(timeout)
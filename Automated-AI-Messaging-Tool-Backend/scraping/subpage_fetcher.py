@@ -0,0 +1,109 @@
+"""
+Concurrent sub-page fetches for homepage extraction
+
+extract_company_info needs the about page (and checks the contact page)
+of every site. Those fetches start as soon as the links are found on the
+homepage and run in a shared thread pool while the rest of the homepage is
+parsed, so a site costs one homepage fetch plus one parallel round of
+sub-pages. Each pool thread keeps its own RobustWebScraper, so sub-pages
+go through the politeness scheduler, the retrying session, the body cap
+and a kept-alive connection to the site.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .snapshot_store import get_snapshot_store
+
+logger = logging.getLogger(__name__)
+
+# Sub-page fetch configuration
+# - SCRAPER_SUBPAGE_WORKERS: sub-page fetches in flight per worker process (default: 16)
+# - SCRAPER_SUBPAGE_TIMEOUT: timeout per sub-page request in seconds (default: 10)
+SCRAPER_SUBPAGE_WORKERS = int(os.getenv('SCRAPER_SUBPAGE_WORKERS', '16'))
+SCRAPER_SUBPAGE_TIMEOUT = int(os.getenv('SCRAPER_SUBPAGE_TIMEOUT', '10'))
+
+# Answers meaning the link itself is dead, not that the site is having trouble
+BROKEN_LINK_STATUS_CODES = {404, 410}
+
+_thread_local = threading.local()
+
+
+def thread_scraper():
+    """RobustWebScraper of the current thread (its session keeps connections alive)"""
+    from celery_tasks.scraping_tasks import RobustWebScraper
+
+    scraper = getattr(_thread_local, 'scraper', None)
+    if scraper is None:
+        scraper = RobustWebScraper()
+        _thread_local.scraper = scraper
+    return scraper
+
+
+def fetch_subpage(url: str, timeout: int = SCRAPER_SUBPAGE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Fetch one sub-page
+
+    Returns:
+        {'success', 'url', 'final_url', 'status_code', 'content'} on a 2xx/3xx answer,
+        {'success': False, 'url', 'status_code', 'error'} otherwise
+    """
+    try:
+        response, content = thread_scraper().fetch_page(url, timeout=timeout)
+    except Exception as e:
+        return {'success': False, 'url': url, 'status_code': None, 'error': str(e)}
+    snapshot_store = get_snapshot_store()
+    if snapshot_store:
+        snapshot_store.save_page(url, content, response.status_code, response.url)
+    if content is None:
+        return {'success': False, 'url': url, 'status_code': response.status_code,
+                'error': f"HTTP {response.status_code}"}
+    return {'success': True, 'url': url, 'final_url': response.url, 'status_code': response.status_code,
+            'content': content}
+
+
+class SubpageFetch:
+    """A sub-page fetch running in the background"""
+
+    def __init__(self, url: str, future: Future):
+        self.url = url
+        self._future = future
+
+    def result(self) -> Dict[str, Any]:
+        """Wait for the fetch; never raises"""
+        try:
+            return self._future.result()
+        except Exception as e:
+            return {'success': False, 'url': self.url, 'status_code': None, 'error': str(e)}
+
+    def content(self) -> Optional[str]:
+        result = self.result()
+        return result['content'] if result['success'] else None
+
+    def broken_link(self) -> bool:
+        """True when the server says the page does not exist"""
+        return self.result().get('status_code') in BROKEN_LINK_STATUS_CODES
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """This process's sub-page thread pool (a forked child gets its own)"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=SCRAPER_SUBPAGE_WORKERS, thread_name_prefix='subpage')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def start_subpage_fetch(url: str) -> SubpageFetch:
+    """Start fetching url in the background"""
+    logger.info(f"Starting sub-page fetch: {url}")
+    return SubpageFetch(url, _get_executor().submit(fetch_subpage, url))